@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark tokenizing and parsing large CMakeLists.txt files.
+
+Parses either the given file or a synthetic file of about --lines lines made
+of multi-line target definitions and target_* commands.
+
+    python benchmarks/bench_cmake_parser.py --lines 50000
+    python benchmarks/bench_cmake_parser.py --file /path/to/CMakeLists.txt
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gncmake_bridge.parser.cmake_lexer import tokenize_cmake
+from gncmake_bridge.parser.cmake_parser import parse_cmake_file
+
+
+def generate_cmake_file(lines: int) -> str:
+    chunks = []
+    for t in range(lines // 10):
+        chunks.append(
+            f"# target {t}\n"
+            f"add_library(lib{t} STATIC\n"
+            f"  src/a{t}.cc\n"
+            f"  src/b{t}.cc\n"
+            f'  "src/with space {t}.cc"\n'
+            f")\n"
+            f"target_link_libraries(lib{t}\n"
+            f"  PUBLIC base\n"
+            f"  PRIVATE lib{max(t - 1, 0)})\n"
+            f"target_compile_definitions(lib{t} PRIVATE MODULE_{t}=1)\n"
+        )
+    return "".join(chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--file", type=Path, help="CMakeLists.txt to parse")
+    parser.add_argument("--lines", type=int, default=50_000, help="Synthetic file size")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions (best is kept)")
+    args = parser.parse_args()
+
+    content = args.file.read_text() if args.file else generate_cmake_file(args.lines)
+    print(f"{content.count(chr(10))} lines, {len(content) / 1e6:.1f} MB")
+    for name, run in (("tokenize", tokenize_cmake), ("parse targets", parse_cmake_file)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run(content)
+            best = min(best, time.perf_counter() - start)
+        print(f"  {name:<28} {best * 1000:10.1f} ms  ({len(result)} items)")
+
+
+if __name__ == "__main__":
+    main()
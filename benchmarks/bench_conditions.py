@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark resolving GN conditions for a matrix of build configurations.
+
+Compares one ConfigMatrix traversal over every configuration against parsing
+the corpus once per configuration with the arguments bound.
+
+    python benchmarks/bench_conditions.py --configs 16
+"""
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gncmake_bridge.parser.gn_conditions import ConfigMatrix
+from gncmake_bridge.parser.gn_parser import GNParser
+
+
+def generate_build_file(targets: int) -> str:
+    chunks = []
+    for t in range(targets):
+        chunks.append(
+            f'static_library("lib{t}") {{\n'
+            f'  sources = [ "src/{t}.cc" ]\n'
+            f"  if (is_linux && !is_debug) {{\n"
+            f'    cflags = [ "-O2" ]\n'
+            f'  }} else if (target_cpu == "arm64") {{\n'
+            f'    defines = [ "ARM64_{t}" ]\n'
+            f"    if (is_debug) {{ defines = [ \"ARM_DEBUG\" ] }}\n"
+            f"  }}\n"
+            f'  if (is_android || use_feature_{t % 8}) {{ ldflags = [ "-llog" ] }}\n'
+            f"}}\n\n"
+        )
+    return "".join(chunks)
+
+
+def make_configs(count: int) -> dict[str, dict[str, object]]:
+    axes = itertools.product(
+        ("linux", "android"), (True, False), ("x64", "arm64"), range(8)
+    )
+    configs = {}
+    for os_name, debug, cpu, features in itertools.islice(axes, count):
+        args: dict[str, object] = {
+            "is_linux": os_name == "linux",
+            "is_android": os_name == "android",
+            "is_debug": debug,
+            "target_cpu": cpu,
+        }
+        args.update({f"use_feature_{i}": bool(features >> (i % 3) & 1) for i in range(8)})
+        name = f"{os_name}_{'debug' if debug else 'release'}_{cpu}_{features}"
+        configs[name] = args
+    return configs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--targets", type=int, default=2000, help="Targets in the corpus")
+    parser.add_argument("--configs", type=int, default=8, help="Configurations (max 64)")
+    args = parser.parse_args()
+
+    content = generate_build_file(args.targets)
+    configs = make_configs(args.configs)
+    print(f"{args.targets} targets x {len(configs)} configurations")
+
+    start = time.perf_counter()
+    targets = GNParser().parse(content)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = ConfigMatrix(configs)
+    for target in targets:
+        matrix.resolve(target)
+    matrix_time = time.perf_counter() - start
+    print(f"  {'parse once':<28} {parse_time * 1000:10.1f} ms")
+    print(f"  {'resolve all configs':<28} {matrix_time * 1000:10.1f} ms")
+
+    start = time.perf_counter()
+    for config in configs.values():
+        GNParser(args=config).parse(content)
+    reparse_time = time.perf_counter() - start
+    print(f"  {'re-parse per config':<28} {reparse_time * 1000:10.1f} ms")
+    print(f"  speedup: {reparse_time / (parse_time + matrix_time):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
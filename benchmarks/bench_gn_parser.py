@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the native recursive-descent GN parser against the Lark LALR backend.
+
+Both backends parse the same corpus: either every BUILD.gn/.gn/.gni file under
+--corpus, or a synthetic corpus of generated BUILD.gn files.
+
+    python benchmarks/bench_gn_parser.py
+    python benchmarks/bench_gn_parser.py --corpus /path/to/chromium/src/base
+"""
+import argparse
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gncmake_bridge.parser.gn_ast import parse_gn_ast
+from gncmake_bridge.parser.gn_lark import get_lark_parser, parse_gn_ast_lark
+
+
+def generate_build_file(index: int, targets: int, sources: int) -> str:
+    """Generate a BUILD.gn file shaped like machine-generated output."""
+    chunks = [f'import("//build/config/features.gni")\n\nprefix = "mod{index}"\n']
+    for t in range(targets):
+        source_lines = "".join(f'    "src/file_{t}_{s}.cc",\n' for s in range(sources))
+        chunks.append(
+            f'static_library("${{prefix}}_lib{t}") {{\n'
+            f"  sources = [\n{source_lines}  ]\n"
+            f'  deps = [ ":mod{index}_lib{max(t - 1, 0)}", "//base" ]\n'
+            f'  defines = [ "MODULE_{t}=1" ]\n'
+            f"  if (is_linux && !is_debug) {{\n"
+            f'    cflags = [ "-O2" ]\n'
+            f'  }} else if (target_cpu == "arm64") {{\n'
+            f'    sources += [ "src/arm64_{t}.cc" ]\n'
+            f"  }}\n"
+            f"}}\n\n"
+        )
+    return "".join(chunks)
+
+
+def load_corpus(corpus: Path | None, files: int, targets: int, sources: int) -> list[str]:
+    if corpus is None:
+        return [generate_build_file(i, targets, sources) for i in range(files)]
+    paths = sorted(
+        p for pattern in ("BUILD.gn", "*.gn", "*.gni") for p in corpus.rglob(pattern)
+    )
+    return [p.read_text(errors="replace") for p in dict.fromkeys(paths)]
+
+
+def time_backend(
+    name: str, parse: Callable[[str], object], contents: list[str], repeat: int
+) -> float:
+    best = float("inf")
+    failures = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        failures = 0
+        for content in contents:
+            try:
+                parse(content)
+            except Exception:
+                failures += 1
+        best = min(best, time.perf_counter() - start)
+    suffix = f" ({failures} files failed to parse)" if failures else ""
+    print(f"  {name:<28} {best * 1000:10.1f} ms{suffix}")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", type=Path, help="Directory of GN files to parse")
+    parser.add_argument("--files", type=int, default=50, help="Synthetic files")
+    parser.add_argument("--targets", type=int, default=40, help="Targets per synthetic file")
+    parser.add_argument("--sources", type=int, default=25, help="Sources per target")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions (best is kept)")
+    args = parser.parse_args()
+
+    contents = load_corpus(args.corpus, args.files, args.targets, args.sources)
+    total_bytes = sum(len(c) for c in contents)
+    total_lines = sum(c.count("\n") for c in contents)
+    print(f"Corpus: {len(contents)} files, {total_lines} lines, {total_bytes / 1e6:.1f} MB")
+
+    print("Lark table load:")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = str(Path(tmp) / "gn_lalr.cache")
+        start = time.perf_counter()
+        get_lark_parser(cache_file)
+        print(f"  {'build + serialize':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+        get_lark_parser.cache_clear()
+        start = time.perf_counter()
+        get_lark_parser(cache_file)
+        print(f"  {'load from cache':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    print("Parse to syntax tree:")
+    native = time_backend("native (recursive descent)", parse_gn_ast, contents, args.repeat)
+    lark = time_backend("lark (LALR)", parse_gn_ast_lark, contents, args.repeat)
+    print(f"  lark / native: {lark / native:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark reachability over a large dependency graph with each backend.
+
+Builds a BuildGraph of --targets libraries in --layers layers, each linking
+a few libraries of lower layers. Times the dependencies of a batch of
+binaries, the targets affected by a batch of changed libraries and
+all-pairs reachability, with the pure Python backend and, when NumPy is
+installed, the NumPy one, whose all-pairs matrix is also timed on its own.
+
+    python benchmarks/bench_reachability.py --targets 50000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gncmake_bridge.ir import BuildGraph, Reachability, Target, TargetType
+from gncmake_bridge.ir.reachability import HAS_NUMPY
+
+
+def generate_targets(count: int, layers: int, seed: int) -> list[Target]:
+    # Libraries in layers, each linking a few libraries of lower layers, as
+    # in a large project where everything builds on a common base.
+    rng = random.Random(seed)
+    per_layer = max(1, count // layers)
+    targets = []
+    for t in range(count):
+        below = (t // per_layer) * per_layer
+        deps = [f"lib{rng.randrange(below)}" for _ in range(3)] if below else []
+        public_deps = [f"lib{rng.randrange(below)}"] if below and rng.random() < 0.3 else []
+        targets.append(
+            Target(
+                name=f"lib{t}",
+                type=TargetType.STATIC_LIBRARY,
+                deps=deps,
+                public_deps=public_deps,
+            )
+        )
+    return targets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--targets", type=int, default=20_000, help="Targets in the graph")
+    parser.add_argument("--layers", type=int, default=40, help="Layers of libraries")
+    parser.add_argument("--queries", type=int, default=100, help="Targets per batch query")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = BuildGraph.from_targets(generate_targets(args.targets, args.layers, args.seed))
+    edges = sum(len(edges) for edges in graph.edges.values())
+    print(f"{len(graph)} targets, {edges} edges, built in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(args.seed)
+    binaries = rng.sample(range(len(graph)), min(args.queries, len(graph)))
+    changed = rng.sample(range(len(graph)), min(args.queries, len(graph)))
+    backends = ["python", "numpy"] if HAS_NUMPY else ["python"]
+    if not HAS_NUMPY:
+        print("  NumPy is not installed; timing the python backend only")
+
+    results = {}
+    for backend in backends:
+        # Each backend gets a fresh graph, so the python one starts without
+        # memoized closures.
+        fresh = BuildGraph.from_targets(graph.targets)
+        start = time.perf_counter()
+        reachability = Reachability(fresh, backend=backend)
+        setup = time.perf_counter() - start
+        timings = [("setup", setup)]
+        queries = [
+            ("link deps", lambda: [reachability.reachable([b]) for b in binaries]),
+            ("affected", lambda: reachability.dependents(changed)),
+            ("all pairs", reachability.all_pairs),
+        ]
+        if backend == "numpy":
+            queries.append(("matrix", reachability.matrix))
+        for name, run in queries:
+            start = time.perf_counter()
+            results[backend, name] = run()
+            timings.append((name, time.perf_counter() - start))
+        print(f"  {backend:<7}" + "".join(
+            f"  {name} {elapsed * 1000:8.1f} ms" for name, elapsed in timings
+        ))
+    if len(backends) == 2:
+        same = all(results["python", key] == results["numpy", key]
+                   for key in ("link deps", "affected", "all pairs"))
+        print(f"  backends agree: {same}")
+
+
+if __name__ == "__main__":
+    main()
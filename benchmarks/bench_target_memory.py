@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory held by parsed targets.
+
+Parses a synthetic CMakeLists.txt with --targets libraries that share flags,
+include directories and dependencies, as large projects do, and reports the
+bytes retained per target: the size of every distinct object reachable from
+the targets, so strings and empty values shared between targets count once.
+The same targets are then stored in a TargetTable, whose size and flag
+filter are compared with the list of targets.
+
+    python benchmarks/bench_target_memory.py --targets 20000
+"""
+import argparse
+import sys
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gncmake_bridge.ir import TargetTable
+from gncmake_bridge.parser.cmake_parser import parse_cmake_file
+
+
+def generate_cmake_file(targets: int) -> str:
+    chunks = []
+    for t in range(targets):
+        chunks.append(
+            f"add_library(lib{t} STATIC src/{t}/a.cc src/{t}/b.cc)\n"
+            f"target_include_directories(lib{t} PUBLIC include third_party/abseil)\n"
+            f"target_compile_options(lib{t} PRIVATE -Wall -Wextra -O2 -fno-exceptions)\n"
+            f"target_compile_definitions(lib{t} PRIVATE NDEBUG USE_FEATURE_{t % 8})\n"
+            f"target_link_libraries(lib{t} PUBLIC base PRIVATE lib{t // 2})\n"
+        )
+    return "".join(chunks)
+
+
+def retained_size(root: Any) -> int:
+    seen: set[int] = set()
+    pending = [root]
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, (Enum, bool, type(None))):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            pending.extend(obj)
+        elif isinstance(obj, TargetTable):
+            pending.append(vars(obj))
+        elif hasattr(obj, "__dict__"):
+            pending.append(vars(obj))
+        elif hasattr(type(obj), "__slots__"):
+            pending.extend(getattr(obj, name) for name in type(obj).__slots__)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--targets", type=int, default=20_000, help="Targets in the file")
+    args = parser.parse_args()
+
+    content = generate_cmake_file(args.targets)
+    start = time.perf_counter()
+    targets = parse_cmake_file(content)
+    elapsed = time.perf_counter() - start
+    retained = retained_size(targets) - sys.getsizeof(targets)
+
+    print(f"{len(targets)} targets parsed in {elapsed * 1000:.0f} ms")
+    print(f"  targets   {retained / 1e6:8.1f} MB  ({retained / len(targets):.0f} bytes/target)")
+
+    start = time.perf_counter()
+    table = TargetTable.from_targets(targets)
+    elapsed = time.perf_counter() - start
+    size = retained_size(table)
+    print(f"  table     {size / 1e6:8.1f} MB  ({size / len(table):.0f} bytes/target)"
+          f"  built in {elapsed * 1000:.0f} ms")
+
+    dep = f"lib{len(targets) // 4}"
+    dep_fields = ("deps", "public_deps", "private_deps", "data_deps")
+
+    def scan() -> list[int]:
+        return [i for i, t in enumerate(targets) if any(dep in getattr(t, f) for f in dep_fields)]
+
+    for name, run in (("scan", scan), ("filter", lambda: table.depending_on(dep))):
+        start = time.perf_counter()
+        count = len(run())
+        print(f"  depending on {dep}, {name:<6} {(time.perf_counter() - start) * 1000:8.2f} ms"
+              f"  ({count} targets)")
+
+if __name__ == "__main__":
+    main()
@@ -5,22 +5,35 @@ from gncmake_bridge.converter import ConversionMode, Converter
 from gncmake_bridge.exceptions import (
     ConfigurationError,
     ConversionError,
+    DependencyCycleError,
     GenerationError,
     GNCMakeBridgeError,
     ParseError,
     UnsupportedFeatureError,
 )
 from gncmake_bridge.generator import CMakeGenerator, GNGenerator
-from gncmake_bridge.ir import Target, TargetType, Toolchain
-from gncmake_bridge.parser import CMakeParser, GNParser
+from gncmake_bridge.ir import (
+    BuildGraph,
+    Label,
+    MultiToolchainTarget,
+    Target,
+    TargetType,
+    Toolchain,
+)
+from gncmake_bridge.parser import CMakeFileApiReader, CMakeParser, GNParser, ParseCache
 
 __all__ = [
     "__version__",
+    "Label",
+    "BuildGraph",
     "Target",
     "TargetType",
     "Toolchain",
+    "MultiToolchainTarget",
     "GNParser",
     "CMakeParser",
+    "CMakeFileApiReader",
+    "ParseCache",
     "GNGenerator",
     "CMakeGenerator",
     "Converter",
@@ -31,6 +44,7 @@ __all__ = [
     "ParseError",
     "GenerationError",
     "ConversionError",
+    "DependencyCycleError",
     "ConfigurationError",
     "UnsupportedFeatureError",
 ]
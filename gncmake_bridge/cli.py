@@ -1,7 +1,9 @@
 import argparse
 from pathlib import Path
 
+from gncmake_bridge.config import load_config
 from gncmake_bridge.converter import ConversionMode, Converter
+from gncmake_bridge.parser import ParseCache
 
 
 def main() -> None:
@@ -27,7 +29,7 @@ def main() -> None:
         "--input",
         required=True,
         type=Path,
-        help="Input file path",
+        help="Input file path, or a GN source directory to convert as a tree",
     )
     convert_parser.add_argument(
         "--output",
@@ -35,6 +37,31 @@ def main() -> None:
         type=Path,
         help="Output file path",
     )
+    convert_parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent parse cache (default: from the config's [cache] table)",
+    )
+    convert_parser.add_argument(
+        "--config",
+        type=Path,
+        help="Configuration file (default: gncmake.toml or ~/.gncmake.toml if present)",
+    )
+    convert_parser.add_argument(
+        "--source-root",
+        type=Path,
+        help="Root of the GN source tree; enables resolving import() statements",
+    )
+    convert_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Worker processes when --input is a directory (default: all cores)",
+    )
+    convert_parser.add_argument(
+        "--template-stats",
+        action="store_true",
+        help="Print invocation counts and expansion times of GN templates",
+    )
 
     args = parser.parse_args()
 
@@ -45,9 +72,21 @@ def main() -> None:
         }
         mode = mode_map[args.mode]
 
-        converter = Converter()
-        converter.convert_file(args.input, args.output, mode)
-        print(f"Successfully converted {args.input} to {args.output}")
+        config = load_config(args.config)
+        cache: ParseCache | None
+        if args.cache_dir:
+            cache = ParseCache(args.cache_dir, config.cache.max_size_mb * 2**20)
+        else:
+            cache = ParseCache.from_config(config.cache)
+        converter = Converter(cache=cache, source_root=args.source_root)
+        if args.input.is_dir() and mode == ConversionMode.GN_TO_CMAKE:
+            count = converter.convert_tree(args.input, args.output, jobs=args.jobs)
+            print(f"Successfully converted {count} targets from {args.input} to {args.output}")
+        else:
+            converter.convert_file(args.input, args.output, mode)
+            print(f"Successfully converted {args.input} to {args.output}")
+        if args.template_stats:
+            print(converter.template_stats())
     else:
         parser.print_help()
 
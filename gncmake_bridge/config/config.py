@@ -57,6 +57,15 @@ class ExternalMappingConfig:
     mapping: dict[str, str] = field(default_factory=dict)
 
 
+@dataclass
+class CacheConfig:
+    """Parse cache configuration."""
+
+    enabled: bool = False
+    directory: str = ".gncmake_cache"
+    max_size_mb: int = 512
+
+
 @dataclass
 class GNCMakeConfig:
     """Complete configuration for GNCMakeBridge."""
@@ -66,6 +75,7 @@ class GNCMakeConfig:
     targets: TargetsConfig = field(default_factory=TargetsConfig)
     cmake: CMakeConfig = field(default_factory=CMakeConfig)
     external_mapping: ExternalMappingConfig = field(default_factory=ExternalMappingConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "GNCMakeConfig":
@@ -92,6 +102,11 @@ class GNCMakeConfig:
                 mapping=data["dependencies"]["external_mapping"]
             )
 
+        if "cache" in data:
+            config.cache = CacheConfig(**data["cache"])
+            if config.cache.max_size_mb <= 0:
+                raise ConfigurationError("cache.max_size_mb must be positive")
+
         return config
 
     def to_dict(self) -> dict[str, Any]:
@@ -122,6 +137,11 @@ class GNCMakeConfig:
             "dependencies": {
                 "external_mapping": self.external_mapping.mapping,
             },
+            "cache": {
+                "enabled": self.cache.enabled,
+                "directory": self.cache.directory,
+                "max_size_mb": self.cache.max_size_mb,
+            },
         }
 
 
@@ -2,7 +2,8 @@ from enum import Enum
 from pathlib import Path
 
 from gncmake_bridge.generator import CMakeGenerator, GNGenerator
-from gncmake_bridge.parser import CMakeParser, GNParser
+from gncmake_bridge.ir import BuildGraph, Target
+from gncmake_bridge.parser import CMakeParser, GNParser, ParseCache
 
 
 class ConversionMode(Enum):
@@ -11,9 +12,11 @@ class ConversionMode(Enum):
 
 
 class Converter:
-    def __init__(self) -> None:
-        self._gn_parser = GNParser()
-        self._cmake_parser = CMakeParser()
+    def __init__(
+        self, cache: ParseCache | None = None, source_root: Path | None = None
+    ) -> None:
+        self._gn_parser = GNParser(cache=cache, source_root=source_root)
+        self._cmake_parser = CMakeParser(cache=cache)
         self._gn_generator = GNGenerator()
         self._cmake_generator = CMakeGenerator()
 
@@ -25,24 +28,76 @@ class Converter:
         return "\n\n".join(cmake_lines)
 
     def convert_cmake_to_gn(self, cmake_content: str) -> str:
-        targets = self._cmake_parser.parse(cmake_content)
+        return self._generate_gn(self._cmake_parser.parse(cmake_content))
+
+    def _generate_gn(self, targets: list[Target]) -> str:
         gn_lines = []
         for target in targets:
             gn_lines.append(self._gn_generator.generate(target))
         return "\n\n".join(gn_lines)
 
     def convert_file(self, input_path: Path, output_path: Path, mode: ConversionMode) -> None:
-        content = input_path.read_text()
-
         if mode == ConversionMode.GN_TO_CMAKE:
-            result = self.convert_gn_to_cmake(content)
-        elif mode == ConversionMode.CMAKE_TO_GN:
-            result = self.convert_cmake_to_gn(content)
+            self._stream_gn_to_cmake(input_path, output_path)
+            return
+
+        if mode == ConversionMode.CMAKE_TO_GN:
+            result = self._generate_gn(self._cmake_parser.parse_file(input_path))
         else:
             raise ValueError(f"Unknown conversion mode: {mode}")
 
         output_path.write_text(result)
 
+    def convert_tree(self, input_root: Path, output_dir: Path, jobs: int | None = None) -> int:
+        """Convert every BUILD.gn under ``input_root`` into CMakeLists.txt files.
+
+        The directory structure is mirrored under ``output_dir``; the
+        top-level file adds every converted subdirectory. Returns the number
+        of converted targets.
+
+        Raises:
+            DependencyCycleError: If the targets depend on each other in a cycle.
+        """
+        targets = self._gn_parser.parse_tree(input_root, jobs=jobs)
+        BuildGraph.from_targets(targets).check_acyclic()
+        by_directory: dict[str, list[Target]] = {}
+        for label, target in targets.items():
+            directory = label.directory[2:]
+            by_directory.setdefault(directory, []).append(target)
+
+        subdirectories = sorted(d for d in by_directory if d)
+        root_lines = ["cmake_minimum_required(VERSION 3.20)", "project(gn_conversion)"]
+        root_lines.extend(f"add_subdirectory({d})" for d in subdirectories)
+        for directory, directory_targets in by_directory.items():
+            generated = [self._cmake_generator.generate(t) for t in directory_targets]
+            if not directory:
+                root_lines.extend(generated)
+                continue
+            path = output_dir / directory / "CMakeLists.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("\n\n".join(generated) + "\n")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / "CMakeLists.txt").write_text("\n\n".join(root_lines) + "\n")
+        return len(targets)
+
+    def _stream_gn_to_cmake(self, input_path: Path, output_path: Path) -> None:
+        # Targets are generated as they are parsed; the output is written to a
+        # temporary file first so a parse error never leaves a partial result.
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w") as out:
+                out.write("cmake_minimum_required(VERSION 3.20)\n\nproject(gn_conversion)")
+                for target in self._gn_parser.iter_parse(input_path):
+                    out.write("\n\n")
+                    out.write(self._cmake_generator.generate(target))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        tmp_path.replace(output_path)
+
+    def template_stats(self) -> str:
+        return self._gn_parser.template_stats()
+
     def convert(self, content: str, mode: ConversionMode) -> str:
         if mode == ConversionMode.GN_TO_CMAKE:
             return self.convert_gn_to_cmake(content)
@@ -1,4 +1,9 @@
 """Custom exceptions for GNCMakeBridge."""
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from gncmake_bridge.ir.label import Label
 
 
 class GNCMakeBridgeError(Exception):
@@ -37,6 +42,18 @@ class ConversionError(GNCMakeBridgeError):
     pass
 
 
+class DependencyCycleError(ConversionError):
+    """Raised when targets that must not depend on themselves form a cycle.
+
+    Attributes:
+        cycle: The labels on the cycle, starting and ending with the same one.
+    """
+
+    def __init__(self, cycle: Sequence["Label"]) -> None:
+        self.cycle = cycle
+        super().__init__("Dependency cycle: " + " -> ".join(str(label) for label in cycle))
+
+
 class ConfigurationError(GNCMakeBridgeError):
     """Raised when configuration is invalid."""
 
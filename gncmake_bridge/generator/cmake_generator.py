@@ -1,14 +1,140 @@
-from gncmake_bridge.ir import Target, TargetType
+from functools import lru_cache
+
+from gncmake_bridge.exceptions import GenerationError, ParseError
+from gncmake_bridge.ir import ConditionBlock, Label, MultiToolchainTarget, Target, TargetType
+from gncmake_bridge.parser.gn_ast import (
+    BinaryOp,
+    BooleanLiteral,
+    FunctionCall,
+    Identifier,
+    IntegerLiteral,
+    Node,
+    StringLiteral,
+    UnaryOp,
+    parse_gn_expression,
+)
+
+# Commands adding to, and target properties holding, each GN list property.
+_PROPERTY_COMMANDS = {
+    "sources": "target_sources({name} PRIVATE {values})",
+    "cflags": "target_compile_options({name} PRIVATE {values})",
+    "defines": "target_compile_definitions({name} PRIVATE {values})",
+    "include_dirs": "target_include_directories({name} PRIVATE {values})",
+    "ldflags": "target_link_options({name} PRIVATE {values})",
+    "deps": "target_link_libraries({name} PRIVATE {values})",
+    "private_deps": "target_link_libraries({name} PRIVATE {values})",
+    "public_deps": "target_link_libraries({name} PUBLIC {values})",
+}
+_PROPERTY_NAMES = {
+    "sources": "SOURCES",
+    "cflags": "COMPILE_OPTIONS",
+    "defines": "COMPILE_DEFINITIONS",
+    "include_dirs": "INCLUDE_DIRECTORIES",
+    "ldflags": "LINK_OPTIONS",
+    "deps": "LINK_LIBRARIES",
+    "private_deps": "LINK_LIBRARIES",
+    "public_deps": "LINK_LIBRARIES",
+}
+_COMPARISONS = {
+    "==": "STREQUAL",
+    "!=": "STREQUAL",
+    "<": "LESS",
+    "<=": "LESS_EQUAL",
+    ">": "GREATER",
+    ">=": "GREATER_EQUAL",
+}
+_DEP_FIELDS = frozenset(("deps", "private_deps", "public_deps"))
+
+
+def _dep_name(dep: str | Label) -> str:
+    # CMake names targets by their bare name, so a GN label such as
+    # ":base" or "//base" becomes the name of its target; library names,
+    # paths, flags and Foo::Bar imported targets are kept as they are.
+    if isinstance(dep, Label):
+        return dep.name
+    if dep.startswith((":", "//")) and "::" not in dep:
+        return Label.parse(dep).name
+    return dep
+
+
+def _cmake_expression(node: Node) -> str:
+    # GN variables become CMake variables of the same name, which if()
+    # dereferences by itself.
+    if isinstance(node, Identifier):
+        return node.name
+    if isinstance(node, BooleanLiteral):
+        return "TRUE" if node.value else "FALSE"
+    if isinstance(node, IntegerLiteral):
+        return str(node.value)
+    if isinstance(node, StringLiteral) and "$" not in node.raw:
+        return f'"{node.raw}"'
+    if isinstance(node, UnaryOp) and node.op == "!":
+        return f"NOT ({_cmake_expression(node.operand)})"
+    if isinstance(node, FunctionCall) and node.name == "defined" and len(node.args) == 1:
+        arg = node.args[0]
+        if isinstance(arg, Identifier):
+            return f"DEFINED {arg.name}"
+    if isinstance(node, BinaryOp):
+        left, right = _cmake_expression(node.left), _cmake_expression(node.right)
+        if node.op in ("&&", "||"):
+            op = "AND" if node.op == "&&" else "OR"
+            return f"({left}) {op} ({right})"
+        if node.op in _COMPARISONS:
+            op = _COMPARISONS[node.op]
+            if isinstance(node.left, IntegerLiteral) or isinstance(node.right, IntegerLiteral):
+                op = "EQUAL" if op == "STREQUAL" else op
+            elif op != "STREQUAL":
+                op = f"STR{op}"
+            comparison = f"{left} {op} {right}"
+            return f"NOT ({comparison})" if node.op == "!=" else comparison
+    raise GenerationError(f"Cannot express GN condition in CMake: {node}")
+
+
+@lru_cache(maxsize=4096)
+def cmake_condition(condition: str) -> str:
+    """Translate GN condition text, e.g. ``is_linux && !is_debug``, into CMake.
+
+    Raises:
+        GenerationError: If the condition has no CMake equivalent.
+    """
+    try:
+        node = parse_gn_expression(condition)
+    except ParseError as e:
+        raise GenerationError(f"Invalid GN condition {condition!r}: {e}") from e
+    return _cmake_expression(node)
 
 
 class CMakeGenerator:
     def __init__(self, indent: str = "  ") -> None:
         self._indent = indent
 
-    def generate(self, target: Target) -> str:
+    def generate(self, target: Target | MultiToolchainTarget) -> str:
+        """Generate a target; a multi-toolchain target is generated once, with
+        each toolchain's differences in an ``if(current_toolchain STREQUAL ...)`` block.
+
+        ``current_toolchain`` is a cache option, set with e.g.
+        ``-Dcurrent_toolchain=//build/toolchain:arm64``, defaulting to the
+        target's first toolchain.
+        """
+        if isinstance(target, MultiToolchainTarget):
+            text = self._generate_target(target.to_target())
+            presence = target.presence_condition()
+            if presence is not None:
+                body = "\n".join(f"{self._indent}{line}" for line in text.split("\n"))
+                text = f"if({cmake_condition(presence)})\n{body}\nendif()"
+            return f"{self._toolchain_option(target)}\n{text}"
         lines = [self._generate_target(target)]
         return "\n".join(lines)
 
+    def _toolchain_option(self, target: MultiToolchainTarget) -> str:
+        # The variable the toolchain conditions test. A cache entry is only
+        # set once, so every multi-toolchain target can declare it.
+        labels = [toolchain.label() for toolchain in [*target.toolchains, *target.absent]]
+        return (
+            f'set(current_toolchain "{labels[0]}" CACHE STRING "GN toolchain to build for")\n'
+            f'set_property(CACHE current_toolchain PROPERTY STRINGS "{";".join(labels)}")'
+        )
+
     def _generate_target(self, target: Target) -> str:
         lines = []
 
@@ -63,8 +189,49 @@ class CMakeGenerator:
                 f'OUTPUT_NAME "{target.output_name}")'
             )
 
+        for block in target.conditions:
+            self._generate_block(lines, target.name, block, "")
+
         return "\n".join(lines)
 
+    def _generate_block(
+        self, lines: list[str], name: str, block: ConditionBlock, indent: str
+    ) -> None:
+        inner = indent + self._indent
+        try:
+            condition = cmake_condition(block.condition)
+        except GenerationError:
+            lines.append(f"{indent}# Unsupported GN condition: {block.condition}")
+            return
+        lines.append(f"{indent}if({condition})")
+        for prop, value in block.properties.items():
+            if isinstance(value, list):
+                command = _PROPERTY_COMMANDS.get(prop)
+                if command is not None and value:
+                    if prop in _DEP_FIELDS:
+                        value = [_dep_name(v) for v in value]
+                    values = " ".join(str(v) for v in value)
+                    lines.append(inner + command.format(name=name, values=values))
+            elif prop == "output_name" and value is not None:
+                lines.append(
+                    f'{inner}set_target_properties({name} PROPERTIES OUTPUT_NAME "{value}")'
+                )
+        for prop, items in block.removals.items():
+            property_name = _PROPERTY_NAMES.get(prop)
+            if property_name is None:
+                continue
+            if prop in _DEP_FIELDS:
+                items = [_dep_name(item) for item in items]
+            removed = " ".join(str(item) for item in items)
+            lines.append(f"{inner}get_target_property(_values {name} {property_name})")
+            lines.append(f"{inner}list(REMOVE_ITEM _values {removed})")
+            lines.append(
+                f'{inner}set_target_properties({name} PROPERTIES {property_name} "${{_values}}")'
+            )
+        for nested in block.conditions:
+            self._generate_block(lines, name, nested, inner)
+        lines.append(f"{indent}endif()")
+
     def _get_visibility(self, target: Target) -> str:
         if target.public_deps:
             return "PUBLIC"
@@ -84,5 +251,5 @@ class CMakeGenerator:
         if all_deps:
             lines.append(f"target_link_libraries({target.name}")
             for dep, vis in all_deps:
-                lines.append(f"  {dep}")
+                lines.append(f"  {_dep_name(dep)}")
             lines.append(")")
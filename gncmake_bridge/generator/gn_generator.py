@@ -1,11 +1,35 @@
-from gncmake_bridge.ir import Target, TargetType
+from typing import Any
+
+from gncmake_bridge.ir import ConditionBlock, Label, MultiToolchainTarget, Target, TargetType
+
+# Target fields of GN properties that are named differently.
+_PROPERTY_FIELDS = {"cflags": "compile_flags", "ldflags": "link_flags"}
+_DEP_PROPERTIES = frozenset(("deps", "public_deps", "private_deps", "data_deps"))
+
+
+def _dep_label(dep: str | Label) -> str:
+    # GN labels, relative or absolute, are written as they are; a bare name,
+    # as CMake writes dependencies, is a target in the same directory.
+    if isinstance(dep, Label) or ":" in dep or "/" in dep:
+        return str(dep)
+    return f":{dep}"
 
 
 class GNGenerator:
     def __init__(self, indent: str = "  ") -> None:
         self._indent = indent
 
-    def generate(self, target: Target) -> str:
+    def generate(self, target: Target | MultiToolchainTarget) -> str:
+        """Generate a target; a multi-toolchain target is generated once, with
+        each toolchain's differences in an ``if (current_toolchain == ...)`` block.
+        """
+        if isinstance(target, MultiToolchainTarget):
+            text = self._generate_target(target.to_target())
+            presence = target.presence_condition()
+            if presence is None:
+                return text
+            body = "\n".join(f"{self._indent}{line}" for line in text.split("\n"))
+            return f"if ({presence}) {{\n{body}\n}}"
         lines = [self._generate_target(target)]
         return "\n".join(lines)
 
@@ -28,25 +52,25 @@ class GNGenerator:
         if target.deps:
             lines.append(f"{self._indent}deps = [")
             for dep in target.deps:
-                lines.append(f'{self._indent}  ":{dep}",')
+                lines.append(f'{self._indent}  "{_dep_label(dep)}",')
             lines.append(f"{self._indent}]")
 
         if target.public_deps:
             lines.append(f"{self._indent}public_deps = [")
             for dep in target.public_deps:
-                lines.append(f'{self._indent}  ":{dep}",')
+                lines.append(f'{self._indent}  "{_dep_label(dep)}",')
             lines.append(f"{self._indent}]")
 
         if target.private_deps:
             lines.append(f"{self._indent}private_deps = [")
             for dep in target.private_deps:
-                lines.append(f'{self._indent}  ":{dep}",')
+                lines.append(f'{self._indent}  "{_dep_label(dep)}",')
             lines.append(f"{self._indent}]")
 
         if target.data_deps:
             lines.append(f"{self._indent}data_deps = [")
             for dep in target.data_deps:
-                lines.append(f'{self._indent}  "{dep}",')
+                lines.append(f'{self._indent}  "{_dep_label(dep)}",')
             lines.append(f"{self._indent}]")
 
         if target.compile_flags:
@@ -112,9 +136,61 @@ class GNGenerator:
                 f'"{target.response_file_name}"'
             )
 
+        if target.conditions:
+            self._generate_conditions(lines, target)
+
         lines.append("}")
         return "\n".join(lines)
 
+    def _generate_conditions(self, lines: list[str], target: Target) -> None:
+        # GN cannot append to an undefined list, so lists that only condition
+        # blocks add to are declared empty first.
+        declared: set[str] = set()
+        pending = list(target.conditions)
+        while pending:
+            block = pending.pop()
+            pending.extend(block.conditions)
+            for name, value in [*block.properties.items(), *block.removals.items()]:
+                if isinstance(value, list) and not getattr(
+                    target, _PROPERTY_FIELDS.get(name, name), None
+                ):
+                    declared.add(name)
+        for name in sorted(declared):
+            lines.append(f"{self._indent}{name} = []")
+        for block in target.conditions:
+            self._generate_block(lines, block, self._indent)
+
+    def _generate_block(self, lines: list[str], block: ConditionBlock, indent: str) -> None:
+        inner = indent + self._indent
+        lines.append(f"{indent}if ({block.condition}) {{")
+        for name, value in block.properties.items():
+            if isinstance(value, list):
+                self._generate_list(lines, name, value, inner, "+=")
+            elif value is not None and not isinstance(value, dict):
+                lines.append(f"{inner}{name} = {self._scalar(value)}")
+        for name, items in block.removals.items():
+            self._generate_list(lines, name, items, inner, "-=")
+        for nested in block.conditions:
+            self._generate_block(lines, nested, inner)
+        lines.append(f"{indent}}}")
+
+    def _generate_list(
+        self, lines: list[str], name: str, values: list[Any], indent: str, op: str
+    ) -> None:
+        if name in _DEP_PROPERTIES:
+            values = [_dep_label(value) for value in values]
+        lines.append(f"{indent}{name} {op} [")
+        for value in values:
+            lines.append(f"{indent}  {self._scalar(value)},")
+        lines.append(f"{indent}]")
+
+    def _scalar(self, value: Any) -> str:
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, int):
+            return str(value)
+        return f'"{value}"'
+
     def _type_to_string(self, target_type: TargetType) -> str:
         type_map = {
             TargetType.EXECUTABLE: "executable",
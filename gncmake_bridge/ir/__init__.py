@@ -1,11 +1,28 @@
+from gncmake_bridge.ir.graph import BuildGraph
+from gncmake_bridge.ir.label import Label
+from gncmake_bridge.ir.reachability import Reachability
+from gncmake_bridge.ir.table import TargetTable, TargetView
 from gncmake_bridge.ir.target import ConditionBlock, Target, TargetType
 from gncmake_bridge.ir.template import GNCondition, GNConfig, GNImport, GNTemplate
-from gncmake_bridge.ir.toolchain import Toolchain
+from gncmake_bridge.ir.toolchain import (
+    MultiToolchainTarget,
+    Toolchain,
+    ToolchainDelta,
+    merge_toolchain_targets,
+)
 
 __all__ = [
+    "Label",
+    "BuildGraph",
+    "Reachability",
     "Target",
     "TargetType",
+    "TargetTable",
+    "TargetView",
     "Toolchain",
+    "ToolchainDelta",
+    "MultiToolchainTarget",
+    "merge_toolchain_targets",
     "GNTemplate",
     "GNCondition",
     "GNConfig",
@@ -0,0 +1,338 @@
+"""The dependency graph of a set of targets.
+
+A :class:`BuildGraph` numbers targets ``0..n-1`` in the order they are given
+and stores the edges of each dependency kind (``deps``, ``public_deps``,
+``private_deps`` and ``data_deps``) as adjacency arrays: an ``array('I')``
+of target ids per kind holding every target's dependencies back to back,
+plus an ``array('I')`` of offsets at which each target's dependencies start.
+Building it is a single pass over the dependency lists.
+
+Dependencies are resolved as labels relative to the depending target's
+directory. A bare name that names no target there, as CMake dependencies
+do, falls back to the first target of that name anywhere; anything else,
+such as ``pthread`` or ``Threads::Threads``, is an external dependency and
+is kept in :attr:`BuildGraph.unresolved`.
+
+Cycles are found with Tarjan's strongly connected components, run without
+recursion so deep chains do not hit the recursion limit. Transitive
+dependencies are bitsets, Python ints with bit ``i`` set for target ``i``.
+They are computed on the first query, for the queried target and for every
+target it reaches, with the same Tarjan walk: components come out
+dependencies first, so each component's bitset is the union of bitsets
+already known. Later queries for any of those targets are a dict lookup.
+"""
+import heapq
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+from gncmake_bridge.exceptions import DependencyCycleError, ParseError
+from gncmake_bridge.ir.label import Label
+from gncmake_bridge.ir.target import Target
+
+DEP_KINDS = ("deps", "public_deps", "private_deps", "data_deps")
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Indices of the set bits of ``bits``, in increasing order."""
+    # Scanning the binary text is linear in the size of the bitset; clearing
+    # the lowest bit one at a time would copy the whole int for every bit.
+    text = bin(bits)[:1:-1]
+    index = text.find("1")
+    while index != -1:
+        yield index
+        index = text.find("1", index + 1)
+
+
+class BuildGraph:
+    """Targets and their dependency edges, with cycle, order and reachability queries.
+
+    Attributes:
+        labels: Label of each target, by id.
+        targets: Each target, by id.
+        offsets: For each dependency kind, where each target's edges start,
+            plus the end of the last one.
+        edges: For each dependency kind, the ids of every target's dependencies.
+        unresolved: Dependencies naming no target in the graph, by target id.
+    """
+
+    def __init__(self) -> None:
+        self.labels: list[Label] = []
+        self.targets: list[Target] = []
+        self.offsets = {kind: array("I", [0]) for kind in DEP_KINDS}
+        self.edges = {kind: array("I") for kind in DEP_KINDS}
+        self.unresolved: dict[int, list[str]] = {}
+        self._ids: dict[Label, int] = {}
+        self._closures: dict[tuple[str, ...], dict[int, int]] = {}
+
+    @classmethod
+    def from_targets(
+        cls, targets: Iterable[Target] | Mapping[str, Target] | Mapping[Label, Target]
+    ) -> "BuildGraph":
+        """Build the graph of parser output: a list of targets or targets by label.
+
+        Targets given without labels are labeled ``//:name``.
+        """
+        graph = cls()
+        if isinstance(targets, Mapping):
+            items = [
+                (label if isinstance(label, Label) else Label.parse(label), target)
+                for label, target in targets.items()
+            ]
+        else:
+            items = [(Label.get("//", target.name), target) for target in targets]
+        by_name: dict[str, int] = {}
+        for label, target in items:
+            node = graph._ids.setdefault(label, len(graph.labels))
+            if node == len(graph.labels):
+                graph.labels.append(label)
+                graph.targets.append(target)
+                by_name.setdefault(label.name, node)
+        for node, (label, target) in enumerate(zip(graph.labels, graph.targets)):
+            for kind in DEP_KINDS:
+                edges = graph.edges[kind]
+                for dep in getattr(target, kind):
+                    dep_node = graph._resolve(dep, label, by_name)
+                    if dep_node is None:
+                        graph.unresolved.setdefault(node, []).append(dep)
+                    else:
+                        edges.append(dep_node)
+                graph.offsets[kind].append(len(edges))
+        return graph
+
+    def _resolve(self, dep: str, label: Label, by_name: dict[str, int]) -> int | None:
+        try:
+            node = self._ids.get(Label.parse(dep, label.directory, label.toolchain))
+        except ParseError:
+            return None
+        if node is None and ":" not in dep and "/" not in dep:
+            node = by_name.get(dep)
+        return node
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._ids
+
+    def node(self, label: str | Label) -> int:
+        """Id of the target labeled ``label``.
+
+        Raises:
+            KeyError: If no target has the label.
+        """
+        return self._ids[label]  # type: ignore[index]
+
+    def successors(self, node: int, kinds: Sequence[str] = DEP_KINDS) -> list[int]:
+        """Ids of the direct dependencies of ``node`` of the given kinds."""
+        result: list[int] = []
+        for kind in kinds:
+            offsets = self.offsets[kind]
+            result.extend(self.edges[kind][offsets[node] : offsets[node + 1]])
+        return result
+
+    def _adjacency(self, kinds: Sequence[str]) -> list[list[int]]:
+        # Successor lists of every node for the given kinds.
+        adjacency: list[list[int]] = [[] for _ in self.labels]
+        for kind in kinds:
+            offsets, edges = self.offsets[kind], self.edges[kind]
+            for node, successors in enumerate(adjacency):
+                start, stop = offsets[node], offsets[node + 1]
+                if start != stop:
+                    successors.extend(edges[start:stop])
+        return adjacency
+
+    def strongly_connected_components(
+        self, kinds: Sequence[str] = DEP_KINDS
+    ) -> list[list[int]]:
+        """The strongly connected components, dependencies before dependents."""
+        components: list[list[int]] = []
+        _tarjan(range(len(self)), self._adjacency(kinds), {}, components.append)
+        return components
+
+    def cycles(self, kinds: Sequence[str] = DEP_KINDS) -> list[list[Label]]:
+        """One dependency cycle through each component that has any.
+
+        Each cycle starts at the component's first target and ends with it
+        again, e.g. ``[//a:a, //b:b, //a:a]``.
+        """
+        adjacency = self._adjacency(kinds)
+        components: list[list[int]] = []
+        _tarjan(range(len(self)), adjacency, {}, components.append)
+        cycles = []
+        for component in components:
+            start = min(component)
+            if len(component) == 1 and start not in adjacency[start]:
+                continue
+            path = _shortest_cycle(start, set(component), adjacency)
+            cycles.append([self.labels[node] for node in path])
+        cycles.sort(key=lambda cycle: self._ids[cycle[0]])
+        return cycles
+
+    def topological_order(self, kinds: Sequence[str] = DEP_KINDS) -> list[Label]:
+        """Every label, each after all of its dependencies.
+
+        Among targets whose dependencies are all placed, the one given first
+        comes first, so the order depends only on the input.
+
+        Raises:
+            DependencyCycleError: If the targets have a dependency cycle.
+        """
+        adjacency = self._adjacency(kinds)
+        dependents: list[list[int]] = [[] for _ in self.labels]
+        remaining = [0] * len(self)
+        for node, successors in enumerate(adjacency):
+            distinct = set(successors)
+            for dep in distinct:
+                dependents[dep].append(node)
+            remaining[node] = len(distinct)
+        ready = [node for node, count in enumerate(remaining) if not count]
+        heapq.heapify(ready)
+        order: list[Label] = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(self.labels[node])
+            for dependent in dependents[node]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    heapq.heappush(ready, dependent)
+        if len(order) != len(self):
+            raise DependencyCycleError(self.cycles(kinds)[0])
+        return order
+
+    def check_acyclic(self, kinds: Sequence[str] = DEP_KINDS) -> None:
+        """Raise DependencyCycleError with the first cycle, if there is one."""
+        cycles = self.cycles(kinds)
+        if cycles:
+            raise DependencyCycleError(cycles[0])
+
+    def closure(self, node: int, kinds: Sequence[str] = DEP_KINDS) -> int:
+        """Bitset of every target ``node`` depends on, directly or not.
+
+        ``node`` itself is included only if it is on a cycle.
+        """
+        key = tuple(kinds)
+        memo = self._closures.get(key)
+        if memo is None:
+            memo = self._closures[key] = {}
+        bits = memo.get(node)
+        if bits is None:
+
+            def successors(member: int) -> list[int]:
+                return self.successors(member, key)
+
+            def finish(component: list[int]) -> None:
+                bits = 0
+                for member in component:
+                    for dep in successors(member):
+                        bits |= (1 << dep) | memo.get(dep, 0)
+                for member in component:
+                    memo[member] = bits
+
+            _tarjan((node,), _LazyAdjacency(successors), memo, finish)
+            bits = memo[node]
+        return bits
+
+    def transitive_deps(self, label: str | Label, kinds: Sequence[str] = DEP_KINDS) -> list[Label]:
+        """Labels of every target ``label`` depends on, directly or not, in id order.
+
+        Raises:
+            KeyError: If no target has the label.
+        """
+        labels = self.labels
+        return [labels[node] for node in iter_bits(self.closure(self.node(label), kinds))]
+
+    def transitive_public_deps(self, label: str | Label) -> list[Label]:
+        """Labels reached from ``label`` through ``public_deps`` only.
+
+        These are the targets whose public configs and headers ``label``
+        passes on to its dependents.
+        """
+        return self.transitive_deps(label, ("public_deps",))
+
+
+class _LazyAdjacency:
+    # Successor lists computed on access, for walks that visit few nodes.
+
+    __slots__ = ("_successors",)
+
+    def __init__(self, successors: Callable[[int], list[int]]) -> None:
+        self._successors = successors
+
+    def __getitem__(self, node: int) -> list[int]:
+        return self._successors(node)
+
+
+def _tarjan(
+    roots: Iterable[int],
+    adjacency: "Sequence[list[int]] | _LazyAdjacency",
+    done: Mapping[int, object],
+    emit: Callable[[list[int]], None],
+) -> None:
+    # Tarjan's algorithm with an explicit stack. Nodes in ``done`` were
+    # finished by an earlier walk and are not entered again. Components are
+    # emitted as they complete, so every component reachable from one is
+    # emitted before it.
+    index: dict[int, int] = {}
+    lowlink: dict[int, int] = {}
+    on_stack: set[int] = set()
+    stack: list[int] = []
+    for root in roots:
+        if root in index or root in done:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adjacency[root]))]
+        while work:
+            node, successors = work[-1]
+            for dep in successors:
+                if dep in done:
+                    continue
+                if dep not in index:
+                    index[dep] = lowlink[dep] = len(index)
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(adjacency[dep])))
+                    break
+                if dep in on_stack and index[dep] < lowlink[node]:
+                    lowlink[node] = index[dep]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    emit(component)
+
+
+def _shortest_cycle(start: int, members: set[int], adjacency: list[list[int]]) -> list[int]:
+    # Breadth-first search inside one component from ``start`` back to itself.
+    parents: dict[int, int] = {}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for node in frontier:
+            for dep in adjacency[node]:
+                if dep not in members:
+                    continue
+                if dep == start:
+                    path = [start]
+                    while node != start:
+                        path.append(node)
+                        node = parents[node]
+                    path.append(start)
+                    path.reverse()
+                    return path
+                if dep not in parents:
+                    parents[dep] = node
+                    next_frontier.append(dep)
+        frontier = next_frontier
+    raise AssertionError("component without a cycle")
@@ -0,0 +1,161 @@
+"""Canonical, interned GN labels.
+
+A label names a target: ``//base/util:util``, plus ``(//build/toolchain:arm64)``
+when it is built by a toolchain other than the current one. The same target
+can be written many ways: ``:util`` or ``util`` relative to the current
+directory, ``//base/util`` with the name implied by the last directory, or
+``../util:util``. :meth:`Label.parse` reduces all of them to one canonical
+label.
+
+Labels are interned in a process-wide table: there is one Label object per
+canonical label, numbered by an integer ``id``, so comparing two labels is
+an identity check. A label also compares equal to, and hashes like, its
+canonical text, so a dict keyed by labels can still be looked up with
+strings such as ``"//base/util:util"``.
+"""
+import posixpath
+from typing import Any
+
+from gncmake_bridge.exceptions import ParseError
+
+
+def _source_directory(text: str, relative: str) -> str:
+    # ``relative`` is a directory relative to the source root.
+    normalized = posixpath.normpath(relative) if relative else "."
+    if normalized == "." or normalized == "/":
+        return "//"
+    if normalized == ".." or normalized.startswith("../"):
+        raise ParseError(f"Invalid label {text!r}: outside the source root")
+    return "//" + normalized.lstrip("/")
+
+
+class Label:
+    """A canonical label: a directory such as ``//base``, a name and an optional toolchain.
+
+    Labels are created by :meth:`parse` and :meth:`get`, never directly.
+    """
+
+    __slots__ = ("id", "directory", "name", "toolchain", "_text", "_hash")
+
+    id: int
+    directory: str
+    name: str
+    toolchain: "Label | None"
+    _text: str
+    _hash: int
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "Label":
+        raise TypeError("use Label.parse() or Label.get()")
+
+    @classmethod
+    def get(cls, directory: str, name: str, toolchain: "Label | None" = None) -> "Label":
+        """The label of target ``name`` in canonical ``directory``, e.g. ``//base``."""
+        key = (directory, name, toolchain)
+        label = _LABELS.get(key)
+        if label is None:
+            label = object.__new__(cls)
+            label.id = len(_BY_ID)
+            label.directory = directory
+            label.name = name
+            label.toolchain = toolchain
+            text = f"{directory}:{name}"
+            label._text = f"{text}({toolchain})" if toolchain is not None else text
+            label._hash = hash(label._text)
+            _LABELS[key] = label
+            _BY_ID.append(label)
+        return label
+
+    @classmethod
+    def from_id(cls, label_id: int) -> "Label":
+        """The label numbered ``label_id``."""
+        return _BY_ID[label_id]
+
+    @classmethod
+    def parse(
+        cls,
+        text: str,
+        current_dir: str = "//",
+        current_toolchain: "Label | None" = None,
+    ) -> "Label":
+        """Canonicalize ``text`` as written in a file in ``current_dir``.
+
+        A label without a toolchain gets ``current_toolchain``. A bare name
+        without ``:`` or ``/``, such as a CMake target name, names a target
+        in ``current_dir``; in GN it would name a directory, but GN files
+        write same-directory dependencies as ``:name``.
+
+        Raises:
+            ParseError: If ``text`` is not a valid label.
+        """
+        key = (text, current_dir, current_toolchain)
+        label = _PARSED.get(key)
+        if label is None:
+            label = _PARSED[key] = cls._parse(text, current_dir, current_toolchain)
+        return label
+
+    @classmethod
+    def _parse(
+        cls, text: str, current_dir: str, current_toolchain: "Label | None"
+    ) -> "Label":
+        toolchain = current_toolchain
+        body = text
+        if text.endswith(")") and "(" in text:
+            body, _, toolchain_text = text[:-1].partition("(")
+            toolchain = cls.parse(toolchain_text, current_dir)
+        path, colon, name = body.rpartition(":")
+        if not colon:
+            path, name = body, ""
+            if "/" not in body and body not in ("", ".", ".."):
+                path, name = "", body
+        elif "/" in name:
+            raise ParseError(f"Invalid label {text!r}: name contains '/'")
+
+        if path.startswith("//"):
+            directory = _source_directory(text, path[2:])
+        elif path.startswith("/"):
+            directory = posixpath.normpath(path)
+        elif current_dir.startswith("//"):
+            directory = _source_directory(text, posixpath.join(current_dir[2:], path))
+        else:
+            directory = posixpath.normpath(posixpath.join(current_dir, path))
+        if not name:
+            name = directory.rpartition("/")[2]
+            if not name:
+                raise ParseError(f"Invalid label {text!r}: no target name")
+        return cls.get(directory, name, toolchain)
+
+    def relative_to(self, directory: str, toolchain: "Label | None" = None) -> str:
+        """The shortest way to write the label in a file in ``directory`` built by ``toolchain``."""
+        if self.toolchain is not toolchain:
+            return self._text
+        if self.directory == directory:
+            return f":{self.name}"
+        return f"{self.directory}:{self.name}"
+
+    def __eq__(self, other: object) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, str):
+            return other == self._text
+        return False
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __lt__(self, other: "Label") -> bool:
+        return self._text < other._text
+
+    def __str__(self) -> str:
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"Label({self._text!r})"
+
+    def __reduce__(self) -> Any:
+        # Unpickled labels are interned in the receiving process.
+        return Label.get, (self.directory, self.name, self.toolchain)
+
+
+_LABELS: dict[tuple[str, str, Label | None], Label] = {}
+_BY_ID: list[Label] = []
+_PARSED: dict[tuple[str, str, Label | None], Label] = {}
@@ -0,0 +1,335 @@
+"""Reachability over the whole dependency graph, with NumPy when it is installed.
+
+:class:`BuildGraph` answers transitive queries one target at a time. Some
+callers want them for every target at once, e.g. the transitive link line
+of every binary, or the targets affected by a set of changed ones. A
+:class:`Reachability` answers these over chosen edge kinds, by default the
+link dependencies ``deps`` and ``public_deps``.
+
+With NumPy, the edges are copied once from the graph's adjacency arrays
+into CSR arrays: ``indptr`` of where each target's dependencies start and
+``indices`` of the dependencies, plus the same for the reversed edges.
+
+- Frontier expansion visits one whole frontier per step. The neighbours of
+  every frontier node are gathered from ``indices`` in one vectorized
+  operation.
+- All-pairs reachability is a matrix of rows packed 64 targets to a word.
+  Rows are computed in level order. The level of a target is the length of
+  its longest dependency chain, so a level only reads rows that are complete.
+- Each level is processed as a batch. The rows of the dependencies of all
+  its edges are gathered into one block and ORed into the depending rows.
+- An acyclic graph is split into levels by peeling dependency-free targets
+  with NumPy, and its rows are computed in place in the result.
+- A graph with cycles is processed per strongly connected component,
+  for one block of columns at a time, so the extra memory stays bounded.
+
+Without NumPy, the same queries are answered with the graph's bitsets, so
+callers need not care which backend they get.
+"""
+from collections.abc import Iterable, Sequence
+from typing import Any, cast
+
+from gncmake_bridge.exceptions import UnsupportedFeatureError
+from gncmake_bridge.ir.graph import BuildGraph, iter_bits
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None  # type: ignore[assignment]
+
+HAS_NUMPY = np is not None
+LINK_KINDS = ("deps", "public_deps")
+# Bytes of the reachability rows, and of a batch of gathered rows, held at a
+# time; all-pairs columns are computed in blocks that fit.
+_BLOCK_BYTES = 64 << 20
+
+
+class Reachability:
+    """Reachability queries over ``kinds`` edges of a :class:`BuildGraph`.
+
+    ``backend`` is ``"numpy"``, ``"python"``, or None for NumPy when it is
+    installed. Results are target ids, or bitsets as from
+    :meth:`BuildGraph.closure`, whichever backend computes them.
+
+    Raises:
+        UnsupportedFeatureError: If the NumPy backend is asked for without NumPy.
+    """
+
+    def __init__(
+        self,
+        graph: BuildGraph,
+        kinds: Sequence[str] = LINK_KINDS,
+        backend: str | None = None,
+    ) -> None:
+        if backend is None:
+            backend = "numpy" if HAS_NUMPY else "python"
+        if backend == "numpy" and not HAS_NUMPY:
+            raise UnsupportedFeatureError("The numpy reachability backend requires NumPy")
+        if backend not in ("numpy", "python"):
+            raise ValueError(f"Unknown reachability backend: {backend}")
+        self.graph = graph
+        self.kinds = tuple(kinds)
+        self.backend = backend
+        self._reverse: list[list[int]] | None = None
+        if backend == "numpy":
+            sources, targets = _edge_arrays(graph, self.kinds)
+            self.indptr, self.indices = _csr(sources, targets, len(graph))
+            self.reverse_indptr, self.reverse_indices = _csr(targets, sources, len(graph))
+
+    def reachable(self, nodes: Iterable[int]) -> list[int]:
+        """Sorted ids of every target some of ``nodes`` depends on, directly or not."""
+        if self.backend == "numpy":
+            ids = _expand(self.indptr, self.indices, nodes, len(self.graph))
+            return cast(list[int], ids.tolist())
+        bits = 0
+        for node in nodes:
+            bits |= self.graph.closure(node, self.kinds)
+        return list(iter_bits(bits))
+
+    def dependents(self, nodes: Iterable[int]) -> list[int]:
+        """Sorted ids of every target depending on some of ``nodes``, directly or not.
+
+        These are the targets affected when ``nodes`` change.
+        """
+        if self.backend == "numpy":
+            ids = _expand(self.reverse_indptr, self.reverse_indices, nodes, len(self.graph))
+            return cast(list[int], ids.tolist())
+        if self._reverse is None:
+            self._reverse = [[] for _ in range(len(self.graph))]
+            for node in range(len(self.graph)):
+                for dep in self.graph.successors(node, self.kinds):
+                    self._reverse[dep].append(node)
+        reverse = self._reverse
+        seen: set[int] = set()
+        frontier = list(nodes)
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for dependent in reverse[node]:
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        next_frontier.append(dependent)
+            frontier = next_frontier
+        return sorted(seen)
+
+    def closure(self, node: int) -> int:
+        """Bitset of every target ``node`` depends on, as :meth:`BuildGraph.closure`."""
+        if self.backend == "numpy":
+            return _to_bits(_expand(self.indptr, self.indices, (node,), len(self.graph)))
+        return self.graph.closure(node, self.kinds)
+
+    def all_pairs(self) -> list[int]:
+        """Bitset of every target each target depends on, by id."""
+        if self.backend == "python":
+            return [self.graph.closure(node, self.kinds) for node in range(len(self.graph))]
+        matrix = self.matrix()
+        return [int.from_bytes(row.tobytes(), "little") for row in matrix]
+
+    def matrix(self) -> Any:
+        """The all-pairs reachability matrix, one row of little-endian bits per target.
+
+        Row ``i`` is an ``uint64`` array in which bit ``j`` is set if target
+        ``i`` depends on target ``j``. Only the NumPy backend has it.
+
+        Raises:
+            UnsupportedFeatureError: If the backend is not NumPy.
+        """
+        if self.backend != "numpy":
+            raise UnsupportedFeatureError("The reachability matrix requires the numpy backend")
+        return _all_pairs(
+            self.graph,
+            self.kinds,
+            (self.indptr, self.indices),
+            (self.reverse_indptr, self.reverse_indices),
+        )
+
+
+def _edge_arrays(graph: BuildGraph, kinds: Sequence[str]) -> tuple[Any, Any]:
+    # Source and target id of every edge of the given kinds, read from the
+    # graph's arrays without copying them into Python objects.
+    count = len(graph)
+    sources = []
+    targets = []
+    for kind in kinds:
+        offsets = np.frombuffer(graph.offsets[kind], dtype=np.uint32).astype(np.int64)
+        edges = np.frombuffer(graph.edges[kind], dtype=np.uint32).astype(np.int64)
+        sources.append(np.repeat(np.arange(count, dtype=np.int64), np.diff(offsets)))
+        targets.append(edges)
+    empty = np.zeros(0, dtype=np.int64)
+    return np.concatenate([empty, *sources]), np.concatenate([empty, *targets])
+
+
+def _csr(sources: Any, targets: Any, count: int) -> tuple[Any, Any]:
+    # Edges sorted by source, keeping the order of each source's edges.
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=count), out=indptr[1:])
+    return indptr, targets[order]
+
+
+def _gather(indptr: Any, indices: Any, nodes: Any) -> Any:
+    # The neighbours of every node in ``nodes``, concatenated.
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return indices[np.arange(total, dtype=np.int64) + shift]
+
+
+def _expand(indptr: Any, indices: Any, nodes: Iterable[int], count: int) -> Any:
+    # Breadth-first search one frontier at a time. The start nodes are in the
+    # result only if they are reached again, as for BuildGraph.closure.
+    visited = np.zeros(count, dtype=bool)
+    frontier = np.unique(np.fromiter(nodes, dtype=np.int64))
+    while frontier.size:
+        reached = _gather(indptr, indices, frontier)
+        frontier = np.unique(reached[~visited[reached]])
+        visited[frontier] = True
+    return np.flatnonzero(visited)
+
+
+def _to_bits(nodes: Any) -> int:
+    # A bitset with the bits of ``nodes`` set.
+    if not nodes.size:
+        return 0
+    bits = np.zeros(int(nodes[-1]) + 1, dtype=np.uint8)
+    bits[nodes] = 1
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def _levels(
+    graph: BuildGraph, kinds: Sequence[str], indptr: Any, indices: Any
+) -> tuple[Any, Any, Any]:
+    # Component of each node, whether each component is on a cycle, and
+    # the level of each component: 0 without dependencies, else one more
+    # than the highest level among its dependencies. Tarjan's order puts
+    # every component after its dependencies.
+    components = graph.strongly_connected_components(kinds)
+    component_of = [0] * len(graph)
+    for index, members in enumerate(components):
+        for member in members:
+            component_of[member] = index
+    starts, deps = indptr.tolist(), indices.tolist()
+    cyclic = [False] * len(components)
+    levels = [0] * len(components)
+    for index, members in enumerate(components):
+        level = -1
+        for member in members:
+            for dep in deps[starts[member] : starts[member + 1]]:
+                dep_component = component_of[dep]
+                if dep_component == index:
+                    cyclic[index] = True
+                elif levels[dep_component] > level:
+                    level = levels[dep_component]
+        levels[index] = level + 1
+    return (
+        np.array(component_of, dtype=np.int64),
+        np.array(cyclic, dtype=bool),
+        np.array(levels, dtype=np.int64),
+    )
+
+
+def _or_dependencies(closed: Any, sources: Any, targets: Any) -> None:
+    # closed[s] |= closed[t] for every edge, for edges sorted by source whose
+    # targets are not among the sources. np.bitwise_or.reduceat over rows is
+    # slow, so the runs of edges of each source are sorted longest first and
+    # their i-th edges are ORed in for all runs at once, in place.
+    runs = np.flatnonzero(np.diff(sources, prepend=-1))
+    lengths = np.diff(np.append(runs, len(sources)))
+    order = np.argsort(-lengths, kind="stable")
+    runs, lengths = runs[order], lengths[order]
+    rows = closed[targets[runs]]
+    for index in range(1, int(lengths[0])):
+        active = int(np.searchsorted(-lengths, -index))
+        rows[:active] |= closed[targets[runs[:active] + index]]
+    closed[sources[runs]] |= rows
+
+
+def _peel_levels(indptr: Any, indices: Any, reverse_indptr: Any, reverse_indices: Any) -> Any:
+    # The level of every node of an acyclic graph, found by removing the
+    # nodes without remaining dependencies one level at a time; None if
+    # the graph has a cycle, whose nodes are never removed.
+    remaining = np.diff(indptr)
+    levels = np.zeros(len(remaining), dtype=np.int64)
+    frontier = np.flatnonzero(remaining == 0)
+    removed = frontier.size
+    level = 0
+    while frontier.size:
+        levels[frontier] = level
+        dependents, counts = np.unique(
+            _gather(reverse_indptr, reverse_indices, frontier), return_counts=True
+        )
+        remaining[dependents] -= counts
+        frontier = dependents[remaining[dependents] == 0]
+        removed += frontier.size
+        level += 1
+    return levels if removed == len(remaining) else None
+
+
+def _by_level(sources: Any, targets: Any, levels: Any) -> tuple[Any, Any, list[int]]:
+    # Edges sorted by source, reordered by the level of their source, and
+    # where each level's edges start; a stable sort keeps each source's
+    # edges together.
+    order = np.argsort(levels[sources], kind="stable")
+    sources, targets = sources[order], targets[order]
+    top = int(levels.max()) if len(levels) else 0
+    bounds = np.searchsorted(levels[sources], np.arange(1, top + 2)).tolist()
+    return sources, targets, bounds
+
+
+def _propagate(closed: Any, sources: Any, targets: Any, bounds: list[int]) -> None:
+    # Level by level, OR each row with the rows of its dependencies, which
+    # are on lower levels and so already complete.
+    batch_edges = max(1, _BLOCK_BYTES // (8 * closed.shape[1]))
+    for first, last in zip(bounds, bounds[1:]):
+        for batch in range(first, last, batch_edges):
+            end = min(batch + batch_edges, last)
+            _or_dependencies(closed, sources[batch:end], targets[batch:end])
+
+
+def _all_pairs(
+    graph: BuildGraph, kinds: Sequence[str], csr: tuple[Any, Any], reverse: tuple[Any, Any]
+) -> Any:
+    count = len(graph)
+    words = (count + 63) // 64
+    matrix = np.zeros((count, words), dtype="<u8")
+    if not count:
+        return matrix
+    indptr, indices = csr
+    nodes = np.arange(count, dtype=np.int64)
+    sources = np.repeat(nodes, np.diff(indptr))
+
+    levels = _peel_levels(indptr, indices, *reverse)
+    if levels is not None:
+        # Acyclic: the rows are computed in place in the result. Each row
+        # holds its own bit while dependents read it.
+        bits = np.left_shift(np.uint64(1), (nodes & 63).astype(np.uint64))
+        matrix[nodes, nodes >> 6] = bits
+        _propagate(matrix, *_by_level(sources, indices, levels))
+        matrix[nodes, nodes >> 6] ^= bits
+        return matrix
+
+    # Otherwise rows are computed per strongly connected component, over
+    # the edges between components, for one block of columns at a time.
+    component_of, cyclic, levels = _levels(graph, kinds, indptr, indices)
+    components = len(levels)
+    sources, targets = component_of[sources], component_of[indices]
+    keep = sources != targets
+    keys = np.unique(sources[keep] * components + targets[keep])
+    edges = _by_level(keys // components, keys % components, levels)
+    block_words = max(1, min(words, _BLOCK_BYTES // (8 * components)))
+    for word in range(0, words, block_words):
+        start, stop = word * 64, min((word + block_words) * 64, count)
+        relative = nodes[start:stop] - start
+        bits = np.left_shift(np.uint64(1), (relative & 63).astype(np.uint64))
+        # A component's row holds its own members' bits as well as those of
+        # the targets it reaches.
+        closed = np.zeros((components, (stop - start + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(closed, (component_of[start:stop], relative >> 6), bits)
+        _propagate(closed, *edges)
+        block = matrix[:, word : word + closed.shape[1]]
+        block[:] = closed[component_of]
+        # A target reaches itself only on a cycle.
+        acyclic = ~cyclic[component_of[start:stop]]
+        block[nodes[start:stop][acyclic], relative[acyclic] >> 6] &= ~bits[acyclic]
+    return matrix
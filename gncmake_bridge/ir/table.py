@@ -0,0 +1,328 @@
+"""Columnar storage of many targets.
+
+A :class:`TargetTable` stores targets column by column instead of as one
+Python object per target and per list. Every string is stored once in a
+string table and referred to by a 32-bit id. Each list field of
+:class:`~gncmake_bridge.ir.target.Target` is one ``array('I')`` of string ids
+holding the lists of all targets back to back, plus an ``array('I')`` of
+offsets at which each target's list starts. A million-target table is then
+a few dozen arrays rather than tens of millions of objects.
+
+``table[i]`` is a :class:`TargetView`, which reads the columns on access and
+has the attributes and methods of a Target. Filters such as
+:meth:`TargetTable.with_flag` search a whole column at once: the id is
+looked for in the column's raw bytes, in C, and only the matches are mapped
+back to targets.
+"""
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import fields
+from typing import Any, overload
+
+from gncmake_bridge.ir.label import Label
+from gncmake_bridge.ir.target import ConditionBlock, Target, TargetType
+
+LIST_COLUMNS = tuple(f.name for f in fields(Target) if f.type == list[str])
+_STRING_COLUMNS = ("output_name", "script", "response_file_name")
+_FLAG_COLUMNS = ("testonly", "complete_static_lib")
+_DEP_COLUMNS = ("deps", "public_deps", "private_deps", "data_deps")
+_TYPES = tuple(TargetType)
+_TYPE_CODES = {target_type: code for code, target_type in enumerate(_TYPES)}
+# String id of an unset optional string.
+_NONE = 0xFFFFFFFF
+
+
+class StringColumnSlice(Sequence[str]):
+    """One target's list in a column, read from the table without copying."""
+
+    __slots__ = ("_strings", "_ids", "_start", "_stop")
+
+    def __init__(self, strings: list[str], ids: "array[int]", start: int, stop: int) -> None:
+        self._strings = strings
+        self._ids = ids
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._strings[self._ids[self._start + index]]
+
+    def __iter__(self) -> Iterator[str]:
+        strings, ids = self._strings, self._ids
+        return (strings[ids[i]] for i in range(self._start, self._stop))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, tuple, StringColumnSlice)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _ListColumn:
+    # A list field of TargetView.
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, view: "TargetView", owner: type | None = None) -> StringColumnSlice:
+        table = view.table
+        offsets, ids = table.offsets[self.name], table.ids[self.name]
+        index = view.index
+        return StringColumnSlice(table.strings, ids, offsets[index], offsets[index + 1])
+
+
+class _StringColumn:
+    # An optional string field of TargetView.
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, view: "TargetView", owner: type | None = None) -> str | None:
+        string_id = view.table.scalars[self.name][view.index]
+        return None if string_id == _NONE else view.table.strings[string_id]
+
+
+class _FlagColumn:
+    # A boolean field of TargetView.
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, view: "TargetView", owner: type | None = None) -> bool:
+        return bool(view.table.scalars[self.name][view.index])
+
+
+class TargetView:
+    """Row ``index`` of a :class:`TargetTable`, with the attributes and methods of a Target.
+
+    Fields are read from the table's columns when accessed; list fields are
+    :class:`StringColumnSlice` sequences. :meth:`to_target` copies the row
+    into a Target.
+    """
+
+    __slots__ = ("table", "index")
+
+    sources = _ListColumn()
+    headers = _ListColumn()
+    deps = _ListColumn()
+    public_deps = _ListColumn()
+    private_deps = _ListColumn()
+    data_deps = _ListColumn()
+    compile_flags = _ListColumn()
+    link_flags = _ListColumn()
+    include_dirs = _ListColumn()
+    defines = _ListColumn()
+    visibility = _ListColumn()
+    configs = _ListColumn()
+    inputs = _ListColumn()
+    outputs = _ListColumn()
+    output_name = _StringColumn()
+    script = _StringColumn()
+    response_file_name = _StringColumn()
+    testonly = _FlagColumn()
+    complete_static_lib = _FlagColumn()
+
+    is_valid = Target.is_valid
+    is_library = Target.is_library
+    is_binary = Target.is_binary
+
+    def __init__(self, table: "TargetTable", index: int) -> None:
+        self.table = table
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self.table.strings[self.table.names[self.index]]
+
+    @property
+    def label(self) -> str:
+        return self.table.strings[self.table.labels[self.index]]
+
+    @property
+    def type(self) -> TargetType:
+        return _TYPES[self.table.types[self.index]]
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self.table.metadata.get(self.index, {})
+
+    @property
+    def conditions(self) -> list[ConditionBlock]:
+        return self.table.conditions.get(self.index, [])
+
+    def to_target(self) -> Target:
+        values: dict[str, Any] = {
+            name: list(getattr(self, name)) for name in LIST_COLUMNS
+        }
+        for name in (*_STRING_COLUMNS, *_FLAG_COLUMNS):
+            values[name] = getattr(self, name)
+        return Target(
+            name=self.name,
+            type=self.type,
+            metadata=dict(self.metadata),
+            conditions=list(self.conditions),
+            **values,
+        )
+
+    def __repr__(self) -> str:
+        return f"TargetView({self.label!r})"
+
+
+class TargetTable:
+    """Targets stored column by column.
+
+    Attributes:
+        strings: The string table; ids index into it.
+        names: String id of each target's name.
+        labels: String id of each target's label (its name unless given).
+        types: Index of each target's type in ``TargetType``.
+        offsets: For each list field, where each target's ids start, plus
+            the end of the last one.
+        ids: For each list field, the string ids of every target's list.
+        scalars: For each optional string field, the string id of each
+            target's value, and for each boolean field, one byte per target.
+        metadata: Metadata of the targets that have any, by index.
+        conditions: Condition blocks of the targets that have any, by index.
+    """
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self.names = array("I")
+        self.labels = array("I")
+        self.types = array("B")
+        self.offsets = {name: array("I", [0]) for name in LIST_COLUMNS}
+        self.ids = {name: array("I") for name in LIST_COLUMNS}
+        self.scalars = {name: array("I") for name in _STRING_COLUMNS}
+        self.scalars.update({name: array("B") for name in _FLAG_COLUMNS})
+        self.metadata: dict[int, dict[str, Any]] = {}
+        self.conditions: dict[int, list[ConditionBlock]] = {}
+        self._label_index: dict[int, int] = {}
+        # Raw bytes of each column searched so far, dropped on append.
+        self._column_bytes: dict[str, bytes] = {}
+
+    @classmethod
+    def from_targets(
+        cls, targets: Iterable[Target] | Mapping[str, Target] | Mapping[Label, Target]
+    ) -> "TargetTable":
+        """Build a table from parser output: a list of targets or targets by label."""
+        table = cls()
+        if isinstance(targets, Mapping):
+            for label, target in targets.items():
+                table.append(target, label)
+        else:
+            for target in targets:
+                table.append(target)
+        return table
+
+    def string_id(self, value: str) -> int:
+        """Id of ``value`` in the string table, adding it if needed."""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def append(self, target: Target, label: str | Label | None = None) -> int:
+        """Add a target, by default labeled with its name; returns its index."""
+        index = len(self.names)
+        string_id = self.string_id
+        self.names.append(string_id(target.name))
+        label_id = string_id(str(label) if label is not None else target.name)
+        self.labels.append(label_id)
+        self._label_index.setdefault(label_id, index)
+        self.types.append(_TYPE_CODES[target.type])
+        for name in LIST_COLUMNS:
+            values = getattr(target, name)
+            ids = self.ids[name]
+            if values:
+                ids.extend([string_id(value) for value in values])
+            self.offsets[name].append(len(ids))
+        for name in _STRING_COLUMNS:
+            value = getattr(target, name)
+            self.scalars[name].append(_NONE if value is None else string_id(value))
+        for name in _FLAG_COLUMNS:
+            self.scalars[name].append(1 if getattr(target, name) else 0)
+        if target.metadata:
+            self.metadata[index] = target.metadata
+        if target.conditions:
+            self.conditions[index] = target.conditions
+        self._column_bytes.clear()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> TargetView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return TargetView(self, index)
+
+    def __iter__(self) -> Iterator[TargetView]:
+        return (TargetView(self, index) for index in range(len(self)))
+
+    def index(self, label: str) -> int:
+        """Index of the first target labeled ``label``.
+
+        Raises:
+            KeyError: If no target has the label.
+        """
+        string_id = self._string_ids.get(label)
+        index = self._label_index.get(string_id) if string_id is not None else None
+        if index is None:
+            raise KeyError(label)
+        return index
+
+    def targets(self) -> list[Target]:
+        """Copy every row into a Target."""
+        return [view.to_target() for view in self]
+
+    def where(self, value: str, columns: Iterable[str]) -> "array[int]":
+        """Sorted indices of the targets whose list in any of ``columns`` holds ``value``."""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            return array("I")
+        needle = array("I", [string_id]).tobytes()
+        size = len(needle)
+        found: set[int] = set()
+        for name in columns:
+            offsets = self.offsets[name]
+            data = self._column_bytes.get(name)
+            if data is None:
+                data = self._column_bytes[name] = self.ids[name].tobytes()
+            position = data.find(needle)
+            while position != -1:
+                if position % size:
+                    # A match straddling two ids.
+                    position = data.find(needle, position + 1)
+                    continue
+                found.add(bisect_right(offsets, position // size) - 1)
+                position = data.find(needle, position + size)
+        return array("I", sorted(found))
+
+    def with_flag(self, flag: str) -> "array[int]":
+        """Sorted indices of the targets with compile or link flag ``flag``."""
+        return self.where(flag, ("compile_flags", "link_flags"))
+
+    def depending_on(self, dep: str) -> "array[int]":
+        """Sorted indices of the targets with ``dep`` in any of their dependency lists."""
+        return self.where(dep, _DEP_COLUMNS)
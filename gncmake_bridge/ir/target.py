@@ -1,5 +1,6 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from enum import Enum
+from sys import intern
 from typing import Any
 
 
@@ -16,15 +17,29 @@ class TargetType(Enum):
 
 @dataclass
 class ConditionBlock:
-    """Represents an if/else condition block."""
+    """Represents an if/else condition block.
+
+    ``properties`` holds what the block adds to the target when the condition
+    holds; ``removals`` holds list entries it removes (GN ``-=``).
+    """
 
     condition: str
     properties: dict[str, Any] = field(default_factory=dict)
     conditions: list["ConditionBlock"] = field(default_factory=list)
+    removals: dict[str, list[str]] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Target:
+    """A build target.
+
+    Target is slotted, so it has no per-instance ``__dict__``. Strings in
+    list fields are interned when the target is created: flags, include
+    directories and dependency labels repeat across thousands of targets and
+    are then stored once. The lists given to the constructor are not
+    changed; the target holds interned copies of them.
+    """
+
     name: str
     type: TargetType
     sources: list[str] = field(default_factory=list)
@@ -49,6 +64,21 @@ class Target:
     testonly: bool = False
     complete_static_lib: bool = False
 
+    def __post_init__(self) -> None:
+        for name in _STRING_LISTS:
+            values = getattr(self, name)
+            if values:
+                setattr(self, name, [intern(v) if type(v) is str else v for v in values])
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in _FIELD_NAMES)
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        # Strings of targets unpickled from worker processes are interned again.
+        for name, value in zip(_FIELD_NAMES, state):
+            setattr(self, name, value)
+        self.__post_init__()
+
     def is_valid(self) -> bool:
         return bool(self.name and self.type != TargetType.UNKNOWN)
 
@@ -61,3 +91,7 @@ class Target:
 
     def is_binary(self) -> bool:
         return self.type == TargetType.EXECUTABLE
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(Target))
+_STRING_LISTS = tuple(f.name for f in fields(Target) if f.type == list[str])
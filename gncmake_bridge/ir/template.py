@@ -9,6 +9,7 @@ class GNTemplate:
     variables: list[str] = field(default_factory=list)
     body: str = ""
     invocation_count: int = 0
+    expansion_seconds: float = 0.0
 
     def is_valid(self) -> bool:
         return bool(self.name and self.variables)
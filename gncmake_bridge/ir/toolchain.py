@@ -1,6 +1,29 @@
-from dataclasses import dataclass, field
+"""Toolchains and targets built for several toolchains at once.
+
+A project is often built for a host toolchain and one or more cross
+toolchains, and most targets come out nearly identical for each of them. A
+:class:`MultiToolchainTarget` holds one shared base :class:`Target` and, per
+toolchain, a small :class:`ToolchainDelta` of what that toolchain's build adds,
+removes or overrides, so that targets are generated once, with the
+differences as conditional blocks.
+"""
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field, fields, replace
 from typing import Any
 
+from gncmake_bridge.exceptions import ConversionError
+from gncmake_bridge.ir.target import ConditionBlock, Target
+
+# GN property names of Target fields that are named differently.
+_GN_PROPERTIES = {"compile_flags": "cflags", "link_flags": "ldflags"}
+_LIST_FIELDS = tuple(
+    f.name for f in fields(Target) if f.type == list[str] or f.name == "conditions"
+)
+_SCALAR_FIELDS = tuple(
+    f.name for f in fields(Target) if f.name not in ("name", "type", *_LIST_FIELDS)
+)
+
 
 @dataclass
 class Toolchain:
@@ -19,3 +42,217 @@ class Toolchain:
 
     def is_valid(self) -> bool:
         return bool(self.name and (self.c_compiler or self.cmake_toolchain_file))
+
+    def label(self) -> str:
+        """GN label of the toolchain: ``name`` if it is one, else ``//build/toolchain:<name>``."""
+        if self.name.startswith("//") or self.name.startswith(":"):
+            return self.name
+        return f"//build/toolchain:{self.name}"
+
+    def condition(self) -> str:
+        """GN condition that holds while building with this toolchain."""
+        return f'current_toolchain == "{self.label()}"'
+
+
+@dataclass
+class ToolchainDelta:
+    """How one toolchain's build of a target differs from the shared base.
+
+    ``additions`` and ``removals`` hold list entries by Target field name,
+    ``overrides`` the scalar fields whose value differs. The toolchain's
+    target is the base with removed entries dropped, added entries appended
+    and overrides applied.
+    """
+
+    additions: dict[str, list[Any]] = field(default_factory=dict)
+    removals: dict[str, list[Any]] = field(default_factory=dict)
+    overrides: dict[str, Any] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not (self.additions or self.removals or self.overrides)
+
+    def apply(self, base: Target) -> Target:
+        """The toolchain's target, built from ``base``."""
+        changes = dict(self.overrides)
+        for name in self.additions.keys() | self.removals.keys():
+            removed = self.removals.get(name, [])
+            changes[name] = [
+                item for item in getattr(base, name) if item not in removed
+            ] + self.additions.get(name, [])
+        return replace(base, **changes)
+
+    def to_condition(self, condition: str) -> ConditionBlock:
+        """A condition block applying the delta, with GN property names.
+
+        Raises:
+            ConversionError: If an override unsets a field, which generated
+                code has no way to express.
+        """
+        properties = {
+            _GN_PROPERTIES.get(name, name): items
+            for name, items in self.additions.items()
+            if name != "conditions"
+        }
+        for name, value in self.overrides.items():
+            if value is None:
+                raise ConversionError(f"Cannot generate an override unsetting {name}")
+            properties[_GN_PROPERTIES.get(name, name)] = value
+        return ConditionBlock(
+            condition=condition,
+            properties=properties,
+            conditions=list(self.additions.get("conditions", [])),
+            removals={
+                _GN_PROPERTIES.get(name, name): items for name, items in self.removals.items()
+            },
+        )
+
+
+def _split_list(
+    name: str, values: list[list[Any]]
+) -> tuple[list[Any], list[tuple[list[Any], list[Any]]]]:
+    # The base list holds the entries that most variants have, in order of
+    # first appearance; each variant removes the base entries it lacks and
+    # appends its own. Variants that order or repeat entries in a way this
+    # cannot reproduce get the whole list from their delta instead.
+    # Condition blocks cannot be removed again, so their base is what every
+    # variant has.
+    if name == "conditions":
+        # Blocks are unhashable; membership is tested by equality.
+        base = [item for item in values[0] if all(item in items for items in values)]
+        members: list[Any] = [base, *values]
+    else:
+        counts: Counter[Any] = Counter()
+        for items in values:
+            for item in dict.fromkeys(items):
+                counts[item] += 1
+        threshold = len(values) // 2 + 1
+        base = [item for item, count in counts.items() if count >= threshold]
+        members = [set(base), *(set(items) for items in values)]
+
+    splits = []
+    for items, present in zip(values, members[1:]):
+        removed = [item for item in base if item not in present]
+        added = [item for item in items if item not in members[0]]
+        if [item for item in base if item in present] + added != items:
+            return [], [([], items) for items in values]
+        splits.append((removed, added))
+    return base, splits
+
+
+@dataclass
+class MultiToolchainTarget:
+    """A target built for several toolchains: a shared base and per-toolchain deltas.
+
+    ``deltas`` is keyed by toolchain name and has no entry for toolchains
+    whose target equals the base. ``absent`` lists the toolchains of the
+    build that do not build this target at all.
+    """
+
+    base: Target
+    toolchains: list[Toolchain]
+    deltas: dict[str, ToolchainDelta] = field(default_factory=dict)
+    absent: list[Toolchain] = field(default_factory=list)
+
+    @classmethod
+    def from_targets(
+        cls, variants: Sequence[tuple[Toolchain, Target]]
+    ) -> "MultiToolchainTarget":
+        """Factor the same target, as built by each toolchain, into base and deltas.
+
+        Raises:
+            ConversionError: If the variants differ in name or type.
+        """
+        if not variants:
+            raise ConversionError("No toolchain variants to merge")
+        toolchains = [toolchain for toolchain, _ in variants]
+        targets = [target for _, target in variants]
+        first = targets[0]
+        for toolchain, target in variants:
+            if (target.name, target.type) != (first.name, first.type):
+                raise ConversionError(
+                    f"Target '{first.name}' ({first.type.value}) is "
+                    f"'{target.name}' ({target.type.value}) for toolchain '{toolchain.name}'"
+                )
+
+        base_values: dict[str, Any] = {}
+        deltas = [ToolchainDelta() for _ in targets]
+        for name in _LIST_FIELDS:
+            values = [getattr(target, name) for target in targets]
+            if all(value == values[0] for value in values):
+                continue
+            base_values[name], splits = _split_list(name, values)
+            for delta, (removed, added) in zip(deltas, splits):
+                if removed:
+                    delta.removals[name] = removed
+                if added:
+                    delta.additions[name] = added
+        for name in _SCALAR_FIELDS:
+            values = [getattr(target, name) for target in targets]
+            if all(value == values[0] for value in values):
+                continue
+            # The most common value goes to the base; ties go to the first.
+            # An unset value always does: generated code cannot unset a
+            # field again, so no delta may override a value with None.
+            if None in values:
+                base_value = None
+            else:
+                base_value = max(values, key=lambda value: sum(v == value for v in values))
+            base_values[name] = base_value
+            for delta, value in zip(deltas, values):
+                if value != base_value:
+                    delta.overrides[name] = value
+
+        return cls(
+            base=replace(first, **base_values),
+            toolchains=toolchains,
+            deltas={
+                toolchain.name: delta
+                for toolchain, delta in zip(toolchains, deltas)
+                if not delta.is_empty()
+            },
+        )
+
+    def target_for(self, toolchain: str) -> Target:
+        """The target as built by the toolchain named ``toolchain``."""
+        if not any(t.name == toolchain for t in self.toolchains):
+            raise KeyError(toolchain)
+        delta = self.deltas.get(toolchain)
+        return delta.apply(self.base) if delta is not None else replace(self.base)
+
+    def to_target(self) -> Target:
+        """The base target with one condition block per toolchain delta."""
+        conditions = list(self.base.conditions)
+        for toolchain in self.toolchains:
+            delta = self.deltas.get(toolchain.name)
+            if delta is not None:
+                conditions.append(delta.to_condition(toolchain.condition()))
+        return replace(self.base, conditions=conditions)
+
+    def presence_condition(self) -> str | None:
+        """GN condition under which the target is built, or None if it always is."""
+        if not self.absent:
+            return None
+        return " || ".join(toolchain.condition() for toolchain in self.toolchains)
+
+
+def merge_toolchain_targets(
+    builds: Iterable[tuple[Toolchain, Mapping[str, Target]]],
+) -> dict[str, MultiToolchainTarget]:
+    """Merge the targets of each toolchain's build, by label, into multi-toolchain targets.
+
+    Labels keep the order in which they first appear. A target that only
+    some toolchains build is merged from those builds and lists the other
+    toolchains as ``absent``.
+    """
+    builds = list(builds)
+    variants: dict[str, list[tuple[Toolchain, Target]]] = {}
+    for toolchain, targets in builds:
+        for label, target in targets.items():
+            variants.setdefault(label, []).append((toolchain, target))
+    merged: dict[str, MultiToolchainTarget] = {}
+    for label, found in variants.items():
+        merged_target = merged[label] = MultiToolchainTarget.from_targets(found)
+        if len(found) < len(builds):
+            present = {id(toolchain) for toolchain, _ in found}
+            merged_target.absent = [t for t, _ in builds if id(t) not in present]
+    return merged
@@ -1,4 +1,18 @@
+from gncmake_bridge.parser.cache import CacheStats, ParseCache
+from gncmake_bridge.parser.cmake_file_api import CMakeFileApiReader
+from gncmake_bridge.parser.cmake_glob import DirectoryIndexCache
 from gncmake_bridge.parser.cmake_parser import CMakeParser
+from gncmake_bridge.parser.cmake_project import ListFileCache
+from gncmake_bridge.parser.gn_imports import ImportResolver
 from gncmake_bridge.parser.gn_parser import GNParser
 
-__all__ = ["GNParser", "CMakeParser"]
+__all__ = [
+    "GNParser",
+    "CMakeParser",
+    "CMakeFileApiReader",
+    "ParseCache",
+    "CacheStats",
+    "ImportResolver",
+    "ListFileCache",
+    "DirectoryIndexCache",
+]
@@ -0,0 +1,251 @@
+"""Persistent, content-addressed cache of parsed target IR."""
+import hashlib
+import mmap
+import os
+import pickle
+import tempfile
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from gncmake_bridge.config.config import CacheConfig
+from gncmake_bridge.ir import ConditionBlock, Target, TargetType
+
+# Bump when the on-disk record layout changes.
+CACHE_FORMAT_VERSION = 5
+
+_TARGET_FIELDS = tuple(f.name for f in fields(Target))
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+@lru_cache(maxsize=1)
+def parser_version() -> str:
+    """Digest of the parser and IR implementation.
+
+    Any change to the code that produces targets changes this value, so stale
+    entries are never returned after an upgrade or a local edit.
+    """
+    from gncmake_bridge import __version__
+
+    package_dir = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha256(f"{__version__}:{CACHE_FORMAT_VERSION}".encode())
+    for subpackage in ("parser", "ir"):
+        for path in sorted((package_dir / subpackage).glob("*.py")):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _condition_to_record(block: ConditionBlock) -> tuple[Any, ...]:
+    return (
+        block.condition,
+        block.properties,
+        [_condition_to_record(c) for c in block.conditions],
+        block.removals,
+    )
+
+
+def _condition_from_record(record: tuple[Any, ...]) -> ConditionBlock:
+    condition, properties, conditions, removals = record
+    return ConditionBlock(
+        condition=condition,
+        properties=properties,
+        conditions=[_condition_from_record(c) for c in conditions],
+        removals=removals,
+    )
+
+
+def _target_to_record(target: Target) -> tuple[Any, ...]:
+    values = []
+    for name in _TARGET_FIELDS:
+        value = getattr(target, name)
+        if name == "type":
+            value = value.value
+        elif name == "conditions":
+            value = [_condition_to_record(c) for c in value]
+        values.append(value)
+    return tuple(values)
+
+
+def _target_from_record(record: tuple[Any, ...]) -> Target:
+    values = dict(zip(_TARGET_FIELDS, record))
+    values["type"] = TargetType(values["type"])
+    values["conditions"] = [_condition_from_record(c) for c in values["conditions"]]
+    return Target(**values)
+
+
+class ParseCache:
+    """On-disk cache mapping file content to the targets parsed from it.
+
+    Entries are keyed by a hash of the content, the parser kind, the parser
+    implementation version and any options that affect the result. An entry
+    may also record files the result depends on besides the keyed content,
+    such as imported ``.gni`` files; it is only returned while their contents
+    are unchanged. Targets are converted to plain tuples before they are
+    pickled, which keeps entries small and fast to load. The total size is
+    bounded; when it is exceeded the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: Path | str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        # path -> (size, last use); loaded lazily with one directory scan.
+        self._index: dict[Path, tuple[int, float]] | None = None
+        self._total_bytes = 0
+        # path -> (mtime_ns, size, digest) of dependency files seen so far.
+        self._digests: dict[Path, tuple[int, int, str]] = {}
+
+    @classmethod
+    def from_config(cls, config: CacheConfig) -> "ParseCache | None":
+        """The cache a ``[cache]`` configuration section describes, or None if disabled."""
+        if not config.enabled:
+            return None
+        return cls(config.directory, config.max_size_mb * 2**20)
+
+    def make_key(
+        self,
+        content: bytes | mmap.mmap,
+        parser: str,
+        options: Mapping[str, Any] | None = None,
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{parser}\0{parser_version()}\0".encode())
+        if options:
+            digest.update(repr(sorted(options.items())).encode())
+        digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> list[Target] | None:
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                dependencies, records = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            self.stats.misses += 1
+            return None
+        for dependency, digest in dependencies:
+            if self.file_digest(Path(dependency)) != digest:
+                self.stats.misses += 1
+                return None
+        self.stats.hits += 1
+        self._touch(path)
+        return [_target_from_record(record) for record in records]
+
+    def put(
+        self,
+        key: str,
+        targets: list[Target],
+        dependencies: Mapping[Path, str] | None = None,
+    ) -> None:
+        """Store ``targets`` under ``key``.
+
+        Args:
+            dependencies: Digests (from :meth:`file_digest`) of other files
+                the targets were derived from.
+        """
+        path = self._entry_path(key)
+        dependency_records = sorted((str(p), d) for p, d in (dependencies or {}).items())
+        data = pickle.dumps(
+            (dependency_records, [_target_to_record(t) for t in targets]),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self.stats.writes += 1
+
+        index = self._load_index()
+        previous = index.get(path)
+        if previous is not None:
+            self._total_bytes -= previous[0]
+        index[path] = (len(data), os.stat(path).st_mtime)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def file_digest(self, path: Path) -> str | None:
+        """Content digest of ``path``, or ``None`` if it cannot be read.
+
+        Digests are remembered per modification time and size, so each
+        dependency is hashed at most once while it is unchanged.
+        """
+        try:
+            stat = os.stat(path)
+            known = self._digests.get(path)
+            if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                return known[2]
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            return None
+        self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def clear(self) -> None:
+        for path in list(self._load_index()):
+            path.unlink(missing_ok=True)
+        self._index = {}
+        self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        self._load_index()
+        return self._total_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key[2:]}.ir"
+
+    def _touch(self, path: Path) -> None:
+        try:
+            os.utime(path)
+            stat = os.stat(path)
+        except OSError:
+            return
+        index = self._load_index()
+        if path in index:
+            index[path] = (stat.st_size, stat.st_mtime)
+
+    def _load_index(self) -> dict[Path, tuple[int, float]]:
+        if self._index is not None:
+            return self._index
+        index: dict[Path, tuple[int, float]] = {}
+        total = 0
+        if self.directory.is_dir():
+            for bucket in os.scandir(self.directory):
+                if not bucket.is_dir():
+                    continue
+                for entry in os.scandir(bucket.path):
+                    if entry.name.endswith(".ir"):
+                        stat = entry.stat()
+                        index[Path(entry.path)] = (stat.st_size, stat.st_mtime)
+                        total += stat.st_size
+        self._index = index
+        self._total_bytes = total
+        return index
+
+    def _evict(self) -> None:
+        index = self._load_index()
+        if self._total_bytes <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            del index[path]
+            self._total_bytes -= size
+            self.stats.evictions += 1
@@ -0,0 +1,379 @@
+"""Evaluation of CMake variables, lists and functions.
+
+:class:`CMakeScope` holds the variables visible to a command: directory and
+function scopes are :class:`~collections.ChainMap` children of the scope they
+were entered from, and every scope of a project shares one cache. Variable
+references are expanded in one pass over the argument text, nested
+references such as ``${LIB_${PLATFORM}}`` included, and expansions are
+memoized per scope until a variable they could read changes.
+
+:class:`CMakeInterpreter` executes ``set``, ``unset``, ``list``, ``option``,
+``function`` and ``macro`` and yields every other command with its
+arguments evaluated.
+"""
+import os
+import re
+from collections import ChainMap
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.parser.cmake_lexer import CMakeArgument, CMakeCommand, argument_values
+
+# A variable unset in a child scope, hiding the parent's binding.
+_UNSET = object()
+
+# Directory variables defined before the first command runs. Paths are
+# relative to the parsed file, and ``//`` is the root of the source tree;
+# binary directories are GN's directories for generated files.
+DIRECTORY_VARIABLES = {
+    "CMAKE_SOURCE_DIR": "//",
+    "PROJECT_SOURCE_DIR": "//",
+    "CMAKE_CURRENT_SOURCE_DIR": ".",
+    "CMAKE_CURRENT_LIST_DIR": ".",
+    "CMAKE_BINARY_DIR": "$root_gen_dir",
+    "PROJECT_BINARY_DIR": "$root_gen_dir",
+    "CMAKE_CURRENT_BINARY_DIR": "$target_gen_dir",
+}
+
+# Escapes, which are copied through untouched, the opening of a variable
+# reference and the brace that closes one.
+_REFERENCE_PATTERN = re.compile(r"\\.|\$(?:ENV|CACHE)?\{|\}", re.DOTALL)
+_MAX_CALL_DEPTH = 100
+# Expansions memoized per scope before the memo is dropped, so that it does
+# not grow with the size of machine-generated files.
+_MAX_EXPANSIONS = 4096
+
+
+def split_list(value: str) -> list[str]:
+    """Split a variable value into its list elements."""
+    return value.split(";") if value else []
+
+
+@lru_cache(maxsize=1024)
+def _compile_regex(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern)
+
+
+class CMakeCache:
+    """Cache variables shared by every scope of a project.
+
+    ``version`` changes whenever an entry does, which invalidates the
+    expansions memoized by scopes that may have read the old value.
+    """
+
+    def __init__(self) -> None:
+        self.entries: dict[str, str] = {}
+        self.version = 0
+
+    def set(self, name: str, value: str, force: bool = False) -> None:
+        if force or name not in self.entries:
+            self.entries[name] = value
+            self.version += 1
+
+    def unset(self, name: str) -> None:
+        if self.entries.pop(name, None) is not None:
+            self.version += 1
+
+
+class CMakeScope:
+    """Variables visible in a directory or function scope.
+
+    Args:
+        parent: Scope this one was entered from; variables are inherited
+            from it and ``PARENT_SCOPE`` assignments go to it.
+        cache: Cache shared by the whole project; a new one by default.
+    """
+
+    def __init__(
+        self, parent: "CMakeScope | None" = None, cache: CMakeCache | None = None
+    ) -> None:
+        self.parent = parent
+        if parent is None:
+            self.variables: ChainMap[str, object] = ChainMap({})
+            self.cache = cache if cache is not None else CMakeCache()
+        else:
+            self.variables = parent.variables.new_child()
+            self.cache = parent.cache
+        self._expansions: dict[str, str] = {}
+        self._cache_version = self.cache.version
+
+    def child(self) -> "CMakeScope":
+        """A new function or directory scope entered from this one."""
+        return CMakeScope(self)
+
+    def get(self, name: str) -> str | None:
+        """Value of ``name``: its normal binding, else its cache entry."""
+        value = self.variables.get(name, _UNSET)
+        if value is _UNSET:
+            return self.cache.entries.get(name)
+        return value  # type: ignore[return-value]
+
+    def set(self, name: str, value: str) -> None:
+        self.variables[name] = value
+        self._expansions.clear()
+
+    def unset(self, name: str) -> None:
+        if self.parent is None:
+            self.variables.pop(name, None)
+        else:
+            self.variables[name] = _UNSET
+        self._expansions.clear()
+
+    def set_parent(self, name: str, value: str | None) -> None:
+        """Bind ``name`` in the parent scope only, as ``PARENT_SCOPE`` does."""
+        parent = self.parent
+        if parent is None:
+            return
+        # The parent's map is also part of this scope's chain; pin the
+        # current value here so that this scope keeps seeing it.
+        if name not in self.variables.maps[0]:
+            self.variables.maps[0][name] = self.variables.get(name, _UNSET)
+        if value is None:
+            parent.unset(name)
+        else:
+            parent.set(name, value)
+
+    def expand(self, raw: str) -> str:
+        """Replace the variable references in raw argument text.
+
+        Escape sequences are left for the caller to resolve; backslashes in
+        substituted values are escaped so that they survive that step.
+        """
+        if "$" not in raw:
+            return raw
+        if self._cache_version != self.cache.version:
+            self._expansions.clear()
+            self._cache_version = self.cache.version
+        expanded = self._expansions.get(raw)
+        if expanded is None:
+            expanded, _ = self._expand_from(raw, 0, None)
+            if len(self._expansions) >= _MAX_EXPANSIONS:
+                self._expansions.clear()
+            self._expansions[raw] = expanded
+        return expanded
+
+    def _expand_from(self, raw: str, pos: int, reference: str | None) -> tuple[str, int]:
+        # Expands from ``pos`` to the end of ``raw`` or, inside a reference
+        # opened by ``reference``, to its closing brace. Returns the text and
+        # the offset just past what was consumed.
+        pieces: list[str] = []
+        search = _REFERENCE_PATTERN.search
+        while True:
+            match = search(raw, pos)
+            if match is None:
+                if reference is not None:
+                    raise ParseError(f"Unterminated variable reference in {raw!r}")
+                pieces.append(raw[pos:])
+                return "".join(pieces), len(raw)
+            token = match.group()
+            pieces.append(raw[pos : match.start()])
+            pos = match.end()
+            if token == "}":
+                if reference is not None:
+                    return "".join(pieces), pos
+                pieces.append(token)
+            elif token[0] == "\\":
+                pieces.append(token)
+            else:
+                name, pos = self._expand_from(raw, pos, token)
+                value = self._lookup(token, name)
+                if reference is None and "\\" in value:
+                    value = value.replace("\\", "\\\\")
+                pieces.append(value)
+
+    def _lookup(self, reference: str, name: str) -> str:
+        if reference == "${":
+            value = self.get(name)
+        elif reference == "$ENV{":
+            value = os.environ.get(name)
+        else:
+            value = self.cache.entries.get(name)
+        return value if value is not None else ""
+
+
+@dataclass(frozen=True)
+class CMakeFunction:
+    """A ``function()`` or ``macro()`` definition."""
+
+    name: str
+    parameters: tuple[str, ...]
+    body: tuple[CMakeCommand, ...]
+    is_macro: bool = False
+
+
+# Commands that open a function or macro definition, and the command ending it.
+BLOCK_ENDS = {"function": "endfunction", "macro": "endmacro"}
+
+
+class CMakeInterpreter:
+    """Executes the variable and function commands of CMake code.
+
+    Args:
+        scope: Scope to run in; a new directory scope by default, with
+            :data:`DIRECTORY_VARIABLES` defined.
+        functions: Functions and macros defined so far. CMake functions are
+            global, so subdirectories should share their parent's table.
+    """
+
+    def __init__(
+        self,
+        scope: CMakeScope | None = None,
+        functions: dict[str, CMakeFunction] | None = None,
+    ) -> None:
+        if scope is None:
+            scope = CMakeScope()
+            for name, value in DIRECTORY_VARIABLES.items():
+                scope.set(name, value)
+        self.scope = scope
+        self.functions = functions if functions is not None else {}
+        self._depth = 0
+
+    def run(
+        self, commands: Iterable[CMakeCommand]
+    ) -> Iterator[tuple[CMakeCommand, list[str]]]:
+        """Execute ``commands``, yielding the ones not handled here.
+
+        Each yielded command comes with its evaluated arguments.
+        """
+        return self._run(iter(commands), self.scope)
+
+    def _run(
+        self, commands: Iterator[CMakeCommand], scope: CMakeScope
+    ) -> Iterator[tuple[CMakeCommand, list[str]]]:
+        for command in commands:
+            name = command.name
+            if name in BLOCK_ENDS:
+                self._define(command, commands, scope)
+                continue
+            function = self.functions.get(name)
+            if function is not None:
+                yield from self._call(function, command, scope)
+                continue
+            args = argument_values(command.arguments, scope.expand)
+            if name == "set":
+                self._set(args, scope)
+            elif name == "unset":
+                self._unset(args, scope)
+            elif name == "list":
+                self._list(args, scope)
+            elif name == "option":
+                if len(args) >= 2:
+                    scope.cache.set(args[0], args[2] if len(args) > 2 else "OFF")
+            else:
+                yield command, args
+
+    def _define(
+        self, command: CMakeCommand, commands: Iterator[CMakeCommand], scope: CMakeScope
+    ) -> None:
+        kind, end = command.name, BLOCK_ENDS[command.name]
+        body: list[CMakeCommand] = []
+        depth = 1
+        for inner in commands:
+            if inner.name == kind:
+                depth += 1
+            elif inner.name == end:
+                depth -= 1
+                if depth == 0:
+                    break
+            body.append(inner)
+        args = argument_values(command.arguments, scope.expand)
+        if not args:
+            return
+        self.functions[args[0].lower()] = CMakeFunction(
+            args[0], tuple(args[1:]), tuple(body), is_macro=kind == "macro"
+        )
+
+    def _call(
+        self, function: CMakeFunction, command: CMakeCommand, scope: CMakeScope
+    ) -> Iterator[tuple[CMakeCommand, list[str]]]:
+        if self._depth >= _MAX_CALL_DEPTH:
+            raise ParseError(f"Maximum recursion depth exceeded calling {function.name}()")
+        args = argument_values(command.arguments, scope.expand)
+        bindings = {
+            "ARGC": str(len(args)),
+            "ARGV": ";".join(args),
+            "ARGN": ";".join(args[len(function.parameters) :]),
+        }
+        bindings.update((f"ARGV{i}", arg) for i, arg in enumerate(args))
+        bindings.update(zip(function.parameters, args))
+
+        self._depth += 1
+        try:
+            if function.is_macro:
+                # Macro arguments are replaced in the body text rather than
+                # bound as variables, and the body runs in the caller's scope.
+                body: Iterable[CMakeCommand] = (
+                    _substitute(inner, bindings) for inner in function.body
+                )
+                yield from self._run(iter(body), scope)
+            else:
+                child = scope.child()
+                for name, value in bindings.items():
+                    child.set(name, value)
+                yield from self._run(iter(function.body), child)
+        finally:
+            self._depth -= 1
+
+    def _set(self, args: list[str], scope: CMakeScope) -> None:
+        if not args:
+            return
+        name, values = args[0], args[1:]
+        if "CACHE" in values:
+            index = values.index("CACHE")
+            scope.cache.set(name, ";".join(values[:index]), force="FORCE" in values[index:])
+        elif values and values[-1] == "PARENT_SCOPE":
+            scope.set_parent(name, ";".join(values[:-1]) if len(values) > 1 else None)
+        elif values:
+            scope.set(name, ";".join(values))
+        else:
+            scope.unset(name)
+
+    def _unset(self, args: list[str], scope: CMakeScope) -> None:
+        if not args:
+            return
+        if "CACHE" in args[1:]:
+            scope.cache.unset(args[0])
+        elif "PARENT_SCOPE" in args[1:]:
+            scope.set_parent(args[0], None)
+        else:
+            scope.unset(args[0])
+
+    def _list(self, args: list[str], scope: CMakeScope) -> None:
+        if len(args) < 2:
+            return
+        operation, name, values = args[0], args[1], args[2:]
+        items = split_list(scope.get(name) or "")
+        if operation == "APPEND":
+            items.extend(values)
+        elif operation == "REMOVE_ITEM":
+            removed = set(values)
+            items = [item for item in items if item not in removed]
+        elif operation == "FILTER":
+            if len(values) < 3 or values[1] != "REGEX" or values[0] not in ("INCLUDE", "EXCLUDE"):
+                return
+            search = _compile_regex(values[2]).search
+            include = values[0] == "INCLUDE"
+            items = [item for item in items if bool(search(item)) is include]
+        else:
+            return
+        scope.set(name, ";".join(items))
+
+
+_MACRO_REFERENCE_PATTERN = re.compile(r"\$\{(\w+)\}")
+
+
+def _substitute(command: CMakeCommand, bindings: dict[str, str]) -> CMakeCommand:
+    def replace(match: re.Match[str]) -> str:
+        value = bindings.get(match.group(1))
+        return match.group(0) if value is None else value
+
+    arguments: list[CMakeArgument] = []
+    for argument in command.arguments:
+        if "${" in argument.value:
+            argument = argument._replace(
+                value=_MACRO_REFERENCE_PATTERN.sub(replace, argument.value)
+            )
+        arguments.append(argument)
+    return command._replace(arguments=tuple(arguments))
@@ -0,0 +1,339 @@
+"""Ingestion of CMake file API replies (codemodel v2) into targets and a toolchain.
+
+A build tree configured with a file API query holds CMake's own model of the
+project under ``.cmake/api/v1/reply``: an index naming a codemodel object,
+which lists one JSON object per target, and a toolchains object describing
+the compilers. Unlike :class:`~gncmake_bridge.parser.cmake_parser.CMakeParser`,
+which evaluates CMake code itself, the targets read here are exactly the ones
+CMake generated, with every variable, generator expression and usage
+requirement already applied.
+
+:meth:`CMakeFileApiReader.iter_targets` reads target objects lazily, in
+codemodel order, loading a bounded window of them ahead in worker processes.
+"""
+import json
+import os
+import shlex
+from collections import deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.ir import Label, Target, TargetType, Toolchain
+
+_TARGET_TYPES = {
+    "EXECUTABLE": TargetType.EXECUTABLE,
+    "STATIC_LIBRARY": TargetType.STATIC_LIBRARY,
+    "SHARED_LIBRARY": TargetType.SHARED_LIBRARY,
+    "MODULE_LIBRARY": TargetType.SHARED_LIBRARY,
+    "OBJECT_LIBRARY": TargetType.SOURCE_SET,
+    "INTERFACE_LIBRARY": TargetType.GROUP,
+    "UTILITY": TargetType.ACTION,
+}
+# Utility targets that multi-config generators add to every project.
+_GENERATOR_TARGETS = frozenset(("ALL_BUILD", "ZERO_CHECK"))
+_HEADER_EXTENSIONS = frozenset((".h", ".hh", ".hpp", ".hxx", ".inc", ".inl"))
+_SUPPORTED_VERSIONS = {"codemodel": 2, "toolchains": 1, "cache": 2}
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        with open(path, "rb") as f:
+            return json.load(f)
+    except OSError as e:
+        raise ParseError(f"Cannot read {path}: {e.strerror}") from e
+    except ValueError as e:
+        raise ParseError(f"{path}: invalid JSON: {e}") from e
+
+
+def _gn_path(path: str, directory: str, source: str) -> str:
+    # A path from the reply, relative to the target's directory when it is
+    # under it, else ``//`` and relative to the source root; paths outside
+    # the source tree stay absolute.
+    posix = PurePosixPath(path)
+    if posix.is_absolute():
+        if not posix.is_relative_to(source):
+            return path
+        posix = posix.relative_to(source)
+    if directory == ".":
+        return posix.as_posix()
+    if posix.is_relative_to(directory):
+        return posix.relative_to(directory).as_posix()
+    return f"//{posix.as_posix()}"
+
+
+def _directory_label(directory: str) -> str:
+    return "//" if directory == "." else f"//{directory}"
+
+
+def _append_unique(items: list[str], values: list[str]) -> None:
+    for value in values:
+        if value not in items:
+            items.append(value)
+
+
+def _output_name(name: str, name_on_disk: str | None) -> str | None:
+    if not name_on_disk:
+        return None
+    for prefix in ("lib", ""):
+        stem = prefix + name
+        if name_on_disk == stem or name_on_disk.startswith(f"{stem}."):
+            return None
+    stem = name_on_disk.partition(".")[0]
+    return stem[3:] if stem.startswith("lib") and len(stem) > 3 else stem
+
+
+def read_target(
+    path: Path, source: str, labels: Mapping[str, str] | None = None
+) -> tuple[str, Target]:
+    """Read one codemodel target object.
+
+    Args:
+        path: The target object.
+        source: The source root of the project.
+        labels: Labels of the project's targets by codemodel id, e.g.
+            ``//src/core:core``. Dependencies missing from it are named by
+            their bare name.
+
+    Returns:
+        The label of the target's directory, e.g. ``//src/core``, and the target.
+    """
+    data = _read_json(path)
+    try:
+        name = data["name"]
+        directory = data["paths"]["source"]
+        target_type = _TARGET_TYPES.get(data["type"], TargetType.UNKNOWN)
+    except (KeyError, TypeError) as e:
+        raise ParseError(f"{path}: not a codemodel target object") from e
+
+    sources: list[str] = []
+    headers: list[str] = []
+    for source_file in data.get("sources", ()):
+        file_path = source_file["path"]
+        if file_path.endswith(".rule") or (
+            target_type is TargetType.ACTION and source_file.get("isGenerated")
+        ):
+            # CMake's placeholders for the commands of custom targets.
+            continue
+        gn_path = _gn_path(file_path, directory, source)
+        if "compileGroupIndex" not in source_file and (
+            os.path.splitext(file_path)[1] in _HEADER_EXTENSIONS
+        ):
+            headers.append(gn_path)
+        else:
+            sources.append(gn_path)
+
+    compile_flags: list[str] = []
+    defines: list[str] = []
+    include_dirs: list[str] = []
+    for group in data.get("compileGroups", ()):
+        _append_unique(
+            compile_flags,
+            [
+                flag
+                for fragment in group.get("compileCommandFragments", ())
+                for flag in shlex.split(fragment["fragment"])
+            ],
+        )
+        _append_unique(defines, [d["define"] for d in group.get("defines", ())])
+        _append_unique(
+            include_dirs,
+            [_gn_path(i["path"], directory, source) for i in group.get("includes", ())],
+        )
+
+    link_flags: list[str] = []
+    for fragment in data.get("link", {}).get("commandFragments", ()):
+        text, role = fragment["fragment"], fragment.get("role")
+        if role == "libraries" and not (text.startswith("-") or os.path.isabs(text)):
+            # A build tree artifact of a dependency, which deps already cover.
+            continue
+        _append_unique(link_flags, shlex.split(text))
+
+    labels = labels or {}
+    deps = [
+        labels.get(dependency["id"], dep)
+        for dependency in data.get("dependencies", ())
+        if (dep := dependency["id"].partition("::")[0]) not in _GENERATOR_TARGETS
+    ]
+    target = Target(
+        name=name,
+        type=target_type,
+        sources=sources,
+        headers=headers,
+        deps=deps,
+        compile_flags=compile_flags,
+        link_flags=link_flags,
+        include_dirs=include_dirs,
+        defines=defines,
+        output_name=_output_name(name, data.get("nameOnDisk")),
+    )
+    return _directory_label(directory), target
+
+
+def _target_labels(configuration: Any) -> dict[str, str]:
+    # The label of each target of a codemodel configuration, by target id.
+    directories = configuration.get("directories", ())
+    return {
+        entry["id"]: str(
+            Label.get(
+                _directory_label(directories[entry["directoryIndex"]]["source"]), entry["name"]
+            )
+        )
+        for entry in configuration.get("targets", ())
+    }
+
+
+# Dependency labels of the reply being loaded, set once in each worker process.
+_worker_labels: Mapping[str, str] = {}
+
+
+def _init_worker(labels: Mapping[str, str]) -> None:
+    global _worker_labels
+    _worker_labels = labels
+
+
+def _read_in_worker(path: Path, source: str) -> tuple[str, Target]:
+    return read_target(path, source, _worker_labels)
+
+
+class CMakeFileApiReader:
+    """Reads targets and the toolchain from a configured build tree.
+
+    Args:
+        build_dir: The build directory, or its ``.cmake/api/v1/reply``
+            directory. Its newest reply index is read.
+        configuration: Configuration to read from multi-config generators;
+            the first one by default.
+        jobs: Number of worker processes that load target objects (all cores
+            by default); ``jobs=1`` loads them in this process.
+    """
+
+    def __init__(
+        self, build_dir: Path | str, configuration: str | None = None, jobs: int | None = None
+    ) -> None:
+        build_dir = Path(build_dir)
+        reply = build_dir / ".cmake" / "api" / "v1" / "reply"
+        self.reply_dir = reply if reply.is_dir() else build_dir
+        self.configuration = configuration
+        self._jobs = jobs
+        indexes = sorted(self.reply_dir.glob("index-*.json"))
+        if not indexes:
+            raise ParseError(f"No CMake file API reply index in {self.reply_dir}")
+        self._objects = self._object_files(indexes[-1])
+
+    def _object_files(self, index_path: Path) -> dict[str, Path]:
+        index = _read_json(index_path)
+        objects: dict[str, Path] = {}
+        for entry in index.get("objects", ()):
+            kind = entry.get("kind")
+            major = entry.get("version", {}).get("major")
+            if _SUPPORTED_VERSIONS.get(kind) == major and "jsonFile" in entry:
+                objects[kind] = self.reply_dir / entry["jsonFile"]
+        return objects
+
+    def _object(self, kind: str) -> Any:
+        path = self._objects.get(kind)
+        if path is None:
+            return None
+        return _read_json(path)
+
+    def _configuration(self, codemodel: Any) -> Any:
+        configurations = codemodel.get("configurations") or []
+        if self.configuration is None and configurations:
+            return configurations[0]
+        for configuration in configurations:
+            if configuration.get("name") == self.configuration:
+                return configuration
+        names = ", ".join(repr(c.get("name")) for c in configurations) or "none"
+        raise ParseError(f"No configuration {self.configuration!r} in reply (found {names})")
+
+    def iter_targets(self) -> Iterator[tuple[Label, Target]]:
+        """Yield each target with its label, e.g. ``//src/core:core``, in codemodel order."""
+        codemodel = self._object("codemodel")
+        if codemodel is None:
+            raise ParseError(f"No codemodel v2 object in {self.reply_dir}")
+        source = codemodel["paths"]["source"]
+        configuration = self._configuration(codemodel)
+        files = [
+            self.reply_dir / entry["jsonFile"]
+            for entry in configuration.get("targets", ())
+            if entry.get("name") not in _GENERATOR_TARGETS
+        ]
+        labels = _target_labels(configuration)
+        for directory, target in self._load(files, source, labels):
+            yield Label.get(directory, target.name), target
+
+    def _load(
+        self, files: list[Path], source: str, labels: Mapping[str, str]
+    ) -> Iterator[tuple[str, Target]]:
+        if self._jobs == 1 or len(files) <= 1:
+            for path in files:
+                yield read_target(path, source, labels)
+            return
+
+        # Keep a bounded window of objects loading ahead of the consumer, so
+        # that memory does not grow with the number of targets.
+        window = 4 * (self._jobs or os.cpu_count() or 1)
+        # The labels go to each worker once, not with every object.
+        pool = ProcessPoolExecutor(
+            max_workers=self._jobs, initializer=_init_worker, initargs=(labels,)
+        )
+        try:
+            remaining = iter(files)
+            pending: deque[Future[tuple[str, Target]]] = deque()
+            for path in remaining:
+                pending.append(pool.submit(_read_in_worker, path, source))
+                if len(pending) >= window:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append(pool.submit(_read_in_worker, next_path, source))
+                yield result
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def targets(self) -> dict[Label, Target]:
+        """Targets keyed by label, in codemodel order."""
+        return dict(self.iter_targets())
+
+    def toolchain(self) -> Toolchain:
+        """The C and C++ toolchain of the build tree.
+
+        Tools and language standards are also read from the cache object
+        when the reply has one.
+        """
+        toolchain = Toolchain()
+        data = self._object("toolchains")
+        compilers: dict[str, Any] = {}
+        if data is not None:
+            for entry in data.get("toolchains", ()):
+                compilers[entry.get("language")] = entry.get("compiler", {})
+        c, cxx = compilers.get("C", {}), compilers.get("CXX", {})
+        main = cxx or c
+        toolchain.name = main.get("id", "").lower()
+        toolchain.c_compiler = c.get("path", "")
+        toolchain.cxx_compiler = cxx.get("path", "")
+        toolchain.target_triple = main.get("target", "")
+        for language, compiler in compilers.items():
+            toolchain.metadata[language] = {
+                "id": compiler.get("id"),
+                "version": compiler.get("version"),
+                "include_dirs": compiler.get("implicit", {}).get("includeDirectories", []),
+            }
+
+        cache = self._object("cache")
+        if cache is not None:
+            entries = {e.get("name"): e.get("value", "") for e in cache.get("entries", ())}
+            toolchain.ar = entries.get("CMAKE_AR", "")
+            toolchain.linker = entries.get("CMAKE_LINKER", "")
+            toolchain.sysroot = entries.get("CMAKE_SYSROOT", "")
+            toolchain.cmake_toolchain_file = entries.get("CMAKE_TOOLCHAIN_FILE") or None
+            if entries.get("CMAKE_C_STANDARD"):
+                toolchain.c_standard = f"c{entries['CMAKE_C_STANDARD']}"
+            if entries.get("CMAKE_CXX_STANDARD"):
+                toolchain.cxx_standard = f"c++{entries['CMAKE_CXX_STANDARD']}"
+        return toolchain
@@ -0,0 +1,353 @@
+"""Evaluation of CMake generator expressions for many configurations at once.
+
+A generator expression such as ``$<$<CONFIG:Debug>:DEBUG_MODE>`` is parsed
+once into a tree and compiled into a function over a :class:`GenexConfigs`
+batch, returning its value in every configuration of the batch. Compiled
+expressions are shared by every parser, and each batch memoizes the values
+of the expression texts it has seen.
+
+:meth:`GenexConfigs.apply` moves the generator expressions of a target into
+condition blocks: an item whose value is the same in every configuration is
+replaced by that value, and any other item becomes one condition block per
+distinct value, whose condition names the configurations that produce it.
+
+Expressions that depend on anything other than the configuration variables
+(``$<TARGET_FILE:...>``, ``$<COMPILE_LANGUAGE:...>`` when the batch does not
+define ``COMPILE_LANGUAGE``, ...) cannot be evaluated and are dropped.
+"""
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+
+from gncmake_bridge.ir import ConditionBlock, Target
+from gncmake_bridge.parser.cmake_eval import split_list
+
+# The value of an expression in each configuration; ``None`` where it cannot
+# be evaluated.
+Values = tuple[str | None, ...]
+CompiledGenex = Callable[["GenexConfigs"], Values]
+
+# Build configurations × platforms, with each platform's usual compiler.
+DEFAULT_GENEX_CONFIGS: dict[str, dict[str, str]] = {
+    f"{platform.lower()}_{config.lower()}": {
+        "CONFIG": config,
+        "PLATFORM_ID": platform,
+        "CXX_COMPILER_ID": compiler,
+        "C_COMPILER_ID": compiler,
+    }
+    for platform, compiler in (("Linux", "GNU"), ("Darwin", "AppleClang"), ("Windows", "MSVC"))
+    for config in ("Debug", "Release", "RelWithDebInfo")
+}
+
+# Target list fields that may hold generator expressions, and the GN
+# property each one is recorded under in a condition block.
+GENEX_FIELDS = {
+    "sources": "sources",
+    "deps": "deps",
+    "public_deps": "public_deps",
+    "private_deps": "private_deps",
+    "include_dirs": "include_dirs",
+    "defines": "defines",
+    "compile_flags": "cflags",
+    "link_flags": "ldflags",
+}
+
+_FALSE_CONSTANTS = frozenset(("", "0", "OFF", "NO", "FALSE", "N", "IGNORE", "NOTFOUND"))
+
+
+@dataclass(frozen=True)
+class Genex:
+    """A parsed ``$<name:arg,...>``; ``arguments`` is ``None`` without a ``:``."""
+
+    text: str
+    name: tuple["Part", ...]
+    arguments: tuple[tuple["Part", ...], ...] | None
+
+
+Part = str | Genex
+
+
+def _parse_content(text: str, pos: int, stops: str) -> tuple[tuple[Part, ...], int]:
+    # Parses literal text and nested expressions up to one of ``stops``.
+    parts: list[Part] = []
+    start = pos
+    while pos < len(text):
+        if text.startswith("$<", pos):
+            if pos > start:
+                parts.append(text[start:pos])
+            genex, pos = _parse_genex(text, pos)
+            parts.append(genex)
+            start = pos
+        elif text[pos] in stops:
+            break
+        else:
+            pos += 1
+    if pos > start:
+        parts.append(text[start:pos])
+    return tuple(parts), pos
+
+
+def _parse_genex(text: str, start: int) -> tuple[Genex, int]:
+    name, pos = _parse_content(text, start + 2, ":>")
+    arguments: list[tuple[Part, ...]] | None = None
+    if pos < len(text) and text[pos] == ":":
+        arguments = []
+        while True:
+            argument, pos = _parse_content(text, pos + 1, ",>")
+            arguments.append(argument)
+            if pos >= len(text) or text[pos] == ">":
+                break
+    if pos >= len(text):
+        raise ValueError(f"Unterminated generator expression in {text!r}")
+    pos += 1
+    return Genex(text[start:pos], name, tuple(arguments) if arguments is not None else None), pos
+
+
+def parse_genex(text: str) -> tuple[Part, ...]:
+    """Parse text containing generator expressions into literal and expression parts."""
+    parts, _ = _parse_content(text, 0, "")
+    return parts
+
+
+def _is_true(value: str) -> bool:
+    upper = value.upper()
+    return upper not in _FALSE_CONSTANTS and not upper.endswith("-NOTFOUND")
+
+
+def _constant(value: str | None) -> CompiledGenex:
+    return lambda c: (value,) * c.size
+
+
+def _per_config(function: Callable[..., str | None], *compiled: CompiledGenex) -> CompiledGenex:
+    # Applies ``function`` to the values of ``compiled`` in each configuration,
+    # propagating ``None``.
+    def evaluate(c: "GenexConfigs") -> Values:
+        return tuple(
+            None if None in values else function(*values)
+            for values in zip(*(part(c) for part in compiled))
+        )
+
+    return evaluate
+
+
+def _compile_content(parts: tuple[Part, ...]) -> CompiledGenex:
+    if all(isinstance(part, str) for part in parts):
+        return _constant("".join(parts))  # type: ignore[arg-type]
+    compiled = [_constant(p) if isinstance(p, str) else _compile_genex(p) for p in parts]
+    if len(compiled) == 1:
+        return compiled[0]
+    return _per_config(lambda *values: "".join(values), *compiled)
+
+
+def _compile_genex(genex: Genex) -> CompiledGenex:
+    arguments = genex.arguments
+    if not all(isinstance(part, str) for part in genex.name):
+        # ``$<condition:value>`` with a computed condition.
+        condition = _compile_content(genex.name)
+        value = _compile_content(_join_arguments(arguments))
+        return _per_config(
+            lambda c, v: v if c == "1" else "" if c == "0" else None, condition, value
+        )
+
+    name = "".join(genex.name)  # type: ignore[arg-type]
+    if arguments is None:
+        constant = {"ANGLE-R": ">", "COMMA": ",", "SEMICOLON": ";"}.get(name)
+        if constant is not None:
+            return _constant(constant)
+        return lambda c: c.column(name)
+
+    if name in ("0", "1", "BUILD_INTERFACE", "BUILD_LOCAL_INTERFACE", "INSTALL_INTERFACE"):
+        if name in ("0", "INSTALL_INTERFACE"):
+            return _constant("")
+        return _compile_content(_join_arguments(arguments))
+    args = [_compile_content(argument) for argument in arguments]
+    operator = _OPERATORS.get(name)
+    if operator is not None:
+        return _per_config(operator, *args)
+    function = _STRING_FUNCTIONS.get(name)
+    if function is not None:
+        return _per_config(function, _compile_content(_join_arguments(arguments)))
+
+    # A query of a configuration variable, e.g. $<CONFIG:Debug,Release>;
+    # configuration names compare case-insensitively.
+    fold: Callable[[str], str] = str.upper if name == "CONFIG" else str
+
+    def variable(c: "GenexConfigs") -> Values:
+        return c.column(name)
+
+    def matches(value: str, *choices: str) -> str:
+        return "1" if fold(value) in {fold(choice) for choice in choices} else "0"
+
+    return _per_config(matches, variable, *args)
+
+
+def _join_arguments(
+    arguments: tuple[tuple[Part, ...], ...] | None,
+) -> tuple[Part, ...]:
+    # Single-argument expressions take everything after the ``:``, commas
+    # included.
+    if not arguments:
+        return ()
+    joined: list[Part] = list(arguments[0])
+    for argument in arguments[1:]:
+        joined.append(",")
+        joined.extend(argument)
+    return tuple(joined)
+
+
+def _equal(a: str, b: str) -> str | None:
+    try:
+        return "1" if int(a, 0) == int(b, 0) else "0"
+    except ValueError:
+        return None
+
+
+# Expressions that take their whole argument text as one value.
+_STRING_FUNCTIONS: dict[str, Callable[[str], str]] = {
+    "BOOL": lambda value: "1" if _is_true(value) else "0",
+    "LOWER_CASE": str.lower,
+    "UPPER_CASE": str.upper,
+}
+
+_OPERATORS: dict[str, Callable[..., str | None]] = {
+    "AND": lambda *values: "1" if all(v == "1" for v in values) else "0",
+    "OR": lambda *values: "1" if any(v == "1" for v in values) else "0",
+    "NOT": lambda value: "0" if value == "1" else "1",
+    "IF": lambda condition, then, otherwise: then if condition == "1" else otherwise,
+    "STREQUAL": lambda a, b: "1" if a == b else "0",
+    "EQUAL": _equal,
+    "IN_LIST": lambda item, items: "1" if item in split_list(items) else "0",
+}
+
+
+@lru_cache(maxsize=4096)
+def compile_genex(text: str) -> CompiledGenex:
+    """Compile text containing generator expressions into a function over a
+    :class:`GenexConfigs` batch."""
+    try:
+        parts = parse_genex(text)
+    except ValueError:
+        return _constant(None)
+    return _compile_content(parts)
+
+
+class GenexConfigs:
+    """A batch of named configurations that generator expressions are evaluated over.
+
+    Args:
+        configs: Values of the configuration variables (``CONFIG``,
+            ``PLATFORM_ID``, ``CXX_COMPILER_ID``, ...) of each
+            configuration, by configuration name.
+    """
+
+    def __init__(self, configs: Mapping[str, Mapping[str, str]]) -> None:
+        self.names = list(configs)
+        self.configs = [dict(configs[name]) for name in self.names]
+        self.size = len(self.names)
+        self.variables = list(dict.fromkeys(v for config in self.configs for v in config))
+        self._columns: dict[str, Values] = {}
+        self._values: dict[str, Values] = {}
+        self._conditions: dict[tuple[int, ...], str] = {}
+
+    def column(self, name: str) -> Values:
+        """Value of variable ``name`` in each configuration."""
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = tuple(config.get(name) for config in self.configs)
+        return column
+
+    def evaluate(self, text: str) -> Values:
+        """Value of ``text`` in each configuration."""
+        values = self._values.get(text)
+        if values is None:
+            values = self._values[text] = compile_genex(text)(self)
+        return values
+
+    def condition(self, indices: list[int]) -> str:
+        """GN condition text that holds for exactly the configurations at ``indices``.
+
+        Variables are named ``cmake_`` followed by the lower-cased variable
+        name, e.g. ``cmake_config == "Debug"``. The condition tests as few
+        variables as tell the configurations apart.
+        """
+        key = tuple(indices)
+        condition = self._conditions.get(key)
+        if condition is None:
+            condition = self._conditions[key] = self._condition(indices)
+        return condition
+
+    def _condition(self, indices: list[int]) -> str:
+        selected = set(indices)
+        for size in range(1, len(self.variables) + 1):
+            for subset in combinations(self.variables, size):
+                columns = [self.column(variable) for variable in subset]
+                keys = list(zip(*columns))
+                chosen = {keys[i] for i in selected}
+                if any(keys[i] in chosen for i in range(self.size) if i not in selected):
+                    continue
+                terms = [
+                    " && ".join(_equals(v, value) for v, value in zip(subset, key))
+                    for key in dict.fromkeys(keys[i] for i in indices)
+                ]
+                if size == 1 or len(terms) == 1:
+                    return " || ".join(terms)
+                return " || ".join(f"({term})" for term in terms)
+        # Configurations that no variable tells apart evaluate identically.
+        return "true"
+
+    def condition_args(self) -> dict[str, dict[str, str | None]]:
+        """The configurations as GN build arguments, for use with
+        :class:`~gncmake_bridge.parser.gn_conditions.ConfigMatrix`."""
+        return {
+            name: {f"cmake_{v.lower()}": config.get(v) for v in self.variables}
+            for name, config in zip(self.names, self.configs)
+        }
+
+    def apply(
+        self, target: Target, normalize: Mapping[str, Callable[[str], str]] | None = None
+    ) -> None:
+        """Resolve the generator expressions in ``target``'s list fields in place.
+
+        ``normalize`` maps field names to a function applied to each value
+        an expression produces for that field.
+        """
+        blocks: dict[str, ConditionBlock] = {}
+        for field_name, property_name in GENEX_FIELDS.items():
+            items: list[str] = getattr(target, field_name)
+            if not any("$<" in item for item in items):
+                continue
+            resolved: list[str] = []
+            tidy = normalize.get(field_name) if normalize else None
+            for item in items:
+                if "$<" not in item:
+                    resolved.append(item)
+                    continue
+                for indices, value in self._groups(item):
+                    values = [tidy(v) if tidy else v for v in split_list(value)]
+                    if not values:
+                        continue
+                    if len(indices) == self.size:
+                        resolved.extend(values)
+                        continue
+                    condition = self.condition(indices)
+                    block = blocks.get(condition)
+                    if block is None:
+                        block = blocks[condition] = ConditionBlock(condition=condition)
+                    block.properties.setdefault(property_name, []).extend(values)
+            setattr(target, field_name, resolved)
+        target.conditions.extend(blocks.values())
+
+    def _groups(self, text: str) -> Iterator[tuple[list[int], str]]:
+        # Configurations grouped by the value ``text`` has in them.
+        values = self.evaluate(text)
+        if None in values:
+            return
+        groups: dict[str, list[int]] = {}
+        for i, value in enumerate(values):
+            groups.setdefault(value, []).append(i)  # type: ignore[arg-type]
+        yield from ((indices, value) for value, indices in groups.items())
+
+
+def _equals(variable: str, value: str | None) -> str:
+    return f'cmake_{variable.lower()} == "{value}"'
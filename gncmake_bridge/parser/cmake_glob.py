@@ -0,0 +1,262 @@
+"""Resolution of ``file(GLOB)`` and ``file(GLOB_RECURSE)`` against a directory index.
+
+A :class:`DirectoryIndex` lists every file and directory under the project
+root with one ``os.scandir`` walk, and :class:`DirectoryIndexCache` keeps it
+between globs, so a project with hundreds of globs reads the disk once. Glob
+patterns are compiled into regular expressions once; all the patterns of a
+``file()`` call that share a literal directory prefix are matched together,
+in one multi-line search over the newline-joined paths under that prefix.
+
+Patterns outside the project root, such as ``/usr/include/*.h`` or the
+``/*.cc`` an unset variable leaves, are not indexed: :func:`scan_glob` lists
+only the directories the pattern can reach.
+
+Symbolic links to directories are listed but not descended into, as CMake
+does without ``FOLLOW_SYMLINKS``.
+"""
+import os
+import re
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+from gncmake_bridge.exceptions import ParseError
+
+_WILDCARDS = frozenset("*?[")
+
+
+def _translate(pattern: str) -> str:
+    # ``*`` and ``?`` do not match ``/``; ``[...]`` and ``[!...]`` are classes.
+    pieces: list[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            pieces.append("[^/\n]*")
+        elif char == "?":
+            pieces.append("[^/\n]")
+        elif char == "[" and (end := pattern.find("]", i + 2)) != -1:
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^/\n" + body[1:]
+            pieces.append(f"[{body}]")
+            i = end
+        else:
+            pieces.append(re.escape(char))
+        i += 1
+    return "".join(pieces)
+
+
+def _split_pattern(pattern: str) -> tuple[str, str]:
+    # Splits a pattern into its leading directories without wildcards and
+    # the rest; the last component always belongs to the rest.
+    components = pattern.split("/")
+    literal = 0
+    while literal < len(components) - 1 and _WILDCARDS.isdisjoint(components[literal]):
+        literal += 1
+    return "/".join(components[:literal]), "/".join(components[literal:])
+
+
+@lru_cache(maxsize=1024)
+def compile_globs(prefix: str, patterns: tuple[str, ...], recurse: bool) -> re.Pattern[str]:
+    """Compile glob ``patterns`` under directory ``prefix`` into one multi-line regex.
+
+    Each line the regex matches is a path, relative to the index root, that
+    one of the patterns matches. With ``recurse``, the last component of a
+    pattern also matches in every subdirectory of the directories that the
+    rest of it matches.
+    """
+    alternatives: list[str] = []
+    for pattern in patterns:
+        directory, _, name = pattern.rpartition("/")
+        regex = _translate(name)
+        if recurse:
+            regex = "(?:[^\n]*/)?" + regex
+        if directory:
+            regex = f"{_translate(directory)}/{regex}"
+        alternatives.append(regex)
+    start = re.escape(f"{prefix}/") if prefix else ""
+    return re.compile(f"^{start}(?:{'|'.join(alternatives)})$", re.MULTILINE)
+
+
+def _entries(directory: str) -> list[os.DirEntry[str]]:
+    try:
+        with os.scandir(directory) as entries:
+            return list(entries)
+    except OSError:
+        return []
+
+
+def scan_glob(pattern: str, recurse: bool = False, list_directories: bool = True) -> set[str]:
+    """Absolute paths that the absolute glob ``pattern`` matches, found without an index.
+
+    Only the directories the pattern can reach are listed: its literal
+    directory prefix, the subdirectories that match each wildcard component
+    and, with ``recurse``, every directory below those.
+
+    Raises:
+        ParseError: If ``recurse`` would walk the whole filesystem from ``/``.
+    """
+    prefix, rest = _split_pattern(pattern)
+    *components, name = rest.split("/")
+    directories = [prefix or "/"]
+    for component in components:
+        if _WILDCARDS.isdisjoint(component):
+            directories = [os.path.join(directory, component) for directory in directories]
+            continue
+        regex = re.compile(_translate(component))
+        directories = [
+            entry.path
+            for directory in directories
+            for entry in _entries(directory)
+            if regex.fullmatch(entry.name) and entry.is_dir()
+        ]
+    if recurse and "/" in directories:
+        raise ParseError(f"file(GLOB_RECURSE) pattern {pattern!r} would walk the filesystem")
+    regex = re.compile(_translate(name))
+    matches: set[str] = set()
+    while directories:
+        for entry in _entries(directories.pop()):
+            is_directory = entry.is_dir()
+            if recurse and is_directory and not entry.is_symlink():
+                directories.append(entry.path)
+            if regex.fullmatch(entry.name) and (list_directories or not is_directory):
+                matches.add(entry.path)
+    return matches
+
+
+class DirectoryIndex:
+    """Every file and directory under ``root``, listed by one walk.
+
+    Paths are relative to ``root``, separated by ``/`` and sorted.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        files: list[str] = []
+        directories: list[str] = []
+        # Modification time of each directory walked, by relative path.
+        self._stamps: dict[str, int] = {}
+        pending = [""]
+        while pending:
+            relative = pending.pop()
+            try:
+                path = os.path.join(root, relative)
+                self._stamps[relative] = os.stat(path).st_mtime_ns
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        name = f"{relative}/{entry.name}" if relative else entry.name
+                        if "\n" in name:
+                            continue
+                        if entry.is_dir():
+                            directories.append(name)
+                            if not entry.is_symlink():
+                                pending.append(name)
+                        else:
+                            files.append(name)
+            except OSError:
+                continue
+        self.files = sorted(files)
+        self.directories = sorted(directories)
+        self._blocks: dict[tuple[str, bool], str] = {}
+
+    def is_current(self) -> bool:
+        """Whether no directory walked has had entries added or removed since."""
+        try:
+            return all(
+                os.stat(os.path.join(self.root, relative)).st_mtime_ns == stamp
+                for relative, stamp in self._stamps.items()
+            )
+        except OSError:
+            return False
+
+    def match(
+        self, patterns: Iterable[str], recurse: bool = False, list_directories: bool = True
+    ) -> set[str]:
+        """Relative paths that any of the relative glob ``patterns`` match."""
+        by_prefix: dict[str, list[str]] = {}
+        for pattern in patterns:
+            prefix, rest = _split_pattern(pattern)
+            by_prefix.setdefault(prefix, []).append(rest)
+        matches: set[str] = set()
+        for prefix, rests in by_prefix.items():
+            regex = compile_globs(prefix, tuple(rests), recurse)
+            matches.update(regex.findall(self._block(prefix, False)))
+            if list_directories:
+                matches.update(regex.findall(self._block(prefix, True)))
+        return matches
+
+    def _block(self, prefix: str, directories: bool) -> str:
+        # The newline-joined paths under ``prefix``, found by bisecting the
+        # sorted paths: every path in ``prefix/`` sorts before ``prefix0``.
+        key = (prefix, directories)
+        block = self._blocks.get(key)
+        if block is None:
+            paths = self.directories if directories else self.files
+            if prefix:
+                paths = paths[bisect_left(paths, f"{prefix}/") : bisect_left(paths, f"{prefix}0")]
+            block = self._blocks[key] = "\n".join(paths)
+        return block
+
+
+class DirectoryIndexCache:
+    """Directory indexes of project roots, shared by every glob of a project.
+
+    Indexes are checked for changes at most once between calls to
+    :meth:`refresh`, like :class:`~gncmake_bridge.parser.cmake_project.ListFileCache`.
+    """
+
+    def __init__(self) -> None:
+        # Number of times each root has been walked.
+        self.walks: Counter[Path] = Counter()
+        self._indexes: dict[Path, DirectoryIndex] = {}
+        self._checked: set[Path] = set()
+
+    def get(self, root: Path) -> DirectoryIndex:
+        """Return the index of ``root``, walking it if needed."""
+        index = self._indexes.get(root)
+        if index is None or (root not in self._checked and not index.is_current()):
+            index = self._indexes[root] = DirectoryIndex(root)
+            self.walks[root] += 1
+        self._checked.add(root)
+        return index
+
+    def glob(
+        self,
+        patterns: Iterable[str],
+        root: Path,
+        recurse: bool = False,
+        list_directories: bool = True,
+    ) -> list[str]:
+        """Absolute paths that any of the absolute glob ``patterns`` match, sorted.
+
+        Patterns under ``root`` are matched against its index; any other
+        pattern with :func:`scan_glob`, which lists only the directories it
+        can reach.
+        """
+        relative: list[str] = []
+        matches: set[str] = set()
+        root_prefix = root.as_posix().rstrip("/") + "/"
+        for pattern in patterns:
+            if pattern.startswith(root_prefix):
+                relative.append(pattern[len(root_prefix) :])
+            else:
+                matches.update(scan_glob(pattern, recurse, list_directories))
+        if relative:
+            base = root_prefix.rstrip("/")
+            matches.update(
+                f"{base}/{path}"
+                for path in self.get(root).match(relative, recurse, list_directories)
+            )
+        return sorted(matches)
+
+    def refresh(self) -> None:
+        """Re-check indexes for changes on their next use."""
+        self._checked.clear()
+
+    def clear(self) -> None:
+        """Drop every index."""
+        self._indexes.clear()
+        self._checked.clear()
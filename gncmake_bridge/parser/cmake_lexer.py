@@ -0,0 +1,253 @@
+"""Single-pass tokenizer for the CMake language.
+
+Follows the grammar in cmake-language(7): a file is a sequence of command
+invocations whose arguments are bracket, quoted or unquoted arguments,
+separated by whitespace, line comments and ``#[[ ]]`` bracket comments.
+Each command is produced as one compact record holding its arguments and
+their offsets into the source; the source is never split into lines.
+
+Arguments keep their raw text. Escape sequences and ``;``-separated lists
+are resolved by :func:`argument_values`, after any variable references have
+been expanded.
+"""
+import mmap
+import re
+from collections.abc import Callable, Iterable, Iterator
+from enum import Enum
+from typing import Any, NamedTuple
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.parser.gn_lexer import offset_to_line_column
+
+CMakeSource = str | bytes | mmap.mmap
+
+
+class ArgumentKind(Enum):
+    BRACKET = "bracket"
+    QUOTED = "quoted"
+    UNQUOTED = "unquoted"
+
+
+class CMakeArgument(NamedTuple):
+    """One command argument.
+
+    ``value`` is the raw text: the content of a bracket argument, the text
+    between the quotes of a quoted argument, or an unquoted argument as
+    written. ``start`` and ``end`` span the argument including delimiters.
+    """
+
+    value: str
+    kind: ArgumentKind
+    start: int
+    end: int
+
+
+class CMakeCommand(NamedTuple):
+    """A command invocation; ``name`` is lower-cased, as CMake is case-insensitive."""
+
+    name: str
+    arguments: tuple[CMakeArgument, ...]
+    start: int
+    end: int
+
+
+# Whitespace, line comments and bracket comments between commands and
+# between arguments. A ``#`` followed by a bracket opening starts a bracket
+# comment; any other ``#`` comments to the end of the line.
+_SEPARATION = (
+    r"[ \t\r\n]*"
+    r"(?:(?:\#\[(?P<comment_eq>=*)\[.*?\](?P=comment_eq)\]|\#[^\n]*)[ \t\r\n]*)*"
+)
+
+_COMMAND_PATTERN = re.compile(
+    _SEPARATION
+    + r"""
+    (?:
+     (?P<command>[A-Za-z_][A-Za-z0-9_]*)[ \t]*\(
+    |(?P<eof>\Z)
+    |(?P<error>.)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_ARGUMENT_PATTERN = re.compile(
+    _SEPARATION
+    + r"""
+    (?:
+     (?P<bracket>\[(?P<bracket_eq>=*)\[\n?(?P<bracket_value>.*?)\](?P=bracket_eq)\])
+    |(?P<unterminated_bracket>\[=*\[)
+    |(?P<quoted>"(?P<quoted_value>[^"\\]*(?:\\.[^"\\]*)*)")
+    |(?P<unquoted>
+        (?:[^ \t\r\n()\#"\\]+|\\.)
+        (?:[^ \t\r\n()\#"\\]+|\\.|"[^"\\]*(?:\\.[^"\\]*)*")*
+     )
+    |(?P<open>\()
+    |(?P<close>\))
+    |(?P<eof>\Z)
+    |(?P<error>.)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Escape sequences: ``\t``, ``\r``, ``\n``, ``\;`` and a backslash before any
+# character that is not a letter or digit. A backslash-newline inside a
+# quoted argument continues the line.
+_ESCAPE_PATTERN = re.compile(r"\\(.)", re.DOTALL)
+_INVALID_ESCAPE_PATTERN = re.compile(r"\\(?![trn;])[A-Za-z0-9]")
+_ENCODED_ESCAPES = {"t": "\t", "r": "\r", "n": "\n", "\n": ""}
+# Elements of a ``;``-separated list; empty elements are dropped.
+_LIST_ELEMENT_PATTERN = re.compile(r"(?:[^;\\]|\\.)+", re.DOTALL)
+
+_BYTES_PATTERNS = {
+    pattern: re.compile(pattern.pattern.encode("ascii"), pattern.flags & ~re.UNICODE)
+    for pattern in (_COMMAND_PATTERN, _ARGUMENT_PATTERN, _INVALID_ESCAPE_PATTERN)
+}
+
+
+def _pattern_for(pattern: re.Pattern[str], source: CMakeSource) -> re.Pattern[Any]:
+    return pattern if isinstance(source, str) else _BYTES_PATTERNS[pattern]
+
+
+def _error(message: str, source: CMakeSource, offset: int) -> ParseError:
+    line, column = offset_to_line_column(source, offset)
+    return ParseError(message, line, column)
+
+
+def _unescape_match(match: re.Match[str]) -> str:
+    char = match.group(1)
+    return _ENCODED_ESCAPES.get(char, char)
+
+
+def unescape(raw: str) -> str:
+    """Resolve the escape sequences in the raw text of an argument."""
+    return _ESCAPE_PATTERN.sub(_unescape_match, raw) if "\\" in raw else raw
+
+
+def split_list(raw: str) -> list[str]:
+    """Split the raw text of an unquoted argument on unescaped ``;``."""
+    if ";" not in raw:
+        return [unescape(raw)] if raw else []
+    return [unescape(item) for item in _LIST_ELEMENT_PATTERN.findall(raw)]
+
+
+def argument_values(
+    arguments: Iterable[CMakeArgument], expand: Callable[[str], str] | None = None
+) -> list[str]:
+    """Evaluate arguments the way CMake passes them to a command.
+
+    Bracket arguments are taken literally. Quoted arguments are one value
+    each; unquoted arguments are split into list elements. ``expand``, if
+    given, expands variable references in quoted and unquoted arguments
+    before escapes are resolved.
+    """
+    values: list[str] = []
+    for argument in arguments:
+        kind = argument.kind
+        if kind is ArgumentKind.BRACKET:
+            values.append(argument.value)
+            continue
+        raw = argument.value if expand is None else expand(argument.value)
+        if kind is ArgumentKind.QUOTED:
+            values.append(unescape(raw))
+        else:
+            values.extend(split_list(raw))
+    return values
+
+
+class CMakeLexer:
+    """Tokenizes CMake source into commands in one linear pass.
+
+    The source may be text or a bytes-like buffer such as an ``mmap``; for
+    buffers, offsets are byte offsets and only argument text is decoded.
+    """
+
+    def __init__(self, source: CMakeSource) -> None:
+        self._source = source
+
+    def commands(self) -> Iterator[CMakeCommand]:
+        source = self._source
+        is_text = isinstance(source, str)
+        match_command = _pattern_for(_COMMAND_PATTERN, source).match
+        match_argument = _pattern_for(_ARGUMENT_PATTERN, source).match
+        argument = CMakeArgument
+        unquoted, quoted, bracket = ArgumentKind.UNQUOTED, ArgumentKind.QUOTED, ArgumentKind.BRACKET
+        pos = 0
+        while True:
+            match = match_command(source, pos)
+            assert match is not None
+            kind = match.lastgroup
+            assert kind is not None
+            if kind == "eof":
+                return
+            start = match.start(kind)
+            if kind == "error":
+                raise _error("Expected a command invocation", source, start)
+            name = match.group("command")
+            if not is_text:
+                name = name.decode("ascii")
+            pos = match.end()
+
+            arguments: list[CMakeArgument] = []
+            depth = 0
+            while True:
+                match = match_argument(source, pos)
+                assert match is not None
+                kind = match.lastgroup
+                assert kind is not None
+                arg_start, pos = match.span(kind)
+                if kind == "unquoted":
+                    value = match.group(kind)
+                    if not is_text:
+                        value = value.decode("utf-8")
+                    if "\\" in value:
+                        self._check_escapes(match, kind)
+                    arguments.append(argument(value, unquoted, arg_start, pos))
+                elif kind == "close":
+                    if depth == 0:
+                        break
+                    depth -= 1
+                    arguments.append(argument(")", unquoted, arg_start, pos))
+                elif kind == "quoted":
+                    value = match.group("quoted_value")
+                    if not is_text:
+                        value = value.decode("utf-8")
+                    if "\\" in value:
+                        self._check_escapes(match, "quoted_value")
+                    arguments.append(argument(value, quoted, arg_start, pos))
+                elif kind == "open":
+                    depth += 1
+                    arguments.append(argument("(", unquoted, arg_start, pos))
+                elif kind == "bracket":
+                    value = match.group("bracket_value")
+                    if not is_text:
+                        value = value.decode("utf-8")
+                    arguments.append(argument(value, bracket, arg_start, pos))
+                elif kind == "eof":
+                    raise _error(f"Unterminated command {name}()", source, start)
+                elif kind == "unterminated_bracket":
+                    raise _error("Unterminated bracket argument", source, arg_start)
+                else:
+                    text = match.group(kind)
+                    if text in ('"', b'"'):
+                        raise _error("Unterminated quoted argument", source, arg_start)
+                    raise _error(f"Unexpected character {text!r}", source, arg_start)
+            yield CMakeCommand(name.lower(), tuple(arguments), start, pos)
+
+    def _check_escapes(self, match: re.Match[Any], group: str) -> None:
+        source = self._source
+        pattern = _pattern_for(_INVALID_ESCAPE_PATTERN, source)
+        invalid = pattern.search(match.group(group))
+        if invalid is not None:
+            text = invalid.group(0)
+            if not isinstance(text, str):
+                text = text.decode("ascii")
+            raise _error(
+                f"Invalid escape sequence {text}", source, match.start(group) + invalid.start()
+            )
+
+
+def tokenize_cmake(source: CMakeSource) -> list[CMakeCommand]:
+    """Tokenize ``source`` into its list of commands."""
+    return list(CMakeLexer(source).commands())
@@ -1,293 +1,877 @@
+import heapq
+import mmap
+import os
+import posixpath
 import re
+import sys
+from collections.abc import Callable, Container, Iterable, Iterator, Mapping
 from pathlib import Path
 
-from gncmake_bridge.ir import Target, TargetType
-
-
-def parse_cmake_file(content: str) -> list[Target]:
-    targets: list[Target] = []
-    lines = content.split("\n")
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-
-        if line.startswith("add_executable("):
-            target = parse_executable(lines, i)
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.ir import Label, Target, TargetType
+from gncmake_bridge.parser.cache import ParseCache
+from gncmake_bridge.parser.cmake_eval import (
+    BLOCK_ENDS,
+    DIRECTORY_VARIABLES,
+    CMakeFunction,
+    CMakeInterpreter,
+    CMakeScope,
+    split_list,
+)
+from gncmake_bridge.parser.cmake_genex import DEFAULT_GENEX_CONFIGS, GenexConfigs
+from gncmake_bridge.parser.cmake_glob import DirectoryIndexCache
+from gncmake_bridge.parser.cmake_lexer import (
+    CMakeCommand,
+    CMakeLexer,
+    CMakeSource,
+    argument_values,
+)
+from gncmake_bridge.parser.cmake_project import ListFileCache, ListFileLoader
+
+_EXECUTABLE_KEYWORDS = frozenset(("WIN32", "MACOSX_BUNDLE", "EXCLUDE_FROM_ALL"))
+_LIBRARY_TYPES = {
+    "STATIC": TargetType.STATIC_LIBRARY,
+    "SHARED": TargetType.SHARED_LIBRARY,
+    "MODULE": TargetType.SHARED_LIBRARY,
+    "OBJECT": TargetType.SOURCE_SET,
+    "INTERFACE": TargetType.GROUP,
+}
+_VISIBILITY_KEYWORDS = frozenset(("PRIVATE", "PUBLIC", "INTERFACE"))
+_TRUE_CONSTANTS = frozenset(("1", "ON", "YES", "TRUE", "Y"))
+_CUSTOM_COMMAND_KEYWORDS = frozenset(
+    (
+        "OUTPUT",
+        "COMMAND",
+        "MAIN_DEPENDENCY",
+        "DEPENDS",
+        "BYPRODUCTS",
+        "IMPLICIT_DEPENDS",
+        "WORKING_DIRECTORY",
+        "COMMENT",
+        "DEPFILE",
+        "JOB_POOL",
+        "JOB_SERVER_AWARE",
+        "VERBATIM",
+        "APPEND",
+        "USES_TERMINAL",
+        "COMMAND_EXPAND_LISTS",
+        "DEPENDS_EXPLICIT_ONLY",
+        "CODEGEN",
+    )
+)
+_CUSTOM_TARGET_KEYWORDS = frozenset(
+    (
+        "ALL",
+        "COMMAND",
+        "DEPENDS",
+        "BYPRODUCTS",
+        "WORKING_DIRECTORY",
+        "COMMENT",
+        "JOB_POOL",
+        "JOB_SERVER_AWARE",
+        "VERBATIM",
+        "USES_TERMINAL",
+        "COMMAND_EXPAND_LISTS",
+        "SOURCES",
+    )
+)
+
+
+def parse_cmake_file(content: str, genex: GenexConfigs | None = None) -> list[Target]:
+    """Parse targets and the ``target_*`` commands that apply to them.
+
+    The file is tokenized once and variables are expanded as it runs.
+    Target commands are indexed by the target names they apply to and
+    applied to those targets afterwards, so each command costs one
+    dictionary lookup regardless of file size. Generator expressions are
+    evaluated over ``genex`` when it is given, and left in place otherwise.
+    """
+    return parse_commands(CMakeInterpreter().run(CMakeLexer(content).commands()), genex)
+
+
+def parse_commands(
+    commands: Iterable[tuple[CMakeCommand, list[str]]], genex: GenexConfigs | None = None
+) -> list[Target]:
+    """Build targets from commands and their evaluated arguments."""
+    collector = TargetCollector(genex)
+    for command, args in commands:
+        collector.add(command.name, args)
+    return collector.finish()
+
+
+class TargetCollector:
+    """Builds targets from commands, applying ``target_*`` commands by name.
+
+    Target commands are indexed by the names of the targets they apply to
+    and applied when :meth:`finish` is called, so they may name targets
+    defined later, e.g. in another directory of a project. Generator
+    expressions are then resolved over ``genex``, if given.
+
+    Finally every file a target reads is looked up in :attr:`producers`, an
+    index of the outputs of custom commands, and the target gets a dependency
+    on the action that produces it.
+    """
+
+    def __init__(self, genex: GenexConfigs | None = None) -> None:
+        self.genex = genex
+        self.targets: list[Target] = []
+        # Label of the directory each target is defined in, e.g. ``//src``.
+        self.directories: list[str] = []
+        # Name and directory of the producing action, by output path (see
+        # _path_key).
+        self.producers: dict[str, tuple[str, str]] = {}
+        self._index: dict[str, list[tuple[TargetCommandHandler, list[str]]]] = {}
+
+    def add(self, command: str, args: list[str], directory: str = "//") -> Target | None:
+        """Process one command run in ``directory``; returns the target it defines, if any."""
+        definition = TARGET_DEFINITIONS.get(command)
+        if definition is not None:
+            target = definition(args)
             if target:
-                targets.append(target)
-            i += 1
-            continue
+                self.targets.append(target)
+                self.directories.append(directory)
+            return target
+
+        handler = TARGET_COMMANDS.get(command)
+        if handler is not None:
+            for name in _command_targets(command, args):
+                self._index.setdefault(name, []).append((handler, args))
+        return None
 
-        elif line.startswith("add_library("):
-            target = parse_library(lines, i)
-            if target:
-                targets.append(target)
-            i += 1
+    def finish(self) -> list[Target]:
+        for target in self.targets:
+            for handler, args in self._index.get(target.name, ()):
+                handler(args, target)
+        if self.genex is not None:
+            for target in self.targets:
+                self.genex.apply(target, _GENEX_NORMALIZE)
+        self._link_generated_files()
+        return self.targets
+
+    def _link_generated_files(self) -> None:
+        for target, directory in zip(self.targets, self.directories):
+            self._register_outputs(target, directory)
+        names = {target.name for target in self.targets}
+        for target, directory in zip(self.targets, self.directories):
+            self._link(target, directory, names)
+
+    def _register_outputs(self, target: Target, directory: str) -> None:
+        if target.type is TargetType.ACTION:
+            for output in target.outputs:
+                self.producers[_path_key(output, directory)] = (target.name, directory)
+
+    def _link(self, target: Target, directory: str, names: Container[str]) -> None:
+        # Resolves the DEPENDS of an action against the target ``names``
+        # and adds deps on the producers of the files ``target`` reads.
+        if target.type is TargetType.ACTION and target.inputs:
+            target.deps.extend(name for name in target.inputs if name in names)
+            target.inputs = [name for name in target.inputs if name not in names]
+        if not self.producers:
+            return
+        for paths in (target.sources, target.headers, target.inputs):
+            for i, path in enumerate(paths):
+                found = self._producer(path, directory)
+                if found is None:
+                    continue
+                paths[i], producer, producer_directory = found
+                if producer == target.name and producer_directory == directory:
+                    continue
+                if producer_directory == directory:
+                    label = producer
+                else:
+                    label = f"{producer_directory}:{producer}"
+                if label not in target.deps:
+                    target.deps.append(label)
+
+    def _producer(self, path: str, directory: str) -> tuple[str, str, str] | None:
+        # The name and directory of the action producing ``path``, and the
+        # path as written in its outputs. A relative path names a file in
+        # the source directory or, when a custom command outputs it, in the
+        # binary directory.
+        found = self.producers.get(_path_key(path, directory))
+        if found is None and not path.startswith(("/", "$")):
+            path = f"$target_gen_dir/{path}"
+            found = self.producers.get(_path_key(path, directory))
+        if found is None:
+            return None
+        return path, found[0], found[1]
+
+
+def reference_offsets(commands: Iterable[CMakeCommand]) -> tuple[dict[str, int], int]:
+    """Find where targets are last named, so that they can be streamed.
+
+    Returns:
+        The end offset of the last command naming each target literally,
+        and the end offset of the last command that may name any target:
+        a target command naming targets through variables, or a call of a
+        function or macro.
+    """
+    last_use: dict[str, int] = {}
+    barrier = 0
+    functions: set[str] = set()
+    block: tuple[str, str] | None = None
+    depth = 0
+    for command in commands:
+        name = command.name
+        if block is not None:
+            # Commands in a function body run where the function is called.
+            if name == block[0]:
+                depth += 1
+            elif name == block[1]:
+                depth -= 1
+                if depth == 0:
+                    block = None
             continue
-
-        elif line.startswith("add_custom_target("):
-            target = parse_custom_target(lines, i)
+        if name in BLOCK_ENDS:
+            block, depth = (name, BLOCK_ENDS[name]), 1
+            function = command.arguments[0].value if command.arguments else ""
+            if "$" in function:
+                # Any later command may call it.
+                barrier = sys.maxsize
+            functions.add(function.lower())
+        elif name in functions:
+            barrier = command.end
+        elif name in TARGET_COMMANDS:
+            names = _command_targets(name, argument_values(command.arguments))
+            if any("$" in target for target in names):
+                barrier = command.end
+            for target in names:
+                last_use[target] = command.end
+    return last_use, barrier
+
+
+class TargetStream(TargetCollector):
+    """Builds targets like :class:`TargetCollector`, releasing each as soon as
+    no later command can change it.
+
+    Target commands are applied as they arrive to the targets defined so
+    far, and kept for later only when they name a target not yet defined.
+    ``last_use`` and ``barrier`` are the offsets found by
+    :func:`reference_offsets`. Generated files are linked to the custom
+    commands seen before their consumer is released.
+    """
+
+    def __init__(
+        self, last_use: Mapping[str, int], barrier: int, genex: GenexConfigs | None = None
+    ) -> None:
+        super().__init__(genex)
+        self._last_use = last_use
+        self._barrier = barrier
+        self._live: dict[str, Target] = {}
+        # Targets by the offset after which they can be released, then by
+        # definition order.
+        self._pending: list[tuple[int, int, Target, str]] = []
+        self._defined = 0
+        self._names: set[str] = set()
+
+    def add(self, command: str, args: list[str], directory: str = "//") -> Target | None:
+        definition = TARGET_DEFINITIONS.get(command)
+        if definition is not None:
+            target = definition(args)
             if target:
-                targets.append(target)
-            i += 1
-            continue
-
-        i += 1
-
-    return targets
-
-
-def extract_paren_content(lines: list[str], start_idx: int, start_pos: int = 0) -> list[str]:
-    depth = 1
-    in_string = False
-    quote_char = None
-    content_lines: list[str] = []
-    current_line = ""
-
-    for idx in range(start_idx, len(lines)):
-        line = lines[idx]
-        line_start = start_pos if idx == start_idx else 0
-
-        for i in range(line_start, len(line)):
-            char = line[i]
-
-            if not in_string:
-                if char in ('"', "'"):
-                    in_string = True
-                    quote_char = char
-                    current_line += char
-                elif char == "(":
-                    depth += 1
-                    current_line += char
-                elif char == ")":
-                    depth -= 1
-                    if depth == 0:
-                        if current_line.strip():
-                            content_lines.append(current_line.strip())
-                        return content_lines
-                    current_line += char
+                for handler, late_args in self._index.pop(target.name, ()):
+                    handler(late_args, target)
+                self._live[target.name] = target
+                self._names.add(target.name)
+                self._register_outputs(target, directory)
+                release = self._last_use.get(target.name, 0)
+                heapq.heappush(self._pending, (release, self._defined, target, directory))
+                self._defined += 1
+            return target
+
+        apply = TARGET_COMMANDS.get(command)
+        if apply is not None:
+            for name in _command_targets(command, args):
+                target = self._live.get(name)
+                if target is not None:
+                    apply(args, target)
                 else:
-                    current_line += char
-            else:
-                current_line += char
-                if char == quote_char and (i == 0 or line[i - 1] != "\\"):
-                    in_string = False
-
-        if current_line.strip():
-            content_lines.append(current_line.strip())
-        current_line = ""
-
-    return content_lines
-
-
-def parse_executable(lines: list[str], start_idx: int) -> Target | None:
-    line = lines[start_idx].strip()
-    paren_start = line.index("(")
-
-    content_lines = extract_paren_content(lines, start_idx, paren_start + 1)
-
-    if not content_lines:
+                    self._index.setdefault(name, []).append((apply, args))
         return None
 
-    first_line = content_lines[0]
-    name_match = re.match(r"(\w+)\s*(.*)", first_line)
-    if not name_match:
+    def release(self, position: int) -> Iterator[Target]:
+        """Yield the targets that no command after offset ``position`` can change."""
+        if position < self._barrier:
+            return
+        pending = self._pending
+        while pending and pending[0][0] <= position:
+            _, _, target, directory = heapq.heappop(pending)
+            yield self._complete(target, directory)
+
+    def finish(self) -> list[Target]:
+        """Complete the targets not released yet, in definition order."""
+        pending = sorted(self._pending, key=lambda entry: entry[1])
+        self._pending.clear()
+        return [self._complete(target, directory) for _, _, target, directory in pending]
+
+    def _complete(self, target: Target, directory: str) -> Target:
+        if self._live.get(target.name) is target:
+            del self._live[target.name]
+        if self.genex is not None:
+            self.genex.apply(target, _GENEX_NORMALIZE)
+        self._link(target, directory, self._names)
+        return target
+
+
+class _LastRead:
+    # Top-level commands, remembering the one the interpreter read last.
+
+    __slots__ = ("_commands", "last")
+
+    def __init__(self, commands: Iterator[CMakeCommand]) -> None:
+        self._commands = commands
+        self.last: CMakeCommand | None = None
+
+    def __iter__(self) -> "_LastRead":
+        return self
+
+    def __next__(self) -> CMakeCommand:
+        self.last = next(self._commands)
+        return self.last
+
+
+def iter_cmake_targets(source: CMakeSource, genex: GenexConfigs | None = None) -> Iterator[Target]:
+    """Yield the targets of ``source`` as soon as no later command can change them.
+
+    A first pass tokenizes ``source`` to find the last command naming each
+    target (see :func:`reference_offsets`); the second runs the commands and
+    yields each target once the last of them has run, or at the end for
+    targets that commands name through variables or functions. Targets are
+    therefore yielded in the order they are completed. Only the targets not
+    yet released are kept, so ``source`` can be a memory-mapped file much
+    larger than the targets in it.
+    """
+    last_use, barrier = reference_offsets(CMakeLexer(source).commands())
+    stream = TargetStream(last_use, barrier, genex)
+    commands = _LastRead(CMakeLexer(source).commands())
+    for command, args in CMakeInterpreter().run(commands):
+        stream.add(command.name, args)
+        # Commands yielded from a function body complete with their call.
+        if command is commands.last:
+            yield from stream.release(command.end)
+    yield from stream.release(sys.maxsize)
+    yield from stream.finish()
+
+
+def _path_key(path: str, directory: str) -> str:
+    # Where ``path``, written in ``directory``, points: the same for every
+    # directory it may be written in.
+    if path.startswith("$target_gen_dir"):
+        gen_dir = "$root_gen_dir" + directory[1:].rstrip("/")
+        path = gen_dir + path[len("$target_gen_dir") :]
+    elif not path.startswith(("/", "$")):
+        path = f"{directory.rstrip('/')}/{path}" if directory != "//" else f"//{path}"
+    return posixpath.normpath(path)
+
+
+def _command_targets(command: str, args: list[str]) -> list[str]:
+    if command == "set_target_properties":
+        if "PROPERTIES" not in args:
+            return []
+        return args[: args.index("PROPERTIES")]
+    return args[:1]
+
+
+def normalize_path(path: str) -> str:
+    """Tidy a path built from a directory variable.
+
+    ``${CMAKE_CURRENT_SOURCE_DIR}/a.cc`` expands to ``./a.cc`` and is
+    reduced to ``a.cc``; ``${CMAKE_SOURCE_DIR}/a.cc`` expands to
+    ``///a.cc`` and is reduced to ``//a.cc``.
+    """
+    while path.startswith("./") and len(path) > 2:
+        path = path[2:]
+    if path.startswith("///"):
+        path = "//" + path.lstrip("/")
+    return path
+
+
+def _strip_define_flag(define: str) -> str:
+    return define[2:] if define.startswith("-D") else define
+
+
+# Tidying applied to the values generator expressions produce, by field.
+_GENEX_NORMALIZE: dict[str, Callable[[str], str]] = {
+    "sources": normalize_path,
+    "include_dirs": normalize_path,
+    "defines": _strip_define_flag,
+}
+
+
+def parse_executable(args: list[str]) -> Target | None:
+    if not args or "IMPORTED" in args[1:2] or "ALIAS" in args[1:2]:
         return None
+    sources = [normalize_path(s) for s in args[1:] if s and s not in _EXECUTABLE_KEYWORDS]
+    return Target(name=args[0], type=TargetType.EXECUTABLE, sources=sources)
 
-    name = name_match.group(1)
-
-    sources = []
-    for source_line in content_lines[1:]:
-        parts = source_line.split()
-        sources.extend(parts)
-
-    sources = [s for s in sources if s and s != "WIN32" and s != "MACOSX_BUNDLE"]
-
-    target = Target(name=name, type=TargetType.EXECUTABLE, sources=sources)
-
-    parse_target_commands(lines, start_idx + 1, target)
-
-    return target
-
-
-def parse_library(lines: list[str], start_idx: int) -> Target | None:
-    line = lines[start_idx].strip()
-    paren_start = line.index("(")
 
-    content_lines = extract_paren_content(lines, start_idx, paren_start + 1)
-
-    if not content_lines:
+def parse_library(args: list[str]) -> Target | None:
+    if not args:
         return None
-
-    first_line = content_lines[0]
-    match = re.match(r"(\w+)\s*(STATIC|SHARED|OBJECT|INTERFACE)?\s*(.*)", first_line)
-    if not match:
+    rest = args[1:]
+    type_str = "STATIC"
+    if rest and rest[0] in _LIBRARY_TYPES:
+        type_str = rest.pop(0)
+    if rest and rest[0] in ("IMPORTED", "ALIAS"):
         return None
+    sources = [normalize_path(s) for s in rest if s and s != "EXCLUDE_FROM_ALL"]
+    return Target(name=args[0], type=_LIBRARY_TYPES[type_str], sources=sources)
 
-    name = match.group(1)
-    type_str = match.group(2) or "STATIC"
 
-    sources = []
-    for source_line in content_lines[1:]:
-        parts = source_line.split()
-        sources.extend(parts)
+def _keyword_values(args: list[str], keywords: frozenset[str]) -> dict[str, list[list[str]]]:
+    # The values following each occurrence of each keyword.
+    values: dict[str, list[list[str]]] = {}
+    current: list[str] = []
+    for arg in args:
+        if arg in keywords:
+            current = []
+            values.setdefault(arg, []).append(current)
+        elif arg:
+            current.append(arg)
+    return values
 
-    sources = [s for s in sources if s] if sources else []
 
-    type_map = {
-        "STATIC": TargetType.STATIC_LIBRARY,
-        "SHARED": TargetType.SHARED_LIBRARY,
-        "OBJECT": TargetType.SOURCE_SET,
-        "INTERFACE": TargetType.GROUP,
-    }
+def _first(values: dict[str, list[list[str]]], keyword: str) -> list[str]:
+    groups = values.get(keyword)
+    return groups[0] if groups else []
 
-    target = Target(name=name, type=type_map.get(type_str, TargetType.UNKNOWN), sources=sources)
 
-    parse_target_commands(lines, start_idx + 1, target)
+def _all(values: dict[str, list[list[str]]], keyword: str) -> list[str]:
+    return [value for group in values.get(keyword, ()) for value in group]
 
-    return target
 
+def _generated_path(path: str) -> str:
+    # Relative custom command outputs are in the current binary directory.
+    path = normalize_path(path)
+    if path.startswith(("/", "$")):
+        return path
+    return f"$target_gen_dir/{path}"
 
-def parse_custom_target(lines: list[str], start_idx: int) -> Target | None:
-    line = lines[start_idx].strip()
-    paren_start = line.index("(")
 
-    content_lines = extract_paren_content(lines, start_idx, paren_start + 1)
+def _action_name(output: str) -> str:
+    for prefix in ("$target_gen_dir/", "$root_gen_dir/", "//"):
+        if output.startswith(prefix):
+            output = output[len(prefix) :]
+            break
+    return "generate_" + re.sub(r"\W+", "_", output).strip("_")
 
-    if not content_lines:
-        return None
 
-    first_line = content_lines[0]
-    name_match = re.match(r"(\w+)\s*(.*)", first_line)
-    if not name_match:
+def parse_custom_command(args: list[str]) -> Target | None:
+    # Only the OUTPUT signature defines files; add_custom_command(TARGET)
+    # adds build events to an existing target.
+    if not args or args[0] != "OUTPUT" or "APPEND" in args:
         return None
-
-    name = name_match.group(1)
-    target = Target(name=name, type=TargetType.ACTION)
-
-    return target
-
-
-def parse_target_commands(lines: list[str], start_idx: int, target: Target) -> None:
-    for idx in range(start_idx, len(lines)):
-        line = lines[idx].strip()
-
-        if not line or line.startswith("#"):
-            continue
-
-        if line.startswith("target_link_libraries("):
-            parse_link_libraries(line, target)
-        elif line.startswith("target_include_directories("):
-            parse_include_directories(line, target)
-        elif line.startswith("target_compile_definitions("):
-            parse_compile_definitions(line, target)
-        elif line.startswith("target_compile_options("):
-            parse_compile_options(line, target)
-        elif line.startswith("set_target_properties("):
-            parse_target_properties(line, target)
-
-
-def parse_link_libraries(line: str, target: Target) -> None:
-    try:
-        content = line[line.index("(") + 1 : line.rindex(")")]
-    except ValueError:
-        return
-    parts = content.split()
-    if not parts:
-        return
-
-    for i, token in enumerate(parts):
-        if token in ("PRIVATE", "PUBLIC", "INTERFACE"):
-            continue
-        if token.startswith("$<"):
-            continue
-        if token:
-            if i > 0:
-                prev = parts[i - 1]
-                if prev == "PUBLIC":
-                    target.public_deps.append(token)
-                elif prev == "PRIVATE":
-                    target.private_deps.append(token)
-                else:
-                    target.deps.append(token)
-            else:
-                target.deps.append(token)
-
-
-def parse_include_directories(line: str, target: Target) -> None:
-    try:
-        content = line[line.index("(") + 1 : line.rindex(")")]
-    except ValueError:
-        return
-    parts = content.split()
-    if len(parts) < 2:
+    values = _keyword_values(args, _CUSTOM_COMMAND_KEYWORDS)
+    outputs = [_generated_path(output) for output in _first(values, "OUTPUT")]
+    if not outputs:
+        return None
+    commands = values.get("COMMAND", [])
+    return Target(
+        name=_action_name(outputs[0]),
+        type=TargetType.ACTION,
+        script=commands[0][0] if commands and commands[0] else None,
+        inputs=[
+            normalize_path(path)
+            for path in _all(values, "MAIN_DEPENDENCY") + _all(values, "DEPENDS")
+        ],
+        outputs=outputs + [_generated_path(path) for path in _all(values, "BYPRODUCTS")],
+    )
+
+
+def parse_custom_target(args: list[str]) -> Target | None:
+    if not args:
+        return None
+    values = _keyword_values(args[1:], _CUSTOM_TARGET_KEYWORDS)
+    commands = values.get("COMMAND", [])
+    return Target(
+        name=args[0],
+        type=TargetType.ACTION,
+        sources=[normalize_path(path) for path in _all(values, "SOURCES")],
+        script=commands[0][0] if commands and commands[0] else None,
+        inputs=[normalize_path(path) for path in _all(values, "DEPENDS")],
+        outputs=[_generated_path(path) for path in _all(values, "BYPRODUCTS")],
+    )
+
+
+# Target command handlers intern the strings they add to a target's lists,
+# as Target does for the lists it is created with.
+
+
+def parse_link_libraries(args: list[str], target: Target) -> None:
+    public: list[str] = []
+    private: list[str] = []
+    deps: list[str] = []
+    # A keyword applies to every item after it, up to the next keyword.
+    # INTERFACE items are only passed on to dependents, which public_deps
+    # does in GN; items before any keyword use the plain signature.
+    keywords = {
+        "PUBLIC": public,
+        "INTERFACE": public,
+        "PRIVATE": private,
+        "LINK_PUBLIC": public,
+        "LINK_PRIVATE": private,
+    }
+    visibility = deps
+    for token in args[1:]:
+        selected = keywords.get(token)
+        if selected is not None:
+            visibility = selected
+        elif token:
+            visibility.append(sys.intern(token))
+    if public:
+        target.public_deps += public
+    if private:
+        target.private_deps += private
+    if deps:
+        target.deps += deps
+
+
+def parse_include_directories(args: list[str], target: Target) -> None:
+    target.include_dirs += [
+        sys.intern(normalize_path(token))
+        for token in args[1:]
+        if token and token not in ("SYSTEM", "BEFORE", "AFTER", *_VISIBILITY_KEYWORDS)
+    ]
+
+
+def parse_compile_definitions(args: list[str], target: Target) -> None:
+    target.defines += [
+        sys.intern(_strip_define_flag(token))
+        for token in args[1:]
+        if token and token not in _VISIBILITY_KEYWORDS
+    ]
+
+
+def parse_compile_options(args: list[str], target: Target) -> None:
+    target.compile_flags += [
+        sys.intern(token)
+        for token in args[1:]
+        if token and token != "BEFORE" and token not in _VISIBILITY_KEYWORDS
+    ]
+
+
+def parse_target_sources(args: list[str], target: Target) -> None:
+    sources: list[str] = []
+    headers: list[str] = []
+    destination = sources
+    skipping = False
+    tokens = iter(args[1:])
+    for token in tokens:
+        if token in _VISIBILITY_KEYWORDS:
+            destination, skipping = sources, False
+        elif token in ("FILE_SET", "TYPE"):
+            # A file set is typed by its TYPE, or by its name if it has none.
+            kind = next(tokens, "")
+            destination = headers if kind == "HEADERS" else sources
+            skipping = False
+        elif token == "BASE_DIRS":
+            skipping = True
+        elif token == "FILES":
+            skipping = False
+        elif token and not skipping:
+            destination.append(normalize_path(token))
+    if sources:
+        target.sources += sources
+    if headers:
+        target.headers += headers
+
+
+def parse_target_properties(args: list[str], target: Target) -> None:
+    if "PROPERTIES" not in args:
         return
-
-    for token in parts[1:]:
-        if token in ("SYSTEM", "BEFORE", "PRIVATE", "PUBLIC", "INTERFACE"):
-            continue
-        if token.startswith("$<"):
-            continue
-        if token:
-            target.include_dirs.append(token)
+    properties = args[args.index("PROPERTIES") + 1 :]
+    for name, value in zip(properties[::2], properties[1::2]):
+        if name == "OUTPUT_NAME":
+            target.output_name = value
 
 
-def parse_compile_definitions(line: str, target: Target) -> None:
-    try:
-        content = line[line.index("(") + 1 : line.rindex(")")]
-    except ValueError:
-        return
-    parts = content.split()
-    if len(parts) < 2:
-        return
+TargetDefinition = Callable[[list[str]], Target | None]
+TargetCommandHandler = Callable[[list[str], Target], None]
 
-    for token in parts[1:]:
-        if token in ("PRIVATE", "PUBLIC", "INTERFACE"):
-            continue
-        if token.startswith("$<"):
-            continue
-        if token.startswith("-D"):
-            target.defines.append(token[2:])
-        elif token:
-            target.defines.append(token)
+# Commands that define a target, named by their first argument.
+TARGET_DEFINITIONS: dict[str, TargetDefinition] = {
+    "add_executable": parse_executable,
+    "add_library": parse_library,
+    "add_custom_target": parse_custom_target,
+    "add_custom_command": parse_custom_command,
+}
 
+# Commands applied to the targets they name.
+TARGET_COMMANDS: dict[str, TargetCommandHandler] = {
+    "target_link_libraries": parse_link_libraries,
+    "target_include_directories": parse_include_directories,
+    "target_compile_definitions": parse_compile_definitions,
+    "target_compile_options": parse_compile_options,
+    "target_sources": parse_target_sources,
+    "set_target_properties": parse_target_properties,
+}
 
-def parse_compile_options(line: str, target: Target) -> None:
-    try:
-        content = line[line.index("(") + 1 : line.rindex(")")]
-    except ValueError:
-        return
-    parts = content.split()
-    if len(parts) < 2:
-        return
 
-    for token in parts[1:]:
-        if token in ("PRIVATE", "PUBLIC", "INTERFACE"):
-            continue
-        if token.startswith("$<"):
-            continue
-        if token:
-            target.compile_flags.append(token)
+def _directory_label(directory: Path, root: Path) -> str:
+    relative = directory.relative_to(root).as_posix()
+    return "//" if relative == "." else f"//{relative}"
 
 
-def parse_target_properties(line: str, target: Target) -> None:
-    try:
-        content = line[line.index("(") + 1 : line.rindex(")")]
-    except ValueError:
-        return
-    output_match = re.search(r'OUTPUT_NAME\s+"([^"]+)"', content)
-    if output_match:
-        target.output_name = output_match.group(1)
+def _resolve(path: str, directory: Path, root: Path) -> Path:
+    # ``//`` paths come from CMAKE_SOURCE_DIR; see DIRECTORY_VARIABLES.
+    if path.startswith("//"):
+        resolved = root / path.lstrip("/")
+    else:
+        resolved = directory / path
+    return Path(os.path.normpath(resolved))
 
 
 class CMakeParser:
-    def __init__(self) -> None:
-        pass
+    """Parses CMake list files into targets.
+
+    Args:
+        cache: Cache of parsed files, keyed by content.
+        list_files: Tokenized list files to share with other parsers.
+        directory_indexes: Directory indexes that :meth:`parse_project`
+            resolves ``file(GLOB)`` against, to share with other parsers.
+        genex_configs: Configurations that generator expressions are
+            evaluated over, by name (see
+            :data:`~gncmake_bridge.parser.cmake_genex.DEFAULT_GENEX_CONFIGS`).
+            Values that differ between them become condition blocks.
+    """
+
+    def __init__(
+        self,
+        cache: ParseCache | None = None,
+        list_files: ListFileCache | None = None,
+        directory_indexes: DirectoryIndexCache | None = None,
+        genex_configs: Mapping[str, Mapping[str, str]] | None = None,
+    ) -> None:
+        self._cache = cache
+        self._list_files = list_files if list_files is not None else ListFileCache()
+        self._directory_indexes = (
+            directory_indexes if directory_indexes is not None else DirectoryIndexCache()
+        )
+        self._genex_configs = dict(
+            genex_configs if genex_configs is not None else DEFAULT_GENEX_CONFIGS
+        )
+        self._genex = GenexConfigs(self._genex_configs)
+
+    @property
+    def list_files(self) -> ListFileCache:
+        """Tokenized list files, shared between calls to :meth:`parse_project`."""
+        return self._list_files
+
+    @property
+    def directory_indexes(self) -> DirectoryIndexCache:
+        """Directory indexes, shared between calls to :meth:`parse_project`."""
+        return self._directory_indexes
 
     def parse(self, content: str) -> list[Target]:
-        return parse_cmake_file(content)
+        return parse_cmake_file(content, self._genex)
 
     def parse_file(self, path: Path) -> list[Target]:
-        content = path.read_text()
-        return self.parse(content)
+        data = path.read_bytes()
+        if self._cache is None:
+            return self.parse(data.decode("utf-8"))
+
+        key = self._cache.make_key(data, "cmake", {"genex_configs": self._genex_configs})
+        targets = self._cache.get(key)
+        if targets is None:
+            targets = self.parse(data.decode("utf-8"))
+            self._cache.put(key, targets)
+        return targets
+
+    def iter_parse(self, path: Path) -> Iterator[Target]:
+        """Yield the targets of ``path`` one by one while it is being parsed.
+
+        The file is memory-mapped rather than read, and each target is
+        yielded once no later command can change it (see
+        :func:`iter_cmake_targets`), so peak memory grows with the number of
+        targets in flight rather than with the file size.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if self._cache is None:
+                    yield from iter_cmake_targets(buffer, self._genex)
+                    return
+
+                # With a cache, a hit skips parsing entirely; on a miss the
+                # targets are still streamed but also kept for the cache entry.
+                options = {"genex_configs": self._genex_configs, "stream": True}
+                key = self._cache.make_key(buffer, "cmake", options)
+                cached = self._cache.get(key)
+                if cached is not None:
+                    yield from cached
+                    return
+                targets = []
+                for target in iter_cmake_targets(buffer, self._genex):
+                    targets.append(target)
+                    yield target
+                self._cache.put(key, targets)
+
+    def parse_project(
+        self, root_cmakelists: Path | str, jobs: int | None = None
+    ) -> dict[Label, Target]:
+        """Parse a project, following ``add_subdirectory()`` and ``include()``.
+
+        Commands are evaluated in CMake's order, with one scope per
+        directory and variables, functions and cache entries shared the
+        way CMake shares them. List files are tokenized ahead of time in a
+        pool of ``jobs`` worker processes (all cores by default; ``jobs=1``
+        tokenizes in this process), and each file is tokenized once no
+        matter how many directories include it. ``file(GLOB)`` and
+        ``file(GLOB_RECURSE)`` are resolved against one index of the source
+        tree, walked once, into sorted lists of explicit paths.
+
+        Returns:
+            Targets keyed by label, e.g. ``//src/core:core``, in definition
+            order.
+        """
+        root_cmakelists = Path(os.path.normpath(Path(root_cmakelists).absolute()))
+        root = root_cmakelists.parent
+        self._list_files.refresh()
+        self._directory_indexes.refresh()
+
+        scope = CMakeScope()
+        for name, value in DIRECTORY_VARIABLES.items():
+            scope.set(name, value)
+        with ListFileLoader(self._list_files, jobs) as loader:
+            project = _Project(root, loader, self._directory_indexes, self._genex)
+            labels: dict[Path, str] = {}
+            for command, args, directory in project.run(root_cmakelists, scope, root):
+                directory_label = labels.get(directory)
+                if directory_label is None:
+                    directory_label = labels[directory] = _directory_label(directory, root)
+                project.collector.add(command.name, args, directory_label)
+        targets = project.collector.finish()
+
+        merged: dict[Label, Target] = {}
+        for target, directory_label in zip(targets, project.collector.directories):
+            label = Label.get(directory_label, target.name)
+            if label in merged:
+                raise ParseError(f"Duplicate target {label}")
+            merged[label] = target
+        return merged
+
+
+class _Project:
+    """State of one :meth:`CMakeParser.parse_project` run."""
+
+    def __init__(
+        self,
+        root: Path,
+        loader: ListFileLoader,
+        directory_indexes: DirectoryIndexCache,
+        genex: GenexConfigs,
+    ) -> None:
+        self.root = root
+        self.loader = loader
+        self.directory_indexes = directory_indexes
+        # Functions and macros are global to a project.
+        self.functions: dict[str, CMakeFunction] = {}
+        self.collector = TargetCollector(genex)
+        self._running: list[Path] = []
+
+    def run(
+        self, path: Path, scope: CMakeScope, directory: Path
+    ) -> Iterator[tuple[CMakeCommand, list[str], Path]]:
+        """Evaluate list file ``path`` for ``directory``, yielding target commands."""
+        if path in self._running:
+            cycle = " -> ".join(str(p) for p in [*self._running, path])
+            raise ParseError(f"Include cycle: {cycle}")
+        list_file = self.loader.load(path)
+        self._running.append(path)
+        try:
+            interpreter = CMakeInterpreter(scope, self.functions)
+            for command, args in interpreter.run(list_file.commands):
+                if command.name == "add_subdirectory" and args:
+                    yield from self._add_subdirectory(args, scope, directory)
+                elif command.name == "include" and args:
+                    yield from self._include(args, scope, directory)
+                elif command.name == "file" and args[:1] in (["GLOB"], ["GLOB_RECURSE"]):
+                    self._glob(args, scope, directory)
+                else:
+                    yield command, args, directory
+        finally:
+            self._running.pop()
+
+    def _add_subdirectory(
+        self, args: list[str], scope: CMakeScope, directory: Path
+    ) -> Iterator[tuple[CMakeCommand, list[str], Path]]:
+        subdirectory = _resolve(args[0], directory, self.root)
+        child = scope.child()
+        for name in ("CMAKE_CURRENT_SOURCE_DIR", "CMAKE_CURRENT_LIST_DIR"):
+            child.set(name, ".")
+        yield from self.run(subdirectory / "CMakeLists.txt", child, subdirectory)
+
+    def _include(
+        self, args: list[str], scope: CMakeScope, directory: Path
+    ) -> Iterator[tuple[CMakeCommand, list[str], Path]]:
+        name = args[0]
+        if name.endswith(".cmake") or "/" in name:
+            candidates = [_resolve(name, directory, self.root)]
+        else:
+            # A module name, searched for in CMAKE_MODULE_PATH. Modules
+            # that are not found there are CMake's own and are skipped.
+            module_path = split_list(scope.get("CMAKE_MODULE_PATH") or "")
+            candidates = [_resolve(f"{p}/{name}.cmake", directory, self.root) for p in module_path]
+            if not any(candidate.is_file() for candidate in candidates):
+                return
+        path = next((c for c in candidates if c.is_file()), None)
+        if path is None:
+            if "OPTIONAL" in args[1:]:
+                return
+            raise ParseError(f"Cannot include {candidates[0]}")
+
+        list_dir = scope.get("CMAKE_CURRENT_LIST_DIR")
+        module_dir = path.parent
+        scope.set(
+            "CMAKE_CURRENT_LIST_DIR",
+            "." if module_dir == directory else _directory_label(module_dir, self.root),
+        )
+        try:
+            yield from self.run(path, scope, directory)
+        finally:
+            if list_dir is None:
+                scope.unset("CMAKE_CURRENT_LIST_DIR")
+            else:
+                scope.set("CMAKE_CURRENT_LIST_DIR", list_dir)
+
+    def _glob(self, args: list[str], scope: CMakeScope, directory: Path) -> None:
+        # file(GLOB|GLOB_RECURSE <variable> [LIST_DIRECTORIES <bool>]
+        #      [RELATIVE <path>] [CONFIGURE_DEPENDS] <patterns>...)
+        if len(args) < 2:
+            return
+        recurse = args[0] == "GLOB_RECURSE"
+        list_directories = not recurse
+        relative: Path | None = None
+        # Patterns from CMAKE_SOURCE_DIR, then any other, with their results
+        # given in the same form.
+        patterns: tuple[list[str], list[str]] = ([], [])
+        options = iter(args[2:])
+        for arg in options:
+            if arg == "LIST_DIRECTORIES":
+                list_directories = next(options, "").upper() in _TRUE_CONSTANTS
+            elif arg == "RELATIVE":
+                relative = _resolve(next(options, "."), directory, self.root)
+            elif arg not in ("CONFIGURE_DEPENDS", "FOLLOW_SYMLINKS"):
+                resolved = _resolve(arg, directory, self.root).as_posix()
+                patterns[not arg.startswith("//")].append(resolved)
+
+        paths: list[str] = []
+        for from_root, group in zip((True, False), patterns):
+            if group:
+                matches = self.directory_indexes.glob(group, self.root, recurse, list_directories)
+                base = None if from_root else directory
+                paths.extend(_glob_path(Path(m), base, relative, self.root) for m in matches)
+        scope.set(args[1], ";".join(sorted(dict.fromkeys(paths))))
+
+
+def _glob_path(path: Path, base: Path | None, relative: Path | None, root: Path) -> str:
+    # A glob result in the form directory variables use: relative to
+    # ``base`` when it is under it, else ``//`` and relative to the root.
+    if relative is not None:
+        return Path(os.path.relpath(path, relative)).as_posix()
+    if base is not None and path.is_relative_to(base):
+        return path.relative_to(base).as_posix()
+    if path.is_relative_to(root):
+        return "//" + path.relative_to(root).as_posix()
+    return path.as_posix()
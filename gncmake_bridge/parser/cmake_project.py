@@ -0,0 +1,190 @@
+"""Shared, memoized tokenizing of the CMake list files of a project.
+
+A CMake project is a tree of ``CMakeLists.txt`` files joined by
+``add_subdirectory()``, plus ``.cmake`` modules pulled in with ``include()``,
+often by every directory of the project. :class:`ListFileCache` tokenizes
+each file once and hands every directory that includes it the same commands.
+An entry is reused while the file's modification time and size are
+unchanged, or, when they have changed, while its content hash still is.
+
+:class:`ListFileLoader` tokenizes the files a project is about to need in
+worker processes, so that subdirectories are parsed concurrently while
+commands are still evaluated in CMake's order.
+"""
+import hashlib
+import os
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.parser.cmake_lexer import ArgumentKind, CMakeCommand, CMakeLexer
+
+
+@dataclass(frozen=True)
+class ListFile:
+    """The tokenized commands of one CMake list file."""
+
+    path: Path
+    commands: tuple[CMakeCommand, ...]
+    stamp: tuple[int, int]
+    digest: str
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_list_file(path: Path) -> ListFile:
+    """Read and tokenize ``path``."""
+    try:
+        stamp = _stamp(path)
+        data = path.read_bytes()
+    except OSError as e:
+        raise ParseError(f"Cannot read {path}: {e.strerror}") from e
+    try:
+        commands = tuple(CMakeLexer(data.decode("utf-8")).commands())
+    except ParseError as e:
+        raise ParseError(f"{path}: {e}") from e
+    return ListFile(path, commands, stamp, hashlib.sha256(data).hexdigest())
+
+
+def referenced_list_files(list_file: ListFile) -> list[Path]:
+    """List files that ``list_file`` names literally in ``add_subdirectory()``
+    or ``include()``, resolved against its directory.
+
+    References built from variables are not resolved; this is only used to
+    start parsing files before they are needed.
+    """
+    directory = list_file.path.parent
+    paths: list[Path] = []
+    for command in list_file.commands:
+        if command.name not in ("add_subdirectory", "include") or not command.arguments:
+            continue
+        argument = command.arguments[0]
+        if argument.kind is ArgumentKind.BRACKET or "$" in argument.value:
+            continue
+        if command.name == "add_subdirectory":
+            paths.append(directory / argument.value / "CMakeLists.txt")
+        elif argument.value.endswith(".cmake"):
+            paths.append(directory / argument.value)
+    return paths
+
+
+class ListFileCache:
+    """Tokenized list files, shared by every directory that reads them.
+
+    Files are checked for changes at most once between calls to
+    :meth:`refresh`, so a long-lived cache should be refreshed before each
+    new pass over a project.
+    """
+
+    def __init__(self) -> None:
+        # Number of times each file has been tokenized.
+        self.parses: Counter[Path] = Counter()
+        self._files: dict[Path, ListFile] = {}
+        self._checked: set[Path] = set()
+
+    def get(self, path: Path) -> ListFile | None:
+        """Return the tokenized ``path`` if it is cached and still current."""
+        list_file = self._files.get(path)
+        if list_file is None or path in self._checked:
+            return list_file
+        try:
+            stamp = _stamp(path)
+            if stamp != list_file.stamp:
+                # Touched, but possibly not changed; compare the content.
+                data = path.read_bytes()
+                if hashlib.sha256(data).hexdigest() != list_file.digest:
+                    return None
+                list_file = self._files[path] = ListFile(
+                    path, list_file.commands, stamp, list_file.digest
+                )
+        except OSError:
+            return None
+        self._checked.add(path)
+        return list_file
+
+    def load(self, path: Path) -> ListFile:
+        """Return the tokenized ``path``, tokenizing it if needed."""
+        list_file = self.get(path)
+        if list_file is None:
+            list_file = read_list_file(path)
+            self.store(list_file)
+        return list_file
+
+    def store(self, list_file: ListFile) -> None:
+        """Add a file tokenized elsewhere, e.g. in a worker process."""
+        self._files[list_file.path] = list_file
+        self._checked.add(list_file.path)
+        self.parses[list_file.path] += 1
+
+    def refresh(self) -> None:
+        """Re-check files for changes on their next use."""
+        self._checked.clear()
+
+    def clear(self) -> None:
+        """Drop every tokenized file."""
+        self._files.clear()
+        self._checked.clear()
+
+
+class ListFileLoader:
+    """Loads list files through a cache, tokenizing ahead in worker processes.
+
+    Every file loaded has the files it references literally submitted to a
+    pool of ``jobs`` worker processes (all cores by default); ``jobs=1``
+    tokenizes everything in this process when it is loaded.
+    """
+
+    def __init__(self, cache: ListFileCache, jobs: int | None = None) -> None:
+        self.cache = cache
+        self._jobs = jobs
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: dict[Path, Future[ListFile]] = {}
+
+    def __enter__(self) -> "ListFileLoader":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._pending.clear()
+
+    def load(self, path: Path) -> ListFile:
+        future = self._pending.pop(path, None)
+        list_file = None
+        if future is not None:
+            try:
+                list_file = future.result()
+            except ParseError:
+                # Tokenized again below, so the error is raised here.
+                pass
+            else:
+                self.cache.store(list_file)
+        if list_file is None:
+            list_file = self.cache.load(path)
+        self.prefetch(referenced_list_files(list_file))
+        return list_file
+
+    def prefetch(self, paths: Iterable[Path]) -> None:
+        """Start tokenizing ``paths`` that are not cached already."""
+        if self._jobs == 1:
+            return
+        for path in paths:
+            path = Path(os.path.normpath(path))
+            if path in self._pending or not path.is_file() or self.cache.get(path) is not None:
+                continue
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._jobs)
+            self._pending[path] = self._pool.submit(read_list_file, path)
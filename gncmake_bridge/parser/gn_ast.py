@@ -0,0 +1,400 @@
+"""GN syntax tree and recursive-descent parser.
+
+The grammar follows the GN language reference::
+
+    File       = StatementList .
+    Statement  = Assignment | Call | Condition .
+    Assignment = LValue AssignOp Expr .
+    Call       = identifier "(" [ ExprList ] ")" [ Block ] .
+    Condition  = "if" "(" Expr ")" Block [ "else" ( Condition | Block ) ] .
+    Block      = "{" StatementList "}" .
+
+Every node records the ``start``/``end`` offsets of the source it covers.
+"""
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.parser.gn_lexer import (
+    GNLexer,
+    GNSource,
+    Token,
+    TokenType,
+    offset_to_line_column,
+    scan_string_list,
+)
+
+
+@dataclass
+class Identifier:
+    name: str
+    start: int
+    end: int
+
+
+@dataclass
+class StringLiteral:
+    """A string literal; ``raw`` is the unprocessed text between the quotes."""
+
+    raw: str
+    start: int
+    end: int
+
+
+@dataclass
+class IntegerLiteral:
+    value: int
+    start: int
+    end: int
+
+
+@dataclass
+class BooleanLiteral:
+    value: bool
+    start: int
+    end: int
+
+
+@dataclass
+class ListLiteral:
+    items: list["Node"]
+    start: int
+    end: int
+
+
+@dataclass
+class Accessor:
+    """``base.member`` or ``base[index]``."""
+
+    base: Identifier
+    member: str | None
+    index: "Node | None"
+    start: int
+    end: int
+
+
+@dataclass
+class UnaryOp:
+    op: str
+    operand: "Node"
+    start: int
+    end: int
+
+
+@dataclass
+class BinaryOp:
+    op: str
+    left: "Node"
+    right: "Node"
+    start: int
+    end: int
+
+
+@dataclass
+class Block:
+    statements: list["Node"] = field(default_factory=list)
+    start: int = 0
+    end: int = 0
+
+
+@dataclass
+class FunctionCall:
+    name: str
+    args: list["Node"]
+    block: Block | None
+    start: int
+    end: int
+
+
+@dataclass
+class Assignment:
+    target: Identifier | Accessor
+    op: str
+    value: "Node"
+    start: int
+    end: int
+
+
+@dataclass
+class Condition:
+    condition: "Node"
+    then_block: Block
+    else_block: "Block | Condition | None"
+    start: int
+    end: int
+
+
+Node = (
+    Identifier
+    | StringLiteral
+    | IntegerLiteral
+    | BooleanLiteral
+    | ListLiteral
+    | Accessor
+    | UnaryOp
+    | BinaryOp
+    | Block
+    | FunctionCall
+    | Assignment
+    | Condition
+)
+
+_ASSIGN_OPS = frozenset(("=", "+=", "-="))
+
+_BINARY_PRECEDENCE = {
+    "||": 1,
+    "&&": 2,
+    "==": 3,
+    "!=": 3,
+    "<": 4,
+    "<=": 4,
+    ">": 4,
+    ">=": 4,
+    "+": 5,
+    "-": 5,
+}
+
+
+class GNSyntaxParser:
+    """Builds a GN syntax tree from a token stream in a single pass.
+
+    Tokens are consumed from an iterator with two tokens of lookahead, so the
+    parser never needs the full token list in memory.
+    """
+
+    def __init__(self, source: GNSource, tokens: Iterable[Token] | None = None) -> None:
+        self._source = source
+        self._lexer: GNLexer | None = None
+        if tokens is None:
+            self._lexer = GNLexer(source)
+            tokens = self._lexer.tokens()
+        self._tokens = iter(tokens)
+        self._current = next(self._tokens)
+        self._next: Token | None = None
+
+    def parse(self) -> Block:
+        """Parse the whole file into a top-level block."""
+        statements = list(self.iter_statements())
+        end = statements[-1].end if statements else 0
+        return Block(statements=statements, start=0, end=end)
+
+    def iter_statements(self) -> Iterator[Node]:
+        """Yield top-level statements one at a time as they are completed."""
+        while self._current.type != TokenType.EOF:
+            yield self._statement()
+
+    def close(self) -> None:
+        """Stop tokenizing and release the lexer's hold on the source buffer."""
+        close = getattr(self._tokens, "close", None)
+        if close is not None:
+            close()
+
+    def parse_expression(self) -> Node:
+        """Parse a single standalone expression."""
+        expr = self._expression(0)
+        self._expect(TokenType.EOF, "end of expression")
+        return expr
+
+    def _advance(self) -> Token:
+        token = self._current
+        if self._next is not None:
+            self._current = self._next
+            self._next = None
+        elif token.type != TokenType.EOF:
+            self._current = next(self._tokens)
+        return token
+
+    def _kind(self) -> TokenType:
+        # The current token's type, read again after _advance(); mypy would
+        # keep a comparison of self._current.type narrowed across the call.
+        return self._current.type
+
+    def _peek(self) -> Token:
+        if self._next is None:
+            if self._current.type == TokenType.EOF:
+                return self._current
+            self._next = next(self._tokens)
+        return self._next
+
+    def _error(self, message: str, token: Token) -> ParseError:
+        line, column = offset_to_line_column(self._source, token.start)
+        return ParseError(message, line, column)
+
+    def _expect(self, token_type: TokenType, what: str) -> Token:
+        if self._current.type != token_type:
+            found = self._current.value or self._current.type.value
+            raise self._error(f"Expected {what}, found {found!r}", self._current)
+        return self._advance()
+
+    def _statement(self) -> Node:
+        token = self._current
+        if token.type == TokenType.IF:
+            return self._condition()
+        if token.type != TokenType.IDENTIFIER:
+            found = token.value or token.type.value
+            raise self._error(f"Expected statement, found {found!r}", token)
+
+        if self._peek().type == TokenType.LEFT_PAREN:
+            return self._call()
+
+        target = self._lvalue()
+        op = self._current
+        if op.type != TokenType.OPERATOR or op.value not in _ASSIGN_OPS:
+            found = op.value or op.type.value
+            raise self._error(f"Expected assignment operator, found {found!r}", op)
+        self._advance()
+        value = self._expression(0)
+        return Assignment(target, op.value, value, target.start, value.end)
+
+    def _lvalue(self) -> Identifier | Accessor:
+        name = self._advance()
+        ident = Identifier(name.value, name.start, name.end)
+        if self._current.type in (TokenType.DOT, TokenType.LEFT_BRACKET):
+            return self._accessor(ident)
+        return ident
+
+    def _accessor(self, base: Identifier) -> Accessor:
+        if self._current.type == TokenType.DOT:
+            self._advance()
+            member = self._expect(TokenType.IDENTIFIER, "identifier after '.'")
+            return Accessor(base, member.value, None, base.start, member.end)
+        self._advance()
+        index = self._expression(0)
+        close = self._expect(TokenType.RIGHT_BRACKET, "']'")
+        return Accessor(base, None, index, base.start, close.end)
+
+    def _call(self) -> FunctionCall:
+        name = self._advance()
+        self._advance()
+        args: list[Node] = []
+        while self._current.type != TokenType.RIGHT_PAREN:
+            args.append(self._expression(0))
+            if self._current.type == TokenType.COMMA:
+                self._advance()
+            elif self._kind() != TokenType.RIGHT_PAREN:
+                raise self._error("Expected ',' or ')' in argument list", self._current)
+        end = self._advance().end
+        block = None
+        if self._kind() == TokenType.LEFT_BRACE:
+            block = self._block()
+            end = block.end
+        return FunctionCall(name.value, args, block, name.start, end)
+
+    def _condition(self) -> Condition:
+        start = self._advance().start
+        self._expect(TokenType.LEFT_PAREN, "'(' after 'if'")
+        condition = self._expression(0)
+        self._expect(TokenType.RIGHT_PAREN, "')' after condition")
+        then_block = self._block()
+        else_block: Block | Condition | None = None
+        end = then_block.end
+        if self._current.type == TokenType.ELSE:
+            self._advance()
+            if self._kind() == TokenType.IF:
+                else_block = self._condition()
+            else:
+                else_block = self._block()
+            end = else_block.end
+        return Condition(condition, then_block, else_block, start, end)
+
+    def _block(self) -> Block:
+        start = self._expect(TokenType.LEFT_BRACE, "'{'").start
+        statements: list[Node] = []
+        while self._current.type != TokenType.RIGHT_BRACE:
+            if self._current.type == TokenType.EOF:
+                raise self._error("Unterminated block, expected '}'", self._current)
+            statements.append(self._statement())
+        end = self._advance().end
+        return Block(statements, start, end)
+
+    def _expression(self, min_precedence: int) -> Node:
+        left = self._unary()
+        while True:
+            op = self._current
+            if op.type != TokenType.OPERATOR:
+                return left
+            precedence = _BINARY_PRECEDENCE.get(op.value, 0)
+            if precedence <= min_precedence:
+                return left
+            self._advance()
+            right = self._expression(precedence)
+            left = BinaryOp(op.value, left, right, left.start, right.end)
+
+    def _unary(self) -> Node:
+        token = self._current
+        if token.type == TokenType.OPERATOR and token.value == "!":
+            self._advance()
+            operand = self._unary()
+            return UnaryOp("!", operand, token.start, operand.end)
+        return self._primary()
+
+    def _primary(self) -> Node:
+        token = self._current
+        kind = token.type
+        if kind == TokenType.STRING:
+            self._advance()
+            return StringLiteral(token.value, token.start, token.end)
+        if kind == TokenType.INTEGER:
+            self._advance()
+            return IntegerLiteral(int(token.value), token.start, token.end)
+        if kind == TokenType.OPERATOR and token.value == "-":
+            self._advance()
+            number = self._expect(TokenType.INTEGER, "integer after '-'")
+            return IntegerLiteral(-int(number.value), token.start, number.end)
+        if kind in (TokenType.TRUE, TokenType.FALSE):
+            self._advance()
+            return BooleanLiteral(kind == TokenType.TRUE, token.start, token.end)
+        if kind == TokenType.IDENTIFIER:
+            next_type = self._peek().type
+            if next_type == TokenType.LEFT_PAREN:
+                return self._call()
+            self._advance()
+            ident = Identifier(token.value, token.start, token.end)
+            if next_type in (TokenType.DOT, TokenType.LEFT_BRACKET):
+                return self._accessor(ident)
+            return ident
+        if kind == TokenType.LEFT_BRACKET:
+            return self._list()
+        if kind == TokenType.LEFT_BRACE:
+            return self._block()
+        if kind == TokenType.LEFT_PAREN:
+            self._advance()
+            expr = self._expression(0)
+            self._expect(TokenType.RIGHT_PAREN, "')'")
+            return expr
+        found = token.value or token.type.value
+        raise self._error(f"Expected expression, found {found!r}", token)
+
+    def _list(self) -> ListLiteral:
+        start = self._current.start
+        if self._lexer is not None and self._next is None:
+            # Fast path for the long string-only lists that dominate generated
+            # build files: scan them straight from the buffer by offset.
+            scanned = scan_string_list(self._source, start)
+            if scanned is not None:
+                strings, end = scanned
+                self._lexer.seek(end)
+                self._current = next(self._tokens)
+                items: list[Node] = [StringLiteral(t.value, t.start, t.end) for t in strings]
+                return ListLiteral(items, start, end)
+
+        self._advance()
+        items = []
+        while self._current.type != TokenType.RIGHT_BRACKET:
+            items.append(self._expression(0))
+            if self._current.type == TokenType.COMMA:
+                self._advance()
+            elif self._kind() != TokenType.RIGHT_BRACKET:
+                raise self._error("Expected ',' or ']' in list", self._current)
+        end = self._advance().end
+        return ListLiteral(items, start, end)
+
+
+def parse_gn_ast(source: GNSource) -> Block:
+    """Parse GN source text into a syntax tree."""
+    return GNSyntaxParser(source).parse()
+
+
+def parse_gn_expression(source: str) -> Node:
+    """Parse a standalone GN expression such as ``is_linux && !is_debug``."""
+    return GNSyntaxParser(source).parse_expression()
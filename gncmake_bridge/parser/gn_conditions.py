@@ -0,0 +1,279 @@
+"""Evaluation of GN condition blocks for many build configurations at once.
+
+Condition text such as ``is_linux && !is_debug`` is compiled once into a
+function over a :class:`ConfigMatrix`. Evaluating it yields a bitset with one
+bit per configuration, so a condition is evaluated a single time for the whole
+matrix and the result is shared by every target that uses the same text.
+:meth:`ConfigMatrix.resolve` then walks a target's condition tree once,
+carrying the set of configurations for which the current block is active.
+
+Variables missing from a configuration evaluate as unset: they are false in a
+boolean context and compare unequal to every value.
+"""
+from collections import ChainMap
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import fields, replace
+from functools import lru_cache
+from typing import Any
+
+from gncmake_bridge.ir import ConditionBlock, Target
+from gncmake_bridge.parser.gn_ast import (
+    BinaryOp,
+    BooleanLiteral,
+    FunctionCall,
+    Identifier,
+    IntegerLiteral,
+    Node,
+    StringLiteral,
+    UnaryOp,
+    parse_gn_expression,
+)
+from gncmake_bridge.parser.gn_eval import (
+    UNIQUE_LIST_PROPERTIES,
+    evaluate,
+    list_add,
+    list_remove,
+)
+
+# A compiled condition, returning the bitset of configurations it holds for.
+CompiledCondition = Callable[["ConfigMatrix"], int]
+# A compiled value expression, returning one value per configuration.
+_CompiledValue = Callable[["ConfigMatrix"], tuple[Any, ...]]
+
+_BOOLEAN_OPS = frozenset(("&&", "||", "==", "!=", "<", "<=", ">", ">="))
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+# GN property names whose Target field is named differently.
+_PROPERTY_FIELDS = {"cflags": "compile_flags", "ldflags": "link_flags"}
+_TARGET_FIELDS = frozenset(f.name for f in fields(Target))
+
+
+def _is_boolean(node: Node) -> bool:
+    if isinstance(node, (UnaryOp, BooleanLiteral)):
+        return True
+    if isinstance(node, BinaryOp):
+        return node.op in _BOOLEAN_OPS
+    return isinstance(node, FunctionCall) and node.name == "defined"
+
+
+def _compile_mask(node: Node) -> CompiledCondition:
+    if isinstance(node, BooleanLiteral):
+        value = node.value
+        return lambda m: m.all if value else 0
+    if isinstance(node, Identifier):
+        name = node.name
+        return lambda m: m.truth(name)
+    if isinstance(node, UnaryOp):
+        operand = _compile_mask(node.operand)
+        return lambda m: ~operand(m) & m.all
+    if isinstance(node, FunctionCall) and node.name == "defined" and len(node.args) == 1:
+        arg = node.args[0]
+        if isinstance(arg, Identifier):
+            name = arg.name
+            return lambda m: m.defined(name)
+    if isinstance(node, BinaryOp):
+        op = node.op
+        if op in ("&&", "||"):
+            left, right = _compile_mask(node.left), _compile_mask(node.right)
+            if op == "&&":
+                return lambda m: left(m) & right(m)
+            return lambda m: left(m) | right(m)
+        if op in ("==", "!="):
+            return _compile_equality(node)
+        if op in _COMPARISONS:
+            compare = _COMPARISONS[op]
+            lvalues, rvalues = _compile_value(node.left), _compile_value(node.right)
+
+            def ordered(m: "ConfigMatrix") -> int:
+                return m.mask_where(
+                    isinstance(a, int) and isinstance(b, int) and compare(a, b)
+                    for a, b in zip(lvalues(m), rvalues(m))
+                )
+
+            return ordered
+    values = _compile_value(node)
+    return lambda m: m.mask_where(value is True for value in values(m))
+
+
+def _compile_equality(node: BinaryOp) -> CompiledCondition:
+    negate = node.op == "!="
+    left, right = node.left, node.right
+    if isinstance(left, (StringLiteral, IntegerLiteral)) and isinstance(right, Identifier):
+        left, right = right, left
+    if (
+        isinstance(left, Identifier)
+        and isinstance(right, (IntegerLiteral, StringLiteral))
+        and (isinstance(right, IntegerLiteral) or "$" not in right.raw)
+    ):
+        # The common ``target_cpu == "x64"`` shape is answered from a
+        # per-variable index instead of comparing every configuration.
+        name = left.name
+        constant = right.value if isinstance(right, IntegerLiteral) else right.raw
+        if negate:
+            return lambda m: ~m.equals(name, constant) & m.all
+        return lambda m: m.equals(name, constant)
+
+    lvalues, rvalues = _compile_value(left), _compile_value(right)
+
+    def equality(m: "ConfigMatrix") -> int:
+        mask = m.mask_where(
+            a is not None and a == b for a, b in zip(lvalues(m), rvalues(m))
+        )
+        return ~mask & m.all if negate else mask
+
+    return equality
+
+
+def _compile_value(node: Node) -> _CompiledValue:
+    if _is_boolean(node):
+        mask = _compile_mask(node)
+        return lambda m: m.values_of(mask(m))
+    if isinstance(node, Identifier):
+        name = node.name
+        return lambda m: m.column(name)
+    if isinstance(node, IntegerLiteral) or (
+        isinstance(node, StringLiteral) and "$" not in node.raw and "\\" not in node.raw
+    ):
+        constant = node.value if isinstance(node, IntegerLiteral) else node.raw
+        return lambda m: (constant,) * m.size
+    # Anything else (interpolated strings, accessors, arithmetic) is rare in
+    # conditions and is evaluated per configuration.
+    return lambda m: tuple(evaluate(node, ChainMap(dict(config))) for config in m.configs)
+
+
+@lru_cache(maxsize=4096)
+def compile_condition(condition: str) -> CompiledCondition:
+    """Compile condition text into a function over a :class:`ConfigMatrix`."""
+    return _compile_mask(parse_gn_expression(condition))
+
+
+class ConfigMatrix:
+    """A set of named build configurations that conditions are evaluated over.
+
+    Args:
+        configs: Build arguments of each configuration, by configuration
+            name, e.g. ``{"linux_debug": {"is_linux": True, "is_debug": True}}``.
+    """
+
+    def __init__(self, configs: Mapping[str, Mapping[str, Any]]) -> None:
+        self.names = list(configs)
+        self.configs = [dict(configs[name]) for name in self.names]
+        self.size = len(self.names)
+        self.all = (1 << self.size) - 1
+        self._masks: dict[str, int] = {}
+        self._columns: dict[str, tuple[Any, ...]] = {}
+        self._equals: dict[tuple[str, Any], int] = {}
+
+    def mask(self, condition: str) -> int:
+        """Bitset of the configurations for which ``condition`` holds."""
+        mask = self._masks.get(condition)
+        if mask is None:
+            mask = self._masks[condition] = compile_condition(condition)(self)
+        return mask
+
+    def matching(self, condition: str) -> list[str]:
+        """Names of the configurations for which ``condition`` holds."""
+        return [self.names[i] for i in self._bits(self.mask(condition))]
+
+    def resolve(self, target: Target) -> dict[str, Target]:
+        """Effective target for each configuration, with conditions applied.
+
+        The condition tree is walked once for all configurations; a block's
+        properties are applied to every configuration in its active set.
+        List properties from active blocks are appended to the target's own
+        lists and entries removed by active blocks are dropped afterwards;
+        other properties replace the target's value.
+        """
+        additions: list[dict[str, Any]] = [{} for _ in self.names]
+        removals: list[dict[str, list[str]]] = [{} for _ in self.names]
+        self._apply(target.conditions, self.all, additions, removals)
+        return {
+            name: self._effective(target, added, removed)
+            for name, added, removed in zip(self.names, additions, removals)
+        }
+
+    def _apply(
+        self,
+        blocks: list[ConditionBlock],
+        active: int,
+        additions: list[dict[str, Any]],
+        removals: list[dict[str, list[str]]],
+    ) -> None:
+        for block in blocks:
+            mask = active & self.mask(block.condition)
+            if not mask:
+                continue
+            if block.properties or block.removals:
+                for index in self._bits(mask):
+                    added = additions[index]
+                    for name, value in block.properties.items():
+                        if isinstance(value, list):
+                            added[name] = added.get(name, []) + value
+                        else:
+                            added[name] = value
+                    removed = removals[index]
+                    for name, items in block.removals.items():
+                        removed[name] = removed.get(name, []) + items
+            if block.conditions:
+                self._apply(block.conditions, mask, additions, removals)
+
+    def _effective(
+        self, target: Target, additions: dict[str, Any], removals: dict[str, list[str]]
+    ) -> Target:
+        changes: dict[str, Any] = {"conditions": []}
+        for name in additions.keys() | removals.keys():
+            field_name = _PROPERTY_FIELDS.get(name, name)
+            if field_name not in _TARGET_FIELDS:
+                continue
+            value = additions.get(name, [])
+            if isinstance(value, list):
+                value = list_add(getattr(target, field_name), value, name in UNIQUE_LIST_PROPERTIES)
+                if name in removals:
+                    value = list_remove(value, removals[name])
+            changes[field_name] = value
+        return replace(target, **changes)
+
+    def truth(self, name: str) -> int:
+        return self.equals(name, True)
+
+    def defined(self, name: str) -> int:
+        return self.mask_where(name in config for config in self.configs)
+
+    def equals(self, name: str, value: Any) -> int:
+        key = (name, value)
+        mask = self._equals.get(key)
+        if mask is None:
+            # ``True == 1`` in Python; compare types so the two stay distinct.
+            mask = self.mask_where(
+                type(v) is type(value) and v == value for v in self.column(name)
+            )
+            self._equals[key] = mask
+        return mask
+
+    def column(self, name: str) -> tuple[Any, ...]:
+        """Value of variable ``name`` in each configuration."""
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = tuple(config.get(name) for config in self.configs)
+        return column
+
+    def values_of(self, mask: int) -> tuple[bool, ...]:
+        return tuple(bool(mask >> i & 1) for i in range(self.size))
+
+    def mask_where(self, flags: Iterable[bool]) -> int:
+        mask = 0
+        for i, flag in enumerate(flags):
+            if flag:
+                mask |= 1 << i
+        return mask
+
+    def _bits(self, mask: int) -> Iterator[int]:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
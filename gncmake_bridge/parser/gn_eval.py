@@ -0,0 +1,675 @@
+"""Evaluation of GN syntax trees into target IR.
+
+:class:`GNInterpreter` executes the statements of one file: it tracks
+variables in a :class:`~collections.ChainMap` scope, applies ``import()`` and
+``declare_args()``, expands templates, evaluates top-level conditions where
+their value is known and builds a :class:`~gncmake_bridge.ir.Target` for
+every target call.
+Conditions inside target bodies are kept symbolic as condition blocks.
+
+Evaluated values are never mutated in place, so lists and dicts may be shared
+between scopes (in particular with the read-only scopes of imported files).
+"""
+import re
+import time
+from collections import ChainMap
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar, cast
+
+from gncmake_bridge.ir import ConditionBlock, GNTemplate, Target, TargetType
+from gncmake_bridge.parser.gn_ast import (
+    Accessor,
+    Assignment,
+    BinaryOp,
+    Block,
+    BooleanLiteral,
+    Condition,
+    FunctionCall,
+    Identifier,
+    IntegerLiteral,
+    ListLiteral,
+    Node,
+    StringLiteral,
+    UnaryOp,
+)
+from gncmake_bridge.parser.gn_lexer import GNSource, source_text
+from gncmake_bridge.parser.gn_templates import CompiledTemplate, Templates, compile_template
+
+if TYPE_CHECKING:
+    from gncmake_bridge.parser.gn_imports import GNModule, ImportResolver
+
+TARGET_FUNCTIONS = {
+    "executable": TargetType.EXECUTABLE,
+    "static_library": TargetType.STATIC_LIBRARY,
+    "shared_library": TargetType.SHARED_LIBRARY,
+    "source_set": TargetType.SOURCE_SET,
+    "group": TargetType.GROUP,
+    "action": TargetType.ACTION,
+    "generated_file": TargetType.GENERATE_FILE,
+}
+
+LIST_PROPERTIES = frozenset(
+    (
+        "sources",
+        "headers",
+        "deps",
+        "public_deps",
+        "private_deps",
+        "data_deps",
+        "cflags",
+        "cflags_cc",
+        "ldflags",
+        "include_dirs",
+        "defines",
+        "visibility",
+        "configs",
+        "inputs",
+        "outputs",
+    )
+)
+STRING_PROPERTIES = frozenset(("output_name", "script", "response_file_name"))
+BOOL_PROPERTIES = frozenset(("testonly", "complete_static_lib"))
+# List properties naming files, labels or settings: an entry only makes sense
+# once, so appending one that is already present is a no-op. Flags may repeat.
+UNIQUE_LIST_PROPERTIES = LIST_PROPERTIES - {"cflags", "cflags_cc", "ldflags"}
+
+Scope = ChainMap[str, Any]
+_V = TypeVar("_V")
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_STRING_ESCAPE_RE = re.compile(
+    r"\\([\\\"$])|\$(?:\{([^}]*)\}|([A-Za-z_][A-Za-z0-9_]*)|0x([0-9A-Fa-f]{2}))"
+)
+
+
+def expand_string(raw: str, scope: Mapping[str, Any]) -> str:
+    """Resolve escapes and ``$var`` / ``${var}`` interpolation in a string literal.
+
+    References that cannot be resolved are kept verbatim.
+    """
+    if "\\" not in raw and "$" not in raw:
+        return raw
+
+    def replace(match: re.Match[str]) -> str:
+        escaped, braced, bare, hex_byte = match.groups()
+        if escaped is not None:
+            return escaped
+        if hex_byte is not None:
+            return chr(int(hex_byte, 16))
+        expression = braced if braced is not None else bare
+        value = _lookup_path(expression.strip(), scope)
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (str, int)):
+            return str(value)
+        return match.group()
+
+    return _STRING_ESCAPE_RE.sub(replace, raw)
+
+
+def _lookup_path(expression: str, scope: Mapping[str, Any]) -> Any:
+    name, _, member = expression.partition(".")
+    value = scope.get(name)
+    if member:
+        return value.get(member) if isinstance(value, dict) else None
+    return value
+
+
+def evaluate(node: Node, scope: Scope) -> Any:
+    """Evaluate an expression node against ``scope``.
+
+    Returns ``None`` when the value depends on something that is not known
+    statically, such as an undefined build argument or a built-in function
+    that needs the build environment.
+    """
+    if isinstance(node, StringLiteral):
+        return expand_string(node.raw, scope)
+    if isinstance(node, ListLiteral):
+        items = []
+        for item in node.items:
+            value = evaluate(item, scope)
+            if value is not None:
+                items.append(value)
+        return items
+    if isinstance(node, Identifier):
+        return scope.get(node.name)
+    if isinstance(node, (IntegerLiteral, BooleanLiteral)):
+        return node.value
+    if isinstance(node, BinaryOp):
+        return _evaluate_binary(node, scope)
+    if isinstance(node, UnaryOp):
+        operand = evaluate(node.operand, scope)
+        return (not operand) if isinstance(operand, bool) else None
+    if isinstance(node, Accessor):
+        base = scope.get(node.base.name)
+        if node.member is not None:
+            return base.get(node.member) if isinstance(base, dict) else None
+        index = evaluate(node.index, scope) if node.index is not None else None
+        if isinstance(base, list) and isinstance(index, int) and 0 <= index < len(base):
+            return base[index]
+        return None
+    if isinstance(node, FunctionCall):
+        if node.name == "defined" and len(node.args) == 1:
+            arg = node.args[0]
+            if isinstance(arg, Identifier):
+                return arg.name in scope
+            if isinstance(arg, Accessor) and arg.member is not None:
+                base = scope.get(arg.base.name)
+                return isinstance(base, dict) and arg.member in base
+        return None
+    if isinstance(node, Block):
+        block_scope = scope.new_child()
+        run_block(node.statements, block_scope)
+        return dict(block_scope.maps[0])
+    return None
+
+
+def _evaluate_binary(node: BinaryOp, scope: Scope) -> Any:
+    op = node.op
+    left = evaluate(node.left, scope)
+    if op == "&&" and left is False:
+        return False
+    if op == "||" and left is True:
+        return True
+    right = evaluate(node.right, scope)
+    if left is None or right is None:
+        return None
+
+    if op in ("&&", "||"):
+        return right if isinstance(right, bool) else None
+    if op == "==":
+        return left == right
+    if op == "!=":
+        return left != right
+    if op == "+":
+        if isinstance(left, list):
+            return list_add(left, right if isinstance(right, list) else [right])
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+        if isinstance(left, int) and isinstance(right, int):
+            return left + right
+        return None
+    if op == "-":
+        if isinstance(left, list):
+            return list_remove(left, right if isinstance(right, list) else [right])
+        if isinstance(left, int) and isinstance(right, int):
+            return left - right
+        return None
+    if isinstance(left, int) and isinstance(right, int):
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+        if op == ">":
+            return left > right
+        if op == ">=":
+            return left >= right
+    return None
+
+
+def list_add(current: list[Any], added: list[Any], unique: bool = False) -> list[Any]:
+    """Return ``current`` followed by ``added``.
+
+    With ``unique``, entries already present (or repeated in ``added``) are
+    skipped. Membership is tracked in a hash set, so the cost is linear.
+    """
+    if not unique:
+        return current + added
+    result = list(current)
+    try:
+        seen = set(current)
+        for item in added:
+            if item not in seen:
+                seen.add(item)
+                result.append(item)
+    except TypeError:
+        # Unhashable entries, such as scopes.
+        result = list(current)
+        for item in added:
+            if item not in result:
+                result.append(item)
+    return result
+
+
+def list_remove(current: list[Any], removed: list[Any]) -> list[Any]:
+    """Return ``current`` without any entry of ``removed``, keeping order.
+
+    The removed entries are looked up in a hash set, so removing many entries
+    from a long list is a single pass rather than one scan per entry.
+    """
+    try:
+        removed_set = set(removed)
+        return [item for item in current if item not in removed_set]
+    except TypeError:
+        return [item for item in current if item not in removed]
+
+
+def apply_assignment(current: Any, op: str, value: Any, unique: bool = False) -> Any:
+    """Value of a variable after ``=``, ``+=`` or ``-=``.
+
+    Neither operand is modified, so values shared with other scopes are safe.
+    An unresolved right-hand side leaves the variable unchanged.
+    """
+    if op == "=":
+        return value
+    if value is None:
+        return current
+    if current is None:
+        return value if op == "+=" else None
+    if isinstance(current, list):
+        items = value if isinstance(value, list) else [value]
+        if op == "+=":
+            return list_add(current, items, unique)
+        return list_remove(current, items)
+    if isinstance(current, bool) or isinstance(value, bool):
+        return None
+    if op == "+=" and isinstance(current, str) and isinstance(value, str):
+        return current + value
+    if isinstance(current, int) and isinstance(value, int):
+        return current + value if op == "+=" else current - value
+    return None
+
+
+def run_block(statements: Iterable[Node], scope: Scope) -> None:
+    """Execute the variable statements of a block into ``scope``.
+
+    Assignments and ``forward_variables_from()`` are applied; ``if`` blocks
+    run when their condition is known and are skipped otherwise.
+    """
+    for statement in statements:
+        if isinstance(statement, Assignment):
+            if isinstance(statement.target, Identifier):
+                name = statement.target.name
+                value = evaluate(statement.value, scope)
+                scope[name] = apply_assignment(scope.get(name), statement.op, value)
+        elif isinstance(statement, FunctionCall):
+            if statement.name == "forward_variables_from":
+                scope.update(_forwarded_variables(statement, scope))
+        elif isinstance(statement, Condition):
+            value = evaluate(statement.condition, scope)
+            branch: Block | Condition | None = statement.then_block if value is True else None
+            if value is False:
+                branch = statement.else_block
+            if isinstance(branch, Block):
+                run_block(branch.statements, scope)
+            elif isinstance(branch, Condition):
+                run_block((branch,), scope)
+
+
+def _forwarded_variables(call: FunctionCall, scope: Scope) -> dict[str, Any]:
+    """Variables copied by ``forward_variables_from(from, names, [exclude])``."""
+    if len(call.args) < 2:
+        return {}
+    from_scope = evaluate(call.args[0], scope)
+    names = evaluate(call.args[1], scope)
+    if not isinstance(from_scope, Mapping):
+        return {}
+    excluded = evaluate(call.args[2], scope) if len(call.args) > 2 else None
+    excluded = set(excluded) if isinstance(excluded, list) else set()
+    if names == "*":
+        return {k: v for k, v in from_scope.items() if k not in excluded}
+    if isinstance(names, list):
+        return {k: from_scope[k] for k in names if isinstance(k, str) and k in from_scope}
+    return {}
+
+
+def _negate(condition: str) -> str:
+    if _IDENTIFIER_RE.fullmatch(condition):
+        return f"!{condition}"
+    return f"!({condition})"
+
+
+def _set_property(properties: dict[str, Any], name: str, value: Any) -> None:
+    if name in LIST_PROPERTIES:
+        if isinstance(value, list):
+            properties[name] = [item for item in value if isinstance(item, str)]
+    elif name in STRING_PROPERTIES:
+        if isinstance(value, str):
+            properties[name] = value
+    elif name in BOOL_PROPERTIES:
+        if isinstance(value, bool):
+            properties[name] = value
+
+
+def _string_items(value: Any) -> list[str]:
+    items = value if isinstance(value, list) else [value]
+    return [item for item in items if isinstance(item, str)]
+
+
+def _merge_delta(
+    properties: dict[str, Any],
+    removals: dict[str, list[str]],
+    branch_properties: dict[str, Any],
+    branch_removals: dict[str, list[str]],
+) -> None:
+    for name, value in branch_properties.items():
+        current = properties.get(name)
+        if isinstance(current, list) and isinstance(value, list):
+            value = list_add(current, value, name in UNIQUE_LIST_PROPERTIES)
+        properties[name] = value
+    for name, items in branch_removals.items():
+        removals[name] = list_add(removals.get(name, []), items, unique=True)
+
+
+def _collect_properties(
+    block: Block, source: GNSource, scope: Scope, conditional: bool = False
+) -> tuple[dict[str, Any], dict[str, list[str]], list[ConditionBlock]]:
+    """Collect target properties and nested conditions from a target or if body.
+
+    In a target body the properties hold final values. In a ``conditional``
+    branch they hold what the branch adds to the target instead, and the
+    entries removed with ``-=`` are returned separately.
+    """
+    properties: dict[str, Any] = {}
+    removals: dict[str, list[str]] = {}
+    conditions: list[ConditionBlock] = []
+
+    for statement in block.statements:
+        if isinstance(statement, Condition):
+            value = evaluate(statement.condition, scope)
+            if not isinstance(value, bool):
+                conditions.extend(_build_condition_blocks(statement, source, scope))
+                continue
+            # Statically known, e.g. ``defined(invoker.deps)`` in a template:
+            # only the taken branch applies.
+            branch = statement.then_block if value else statement.else_block
+            if isinstance(branch, Condition):
+                branch = Block([branch], branch.start, branch.end)
+            if branch is not None:
+                branch_properties, branch_removals, branch_conditions = _collect_properties(
+                    branch, source, scope, conditional
+                )
+                if conditional:
+                    _merge_delta(properties, removals, branch_properties, branch_removals)
+                else:
+                    properties.update(branch_properties)
+                conditions.extend(branch_conditions)
+            continue
+        if isinstance(statement, FunctionCall):
+            if statement.name == "forward_variables_from":
+                for name, value in _forwarded_variables(statement, scope).items():
+                    scope[name] = value
+                    _set_property(properties, name, value)
+            continue
+        if not isinstance(statement, Assignment) or not isinstance(statement.target, Identifier):
+            continue
+
+        name = statement.target.name
+        op = statement.op
+        value = evaluate(statement.value, scope)
+        unique = name in UNIQUE_LIST_PROPERTIES
+        scope[name] = apply_assignment(scope.get(name), op, value, unique)
+
+        if not conditional or op == "=" or name not in LIST_PROPERTIES:
+            _set_property(properties, name, scope[name])
+        elif value is not None:
+            items = _string_items(value)
+            if op == "+=":
+                properties[name] = list_add(properties.get(name, []), items, unique)
+                if name in removals:
+                    removals[name] = list_remove(removals[name], items)
+            else:
+                removals[name] = list_add(removals.get(name, []), items, unique=True)
+                if name in properties:
+                    properties[name] = list_remove(properties[name], items)
+
+    return properties, removals, conditions
+
+
+def _build_condition_blocks(
+    node: Condition, source: GNSource, scope: Scope
+) -> list[ConditionBlock]:
+    """Turn an ``if``/``else`` chain into condition blocks.
+
+    The ``else`` branch becomes a block guarded by the negated condition; an
+    ``else if`` chain nests under that negation.
+    """
+    condition = source_text(source, node.condition.start, node.condition.end)
+    properties, removals, nested = _collect_properties(
+        node.then_block, source, scope.new_child(), conditional=True
+    )
+    blocks = [
+        ConditionBlock(
+            condition=condition, properties=properties, conditions=nested, removals=removals
+        )
+    ]
+
+    if isinstance(node.else_block, Block):
+        else_properties, else_removals, else_nested = _collect_properties(
+            node.else_block, source, scope.new_child(), conditional=True
+        )
+        blocks.append(
+            ConditionBlock(
+                condition=_negate(condition),
+                properties=else_properties,
+                conditions=else_nested,
+                removals=else_removals,
+            )
+        )
+    elif isinstance(node.else_block, Condition):
+        blocks.append(
+            ConditionBlock(
+                condition=_negate(condition),
+                conditions=_build_condition_blocks(node.else_block, source, scope),
+            )
+        )
+    return blocks
+
+
+def _make_target(
+    name: str,
+    target_type: TargetType,
+    properties: dict[str, Any],
+    conditions: list[ConditionBlock],
+) -> Target:
+    return Target(
+        name=name,
+        type=target_type,
+        sources=properties.get("sources", []),
+        headers=properties.get("headers", []),
+        deps=properties.get("deps", []),
+        public_deps=properties.get("public_deps", []),
+        private_deps=properties.get("private_deps", []),
+        data_deps=properties.get("data_deps", []),
+        compile_flags=properties.get("cflags", []),
+        link_flags=properties.get("ldflags", []),
+        include_dirs=properties.get("include_dirs", []),
+        defines=properties.get("defines", []),
+        visibility=properties.get("visibility", []),
+        output_name=properties.get("output_name"),
+        configs=properties.get("configs", []),
+        conditions=conditions,
+        script=properties.get("script"),
+        inputs=properties.get("inputs", []),
+        outputs=properties.get("outputs", []),
+        response_file_name=properties.get("response_file_name"),
+        testonly=properties.get("testonly", False),
+        complete_static_lib=properties.get("complete_static_lib", False),
+    )
+
+
+class GNInterpreter:
+    """Executes the top-level statements of one GN file.
+
+    Args:
+        source: Buffer the statements were parsed from; condition text is
+            sliced from it.
+        args: Build arguments. They are visible to every expression and
+            override the defaults given in ``declare_args()``.
+        imports: Resolver for ``import()``. Without one, imports are skipped.
+        current_dir: Directory of the file, for relative import paths.
+    """
+
+    def __init__(
+        self,
+        source: GNSource,
+        args: Mapping[str, Any] | None = None,
+        imports: "ImportResolver | None" = None,
+        current_dir: Path | None = None,
+    ) -> None:
+        self.source = source
+        self.args: Mapping[str, Any] = args if args is not None else {}
+        self.imports = imports
+        self.current_dir = current_dir
+        self.scope: Scope = ChainMap({}, _shared(self.args))
+        self.templates: Templates = ChainMap({})
+        # Modules imported directly by this file, in import order.
+        self.modules: list[GNModule] = []
+        # Every template expanded while running this file, by identity.
+        self.expanded: dict[int, GNTemplate] = {}
+        # Templates being expanded; inside a template, a call to its own name
+        # refers to the built-in function it wraps.
+        self._expanding: frozenset[str] = frozenset()
+
+    def run(self, statements: Iterable[Node]) -> Iterator[Target]:
+        """Execute ``statements``, yielding each target as it is completed."""
+        for statement in statements:
+            yield from self.execute(statement)
+
+    def execute(self, statement: Node) -> Iterator[Target]:
+        if isinstance(statement, FunctionCall):
+            yield from self._call(statement)
+        elif isinstance(statement, Assignment):
+            run_block((statement,), self.scope)
+        elif isinstance(statement, Condition):
+            value = evaluate(statement.condition, self.scope)
+            branches: list[Block | Condition | None]
+            if value is True:
+                branches = [statement.then_block]
+            elif value is False:
+                branches = [statement.else_block]
+            else:
+                # Unknown build arguments: keep targets from every branch.
+                branches = [statement.then_block, statement.else_block]
+            for branch in branches:
+                if isinstance(branch, Block):
+                    yield from self.run(branch.statements)
+                elif isinstance(branch, Condition):
+                    yield from self.execute(branch)
+
+    def exported_scope(self) -> dict[str, Any]:
+        """Variables this file makes visible to files that import it.
+
+        Variables brought in by its own imports are re-exported; names that
+        start with an underscore are private to the file, as in GN.
+        """
+        # The last map holds the build arguments, which every file sees anyway.
+        return _public(self.scope.maps[:-1])
+
+    def exported_templates(self) -> dict[str, CompiledTemplate]:
+        """Templates this file makes visible to files that import it."""
+        return _public(self.templates.maps)
+
+    def _call(self, call: FunctionCall) -> Iterator[Target]:
+        name = call.name
+        template = self.templates.get(name)
+        if template is not None and name not in self._expanding:
+            yield from self._expand(template, call)
+        elif name in TARGET_FUNCTIONS:
+            target = self._build_target(call, TARGET_FUNCTIONS[name], call.args)
+            if target is not None:
+                yield target
+        elif name == "target" and len(call.args) == 2:
+            # target("static_library", name) { ... }
+            kind = evaluate(call.args[0], self.scope)
+            if kind in TARGET_FUNCTIONS:
+                target = self._build_target(call, TARGET_FUNCTIONS[kind], call.args[1:])
+                if target is not None:
+                    yield target
+        elif name == "template":
+            self._define_template(call)
+        elif name == "import":
+            self._import(call)
+        elif name == "declare_args":
+            self._declare_args(call)
+        elif name == "forward_variables_from":
+            self.scope.update(_forwarded_variables(call, self.scope))
+
+    def _build_target(
+        self, call: FunctionCall, target_type: TargetType, args: list[Node]
+    ) -> Target | None:
+        if call.block is None or len(args) != 1:
+            return None
+        name = evaluate(args[0], self.scope)
+        if not isinstance(name, str) or not name:
+            return None
+        properties, _, conditions = _collect_properties(
+            call.block, self.source, self.scope.new_child()
+        )
+        return _make_target(name, target_type, properties, conditions)
+
+    def _define_template(self, call: FunctionCall) -> None:
+        if call.block is None or len(call.args) != 1:
+            return
+        name = evaluate(call.args[0], self.scope)
+        if isinstance(name, str) and name:
+            self.templates[name] = compile_template(
+                name, call.block, self.source, self.scope, self.templates
+            )
+
+    def _expand(self, template: CompiledTemplate, call: FunctionCall) -> list[Target]:
+        """Instantiate ``template`` for one invocation."""
+        if len(call.args) != 1:
+            return []
+        target_name = evaluate(call.args[0], self.scope)
+        if not isinstance(target_name, str) or not target_name:
+            return []
+
+        started = time.perf_counter()
+        try:
+            invoker = self.scope.new_child()
+            if call.block is not None:
+                run_block(call.block.statements, invoker)
+            body = GNInterpreter(template.source, self.args, self.imports, self.current_dir)
+            body.scope = template.scope.new_child(
+                {"target_name": target_name, "invoker": dict(invoker.maps[0])}
+            )
+            body.templates = template.templates.new_child()
+            body._expanding = self._expanding | {template.name}
+            # Targets are collected rather than streamed so that the time
+            # spent in the consumer is not charged to the template.
+            targets = list(body.run(template.body.statements))
+            self.modules.extend(body.modules)
+            self.expanded.update(body.expanded)
+        finally:
+            template.info.invocation_count += 1
+            template.info.expansion_seconds += time.perf_counter() - started
+            self.expanded[id(template.info)] = template.info
+        return targets
+
+    def _import(self, call: FunctionCall) -> None:
+        if self.imports is None or len(call.args) != 1:
+            return
+        label = evaluate(call.args[0], self.scope)
+        if not isinstance(label, str):
+            return
+        path = self.imports.resolve(label, self.current_dir)
+        module = self.imports.load(path, self.args)
+        self.modules.append(module)
+        # Imported values are read-only and shared between all importers; a
+        # later assignment in this file shadows them in the local map.
+        self.scope.maps.insert(1, _shared(module.scope))
+        self.templates.maps.insert(1, _shared(module.templates))
+
+    def _declare_args(self, call: FunctionCall) -> None:
+        if call.block is None:
+            return
+        defaults: Scope = self.scope.new_child()
+        run_block(call.block.statements, defaults)
+        for name, value in defaults.maps[0].items():
+            if name not in self.args:
+                self.scope[name] = value
+
+
+def _shared(values: Mapping[str, _V]) -> MutableMapping[str, _V]:
+    # Read-only maps placed behind a scope's first map. A ChainMap only
+    # writes to its first map, so they are never written through it.
+    return cast(MutableMapping[str, _V], values)
+
+
+def _public(maps: Sequence[Mapping[str, Any]]) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    for values in reversed(maps):
+        merged.update(values)
+    return {name: value for name, value in merged.items() if not name.startswith("_")}
@@ -0,0 +1,164 @@
+"""Shared, memoized resolution of GN ``import()`` statements.
+
+Large GN trees import the same handful of ``.gni`` files from thousands of
+BUILD.gn files. :class:`ImportResolver` evaluates each ``.gni`` once per set
+of build arguments and hands every importer the same read-only scope and the
+same compiled templates.
+
+Evaluated modules form an import graph. A module is reused only while its
+file is unchanged and every module it imports is still current, so editing a
+``.gni`` re-evaluates that file and its transitive importers and nothing else.
+"""
+import os
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.parser.gn_ast import GNSyntaxParser
+from gncmake_bridge.parser.gn_eval import GNInterpreter
+from gncmake_bridge.parser.gn_templates import CompiledTemplate
+
+ArgsKey = tuple[tuple[str, Any], ...]
+
+
+@dataclass(frozen=True)
+class GNModule:
+    """The evaluated, immutable result of importing one ``.gni`` file."""
+
+    path: Path
+    scope: Mapping[str, Any]
+    templates: Mapping[str, CompiledTemplate]
+    imports: tuple["GNModule", ...]
+    stamp: tuple[int, int]
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def args_key(args: Mapping[str, Any]) -> ArgsKey:
+    """Hashable, order-independent key for a set of build arguments."""
+    return tuple(sorted((name, _freeze(value)) for name, value in args.items()))
+
+
+def iter_module_paths(modules: Iterable[GNModule]) -> Iterator[Path]:
+    """Yield the paths of ``modules`` and everything they import, once each."""
+    seen: set[Path] = set()
+    stack = list(modules)
+    while stack:
+        module = stack.pop()
+        if module.path in seen:
+            continue
+        seen.add(module.path)
+        yield module.path
+        stack.extend(module.imports)
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ImportResolver:
+    """Resolves and evaluates imported ``.gni`` files for many BUILD.gn files.
+
+    One resolver is meant to be shared by every parser working on a source
+    tree. Files are checked for changes at most once between calls to
+    :meth:`refresh`, so a long-lived resolver should be refreshed before
+    each new pass over the tree.
+
+    Args:
+        source_root: Directory that ``//`` labels are relative to.
+    """
+
+    def __init__(self, source_root: Path | str) -> None:
+        self.source_root = Path(source_root)
+        # Number of times each file has been evaluated.
+        self.evaluations: Counter[Path] = Counter()
+        self._modules: dict[tuple[Path, ArgsKey], GNModule] = {}
+        self._checked: set[tuple[Path, ArgsKey]] = set()
+        self._loading: list[Path] = []
+
+    def resolve(self, label: str, current_dir: Path | None = None) -> Path:
+        """Map an import label such as ``//build/config.gni`` to a file path."""
+        if label.startswith("//"):
+            path = self.source_root / label[2:]
+        elif label.startswith("/"):
+            path = Path(label)
+        else:
+            path = (current_dir if current_dir is not None else self.source_root) / label
+        return Path(os.path.normpath(path))
+
+    def load(self, path: Path, args: Mapping[str, Any] | None = None) -> GNModule:
+        """Return the evaluated module for ``path``, evaluating it if needed."""
+        args = args if args is not None else {}
+        key = (path, args_key(args))
+        module = self._modules.get(key)
+        if module is not None and self._is_current(key, module, args):
+            return module
+
+        if path in self._loading:
+            cycle = " -> ".join(str(p) for p in [*self._loading, path])
+            raise ParseError(f"Import cycle: {cycle}")
+        self._loading.append(path)
+        try:
+            module = self._evaluate(path, args)
+        finally:
+            self._loading.pop()
+        self._modules[key] = module
+        self._checked.add(key)
+        return module
+
+    def refresh(self) -> None:
+        """Re-check imported files for changes on their next use."""
+        self._checked.clear()
+
+    def clear(self) -> None:
+        """Drop every evaluated module."""
+        self._modules.clear()
+        self._checked.clear()
+
+    def _is_current(
+        self, key: tuple[Path, ArgsKey], module: GNModule, args: Mapping[str, Any]
+    ) -> bool:
+        if key in self._checked:
+            return True
+        try:
+            if _stamp(module.path) != module.stamp:
+                return False
+        except OSError:
+            return False
+        # Loading a changed dependency yields a new module object, which makes
+        # this module stale as well.
+        for dependency in module.imports:
+            if self.load(dependency.path, args) is not dependency:
+                return False
+        self._checked.add(key)
+        return True
+
+    def _evaluate(self, path: Path, args: Mapping[str, Any]) -> GNModule:
+        try:
+            stamp = _stamp(path)
+            content = path.read_bytes().decode("utf-8")
+        except OSError as e:
+            raise ParseError(f"Cannot import {path}: {e.strerror}") from e
+        self.evaluations[path] += 1
+
+        interpreter = GNInterpreter(content, args, imports=self, current_dir=path.parent)
+        for _ in interpreter.run(GNSyntaxParser(content).iter_statements()):
+            pass
+        return GNModule(
+            path=path,
+            scope=MappingProxyType(interpreter.exported_scope()),
+            templates=MappingProxyType(interpreter.exported_templates()),
+            imports=tuple(interpreter.modules),
+            stamp=stamp,
+        )
@@ -0,0 +1,223 @@
+"""Lark LALR backend for the GN parser.
+
+The grammar is compiled into an LALR table once and serialized through Lark's
+grammar cache, so later processes load the table instead of rebuilding it.
+The parse tree is transformed into the same syntax tree nodes produced by
+:mod:`gncmake_bridge.parser.gn_ast`, so both backends share one IR builder.
+String interpolation is resolved by the evaluator, exactly as for the native
+backend; the grammar treats a string literal as a single terminal.
+"""
+from functools import cache
+from typing import Any
+
+from lark import Lark, Token, Transformer, v_args
+from lark.exceptions import UnexpectedCharacters, UnexpectedEOF, UnexpectedInput
+
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.parser.gn_ast import (
+    Accessor,
+    Assignment,
+    BinaryOp,
+    Block,
+    BooleanLiteral,
+    Condition,
+    FunctionCall,
+    Identifier,
+    IntegerLiteral,
+    ListLiteral,
+    Node,
+    StringLiteral,
+    UnaryOp,
+)
+
+GN_GRAMMAR = r"""
+start: _statement*
+
+_statement: assignment | call | condition
+
+assignment: _lvalue (ASSIGN | ADD_ASSIGN | SUB_ASSIGN) expr
+_lvalue: identifier | accessor
+
+call: IDENTIFIER "(" [_expr_list] RPAREN [block]
+condition: IF "(" expr ")" block [ELSE (condition | block)]
+block: LBRACE _statement* RBRACE
+
+_expr_list: expr ("," expr)* ","?
+
+?expr: or_expr
+?or_expr: or_expr OR and_expr -> binary
+        | and_expr
+?and_expr: and_expr AND eq_expr -> binary
+         | eq_expr
+?eq_expr: eq_expr (EQ | NE) rel_expr -> binary
+        | rel_expr
+?rel_expr: rel_expr (LT | LE | GT | GE) add_expr -> binary
+         | add_expr
+?add_expr: add_expr (PLUS | MINUS) unary_expr -> binary
+         | unary_expr
+?unary_expr: NOT unary_expr -> unary
+           | primary
+
+?primary: identifier
+         | INTEGER -> integer
+         | MINUS INTEGER -> negative_integer
+         | STRING -> string
+         | TRUE -> boolean
+         | FALSE -> boolean
+         | call
+         | accessor
+         | list
+         | block
+         | "(" expr ")"
+
+identifier: IDENTIFIER
+accessor: IDENTIFIER "." IDENTIFIER
+        | IDENTIFIER "[" expr RBRACKET
+list: LBRACKET [_expr_list] RBRACKET
+
+IF: "if"
+ELSE: "else"
+TRUE: "true"
+FALSE: "false"
+IDENTIFIER: /[A-Za-z_][A-Za-z0-9_]*/
+INTEGER: /[0-9]+/
+STRING: /"[^"\\]*(?:\\.[^"\\]*)*"/s
+ASSIGN: "="
+ADD_ASSIGN: "+="
+SUB_ASSIGN: "-="
+OR: "||"
+AND: "&&"
+EQ: "=="
+NE: "!="
+LT: "<"
+LE: "<="
+GT: ">"
+GE: ">="
+PLUS: "+"
+MINUS: "-"
+NOT: "!"
+LBRACE: "{"
+RBRACE: "}"
+LBRACKET: "["
+RBRACKET: "]"
+RPAREN: ")"
+
+COMMENT: /#[^\n]*/ | /\/\/[^\n]*/
+%ignore COMMENT
+%ignore /[ \t\r\n]+/
+"""
+
+
+def _start(token: Token) -> int:
+    # Lark types token positions as optional; lexed tokens always have them.
+    assert token.start_pos is not None
+    return token.start_pos
+
+
+def _end(token: Token) -> int:
+    assert token.end_pos is not None
+    return token.end_pos
+
+
+@v_args(inline=True)
+class _ToSyntaxTree(Transformer[Token, Block]):
+    """Converts Lark parse results into :mod:`gn_ast` nodes."""
+
+    def start(self, *statements: Node) -> Block:
+        end = statements[-1].end if statements else 0
+        return Block(list(statements), 0, end)
+
+    def assignment(self, target: Identifier | Accessor, op: Token, value: Node) -> Assignment:
+        return Assignment(target, str(op), value, target.start, value.end)
+
+    def call(self, name: Token, *rest: Any) -> FunctionCall:
+        # ``rest`` is the argument expressions (a lone None when empty), the
+        # closing parenthesis and the optional block (None when absent).
+        *args, close_paren, block = rest
+        end = block.end if block is not None else _end(close_paren)
+        args = [arg for arg in args if arg is not None]
+        return FunctionCall(str(name), args, block, _start(name), end)
+
+    def condition(
+        self,
+        if_token: Token,
+        condition: Node,
+        then_block: Block,
+        else_token: Token | None = None,
+        else_block: Block | Condition | None = None,
+    ) -> Condition:
+        end = else_block.end if else_block is not None else then_block.end
+        return Condition(condition, then_block, else_block, _start(if_token), end)
+
+    def block(self, open_brace: Token, *rest: Any) -> Block:
+        *statements, close_brace = rest
+        return Block(list(statements), _start(open_brace), _end(close_brace))
+
+    def binary(self, left: Node, op: Token, right: Node) -> BinaryOp:
+        return BinaryOp(str(op), left, right, left.start, right.end)
+
+    def unary(self, op: Token, operand: Node) -> UnaryOp:
+        return UnaryOp(str(op), operand, _start(op), operand.end)
+
+    def identifier(self, name: Token) -> Identifier:
+        return Identifier(str(name), _start(name), _end(name))
+
+    def accessor(self, base: Token, selector: Token | Node, close: Token | None = None) -> Accessor:
+        ident = Identifier(str(base), _start(base), _end(base))
+        if close is None:
+            assert isinstance(selector, Token)
+            return Accessor(ident, str(selector), None, _start(base), _end(selector))
+        assert not isinstance(selector, Token)
+        return Accessor(ident, None, selector, _start(base), _end(close))
+
+    def integer(self, token: Token) -> IntegerLiteral:
+        return IntegerLiteral(int(token), _start(token), _end(token))
+
+    def negative_integer(self, minus: Token, token: Token) -> IntegerLiteral:
+        return IntegerLiteral(-int(token), _start(minus), _end(token))
+
+    def string(self, token: Token) -> StringLiteral:
+        return StringLiteral(str(token)[1:-1], _start(token), _end(token))
+
+    def boolean(self, token: Token) -> BooleanLiteral:
+        return BooleanLiteral(token == "true", _start(token), _end(token))
+
+    def list(self, open_bracket: Token, *rest: Any) -> ListLiteral:
+        *items, close_bracket = rest
+        return ListLiteral(
+            [item for item in items if item is not None],
+            _start(open_bracket),
+            _end(close_bracket),
+        )
+
+
+@cache
+def get_lark_parser(cache: bool | str = True) -> Lark:
+    """Return the LALR parser, loading the compiled table from cache if present.
+
+    Args:
+        cache: ``True`` to use Lark's per-user cache file in the temp
+            directory, or an explicit cache file path.
+    """
+    return Lark(
+        GN_GRAMMAR,
+        parser="lalr",
+        lexer="contextual",
+        transformer=_ToSyntaxTree(),
+        maybe_placeholders=True,
+        cache=cache,
+    )
+
+
+def parse_gn_ast_lark(source: str, cache: bool | str = True) -> Block:
+    """Parse GN source into a syntax tree using the Lark backend."""
+    try:
+        tree = get_lark_parser(cache).parse(source)
+    except UnexpectedEOF as e:
+        raise ParseError(f"Unexpected end of input, expected one of {sorted(e.expected)}") from e
+    except UnexpectedCharacters as e:
+        raise ParseError(f"Unexpected character {e.char!r}", e.line, e.column) from e
+    except UnexpectedInput as e:
+        raise ParseError("Unexpected token", e.line, e.column) from e
+    assert isinstance(tree, Block)
+    return tree
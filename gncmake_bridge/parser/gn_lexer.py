@@ -0,0 +1,226 @@
+"""Single-pass tokenizer for the GN language."""
+import mmap
+import re
+from collections.abc import Iterator
+from enum import Enum
+from typing import Any, NamedTuple
+
+from gncmake_bridge.exceptions import ParseError
+
+
+class TokenType(Enum):
+    IDENTIFIER = "identifier"
+    INTEGER = "integer"
+    STRING = "string"
+    TRUE = "true"
+    FALSE = "false"
+    IF = "if"
+    ELSE = "else"
+    OPERATOR = "operator"
+    LEFT_PAREN = "("
+    RIGHT_PAREN = ")"
+    LEFT_BRACKET = "["
+    RIGHT_BRACKET = "]"
+    LEFT_BRACE = "{"
+    RIGHT_BRACE = "}"
+    DOT = "."
+    COMMA = ","
+    EOF = "eof"
+
+
+GNSource = str | bytes | mmap.mmap
+
+
+class Token(NamedTuple):
+    """A lexical token with its offsets into the source buffer.
+
+    For strings, ``value`` is the raw text between the quotes; escapes and
+    ``$`` interpolation are resolved later by the evaluator.
+    """
+
+    type: TokenType
+    value: str
+    start: int
+    end: int
+
+
+_KEYWORDS = {
+    "true": TokenType.TRUE,
+    "false": TokenType.FALSE,
+    "if": TokenType.IF,
+    "else": TokenType.ELSE,
+}
+
+_PUNCTUATION = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ".": TokenType.DOT,
+    ",": TokenType.COMMA,
+}
+
+# Leading whitespace and comments are folded into every token match so that
+# each token costs exactly one regex step. Order matters: two-character
+# operators must be tried before their prefixes. ``//`` comments are not GN,
+# but older inputs used them and the previous line-based parser skipped them,
+# so they are accepted as comments too.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?:[ \t\r\n]+|\#[^\n]*|//[^\n]*)*
+    (?:
+     (?P<string>"[^"\\]*(?:\\.[^"\\]*)*")
+    |(?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+    |(?P<punctuation>[()\[\]{}.,])
+    |(?P<operator>\+=|-=|==|!=|<=|>=|&&|\|\||[=+\-<>!])
+    |(?P<integer>[0-9]+)
+    |(?P<eof>\Z)
+    |(?P<error>.)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# One element of a list made only of string literals, with the whitespace and
+# comments around it and the comma that follows. A missing comma means the
+# element must be the last one.
+_STRING_ITEM_PATTERN = re.compile(
+    r"""
+    (?:[ \t\r\n]+|\#[^\n]*|//[^\n]*)*
+    "([^"\\]*(?:\\.[^"\\]*)*)"
+    (?:[ \t\r\n]+|\#[^\n]*|//[^\n]*)*
+    (,)?
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_LIST_CLOSE_PATTERN = re.compile(r"(?:[ \t\r\n]+|\#[^\n]*|//[^\n]*)*\]")
+
+
+_BYTES_PATTERNS = {
+    pattern: re.compile(pattern.pattern.encode("ascii"), pattern.flags & ~re.UNICODE)
+    for pattern in (_TOKEN_PATTERN, _STRING_ITEM_PATTERN, _LIST_CLOSE_PATTERN)
+}
+
+
+def _pattern_for(pattern: re.Pattern[str], source: GNSource) -> re.Pattern[Any]:
+    return pattern if isinstance(source, str) else _BYTES_PATTERNS[pattern]
+
+
+def source_text(source: GNSource, start: int, end: int) -> str:
+    """Return ``source[start:end]`` as text, decoding byte buffers."""
+    text = source[start:end]
+    return text if isinstance(text, str) else text.decode("utf-8")
+
+
+def offset_to_line_column(source: GNSource, offset: int) -> tuple[int, int]:
+    """Convert a source offset to a 1-based (line, column) pair.
+
+    For byte buffers ``offset`` counts bytes; the column counts characters,
+    as it does for text.
+    """
+    if isinstance(source, str):
+        line_start = source.rfind("\n", 0, offset) + 1
+        return source.count("\n", 0, line_start) + 1, offset - line_start + 1
+    # Find the line in the raw buffer; only the start of the line is decoded.
+    line_start = source.rfind(b"\n", 0, offset) + 1
+    line = source[:line_start].count(b"\n") + 1
+    column = len(source[line_start:offset].decode("utf-8", errors="replace")) + 1
+    return line, column
+
+
+def scan_string_list(source: GNSource, start: int) -> tuple[list[Token], int] | None:
+    """Scan a list literal of plain strings directly from the source buffer.
+
+    ``start`` is the offset of the opening ``[``. Each element is matched in
+    place and its text sliced exactly once, so the cost is linear in the list
+    length. Returns the string tokens (with their spans) and the offset just
+    past the closing ``]``, or ``None`` if the list holds anything other than
+    string literals, in which case the caller should tokenize it normally.
+    """
+    is_text = isinstance(source, str)
+    items: list[Token] = []
+    match_item = _pattern_for(_STRING_ITEM_PATTERN, source).match
+    pos = start + 1
+    while True:
+        match = match_item(source, pos)
+        if match is None:
+            break
+        value_start, value_end = match.span(1)
+        value = match.group(1)
+        if not is_text:
+            value = value.decode("utf-8")
+        items.append(Token(TokenType.STRING, value, value_start - 1, value_end + 1))
+        pos = match.end()
+        if match.group(2) is None:
+            break
+    close = _pattern_for(_LIST_CLOSE_PATTERN, source).match(source, pos)
+    if close is None:
+        return None
+    return items, close.end()
+
+
+class GNLexer:
+    """Tokenizes GN source in one linear pass using a single master regex.
+
+    The source may be text or a bytes-like buffer such as an ``mmap``; for
+    buffers, offsets are byte offsets and only token text is decoded.
+    """
+
+    def __init__(self, source: GNSource) -> None:
+        self._source = source
+        self._pos = 0
+
+    def seek(self, offset: int) -> None:
+        """Continue tokenizing at ``offset`` after a caller scanned ahead."""
+        self._pos = offset
+
+    def tokens(self) -> Iterator[Token]:
+        source = self._source
+        is_text = isinstance(source, str)
+        match_token = _pattern_for(_TOKEN_PATTERN, source).match
+        while True:
+            match = match_token(source, self._pos)
+            assert match is not None
+            kind = match.lastgroup
+            assert kind is not None
+            start, end = match.span(kind)
+            self._pos = end
+            if kind == "eof":
+                break
+            text = match.group(kind)
+            if not is_text:
+                if kind == "error":
+                    # The error group matches one byte, which may start a
+                    # multi-byte character; report the whole character.
+                    raw = source[start : start + 4]
+                    assert isinstance(raw, bytes)
+                    text = raw.decode("utf-8", errors="replace")[0]
+                else:
+                    text = text.decode("utf-8")
+            if kind == "string":
+                yield Token(TokenType.STRING, text[1:-1], start, end)
+            elif kind == "identifier":
+                yield Token(_KEYWORDS.get(text, TokenType.IDENTIFIER), text, start, end)
+            elif kind == "punctuation":
+                yield Token(_PUNCTUATION[text], text, start, end)
+            elif kind == "operator":
+                yield Token(TokenType.OPERATOR, text, start, end)
+            elif kind == "integer":
+                yield Token(TokenType.INTEGER, text, start, end)
+            else:
+                line, column = offset_to_line_column(source, start)
+                if text == '"':
+                    raise ParseError("Unterminated string literal", line, column)
+                raise ParseError(f"Unexpected character {text!r}", line, column)
+        # Drop the last match before suspending so that a memory-mapped
+        # buffer can be closed while this generator is still alive.
+        del match
+        end = len(source)
+        yield Token(TokenType.EOF, "", end, end)
+
+
+def tokenize(source: GNSource) -> list[Token]:
+    """Return the full token list for ``source``, terminated by an EOF token."""
+    return list(GNLexer(source).tokens())
@@ -1,8 +1,20 @@
-import re
+import mmap
+import os
+from collections import ChainMap
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from dataclasses import replace
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
-from gncmake_bridge.ir import ConditionBlock, Target, TargetType
+from gncmake_bridge.exceptions import ParseError
+from gncmake_bridge.ir import GNTemplate, Label, Target
+from gncmake_bridge.parser.cache import ParseCache
+from gncmake_bridge.parser.gn_ast import GNSyntaxParser, ListLiteral, Node, StringLiteral
+from gncmake_bridge.parser.gn_eval import GNInterpreter, Scope, expand_string
+from gncmake_bridge.parser.gn_imports import ImportResolver, args_key, iter_module_paths
+from gncmake_bridge.parser.gn_lexer import GNSource
+from gncmake_bridge.parser.gn_templates import format_template_stats
 
 
 def strip_string(s: str) -> str:
@@ -12,277 +24,340 @@ def strip_string(s: str) -> str:
     return s
 
 
-def parse_list(value: str) -> list[str]:
-    value = value.strip()
-    if not value.startswith("[") or not value.endswith("]"):
+class ListItem(NamedTuple):
+    """One element of a GN list literal and its span in the scanned text."""
+
+    value: str
+    start: int
+    end: int
+
+
+def scan_list(value: str) -> list[ListItem]:
+    """Scan a GN list literal, locating each element by offset.
+
+    String elements have their escapes resolved; any other element (an
+    identifier, a nested list, ...) is returned as its source text. Empty
+    elements are dropped.
+    """
+    if not value.strip().startswith("["):
+        return []
+    try:
+        node = GNSyntaxParser(value).parse_expression()
+    except ParseError:
         return []
-    content = value[1:-1].strip()
-    if not content:
+    if not isinstance(node, ListLiteral):
         return []
+
+    no_variables: Scope = ChainMap({})
     items = []
-    current = ""
-    in_string = False
-    quote_char = None
-    depth = 0
-
-    for char in content:
-        if not in_string:
-            if char in ('"', "'"):
-                in_string = True
-                quote_char = char
-                current += char
-            elif char == "[":
-                depth += 1
-                current += char
-            elif char == "]":
-                depth -= 1
-                current += char
-            elif char == "," and depth == 0:
-                if current.strip():
-                    items.append(current.strip())
-                current = ""
-            else:
-                current += char
+    for item in node.items:
+        if isinstance(item, StringLiteral):
+            text = expand_string(item.raw, no_variables)
         else:
-            current += char
-            if char == quote_char and (len(current) < 2 or current[-2] != "\\"):
-                in_string = False
-                quote_char = None
-
-    if current.strip():
-        items.append(current.strip())
-
-    return [strip_string(item) for item in items if strip_string(item)]
-
-
-def parse_condition_block(lines: list[str], start_idx: int) -> tuple[ConditionBlock, int]:
-    """Parse an if/else condition block and return the block and the ending index."""
-    line = lines[start_idx].strip()
-    condition_match = re.match(r"if\s*\(\s*(.+)\s*\)", line)
-    if not condition_match:
-        return ConditionBlock(condition=""), start_idx
-
-    condition = condition_match.group(1).strip()
-    condition_block = ConditionBlock(condition=condition)
-
-    brace_depth = 0
-    if line.endswith("{"):
-        brace_depth = 1
-    else:
-        brace_depth = 0
-
-    i = start_idx + 1
-    if brace_depth == 0:
-        if i < len(lines):
-            next_line = lines[i].strip()
-            if next_line == "{":
-                brace_depth = 1
-                i += 1
-
-    properties: dict[str, Any] = {}
-    while i < len(lines) and brace_depth > 0:
-        current_line = lines[i].rstrip()
-        current_line_stripped = current_line.strip()
-
-        brace_change = current_line_stripped.count("{") - current_line_stripped.count("}")
-        brace_depth += brace_change
-
-        if current_line_stripped and not current_line_stripped.startswith("//"):
-            if current_line_stripped.startswith("if"):
-                nested_block, new_i = parse_condition_block(lines, i)
-                condition_block.conditions.append(nested_block)
-                i = new_i + 1
-                continue
-
-            prop_match = re.match(r"^(\w+)\s*=\s*(.+)$", current_line_stripped)
-            if prop_match:
-                prop_name = prop_match.group(1)
-                prop_value = prop_match.group(2).strip()
-
-                if prop_name in (
-                    "sources",
-                    "headers",
-                    "deps",
-                    "public_deps",
-                    "private_deps",
-                    "data_deps",
-                    "cflags",
-                    "cflags_cc",
-                    "ldflags",
-                    "include_dirs",
-                    "defines",
-                    "visibility",
-                    "configs",
-                    "inputs",
-                    "outputs",
-                ):
-                    full_value = prop_value
-                    if not full_value.endswith("]"):
-                        j = i + 1
-                        while j < len(lines) and not lines[j].strip().endswith("]"):
-                            full_value += " " + lines[j].strip()
-                            j += 1
-                        if j < len(lines):
-                            full_value += " " + lines[j].strip()
-                            i = j
-                    properties[prop_name] = parse_list(full_value)
-                elif prop_name in (
-                    "output_name",
-                    "script",
-                    "response_file_name",
-                ):
-                    properties[prop_name] = strip_string(prop_value)
-                elif prop_name in ("testonly", "complete_static_lib"):
-                    properties[prop_name] = prop_value == "true"
-
-        i += 1
-        if brace_depth == 0:
-            break
-
-    condition_block.properties = properties
-    return condition_block, i
-
-
-def parse_gn_file(content: str) -> list[Target]:
-    targets: list[Target] = []
-    content = content.strip()
-    lines = content.split("\n")
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-
-        target_match = re.match(
-            r'^(executable|static_library|shared_library|source_set|group|action|generated_file)\s*\(\s*["\']?(\w+)["\']?\s*\)',
-            line,
-        )
-        if target_match:
-            target_type_str = target_match.group(1)
-            target_name = target_match.group(2)
-
-            type_map = {
-                "executable": TargetType.EXECUTABLE,
-                "static_library": TargetType.STATIC_LIBRARY,
-                "shared_library": TargetType.SHARED_LIBRARY,
-                "source_set": TargetType.SOURCE_SET,
-                "group": TargetType.GROUP,
-                "action": TargetType.ACTION,
-                "generated_file": TargetType.GENERATE_FILE,
-            }
-            target_type = type_map.get(target_type_str, TargetType.UNKNOWN)
+            text = value[item.start : item.end]
+        if text:
+            items.append(ListItem(text, item.start, item.end))
+    return items
 
-            properties: dict[str, Any] = {}
-            conditions: list[ConditionBlock] = []
 
-            brace_depth = line.count("{") - line.count("}")
+def parse_list(value: str) -> list[str]:
+    return [item.value for item in scan_list(value)]
 
-            if brace_depth == 0:
-                i += 1
-                if i < len(lines):
-                    next_line = lines[i].strip()
-                    if next_line == "{":
-                        brace_depth = 1
-                        i += 1
-            else:
-                i += 1
-
-            while i < len(lines) and brace_depth > 0:
-                current_line = lines[i].rstrip()
-                current_line_stripped = current_line.strip()
-
-                brace_change = current_line_stripped.count("{") - current_line_stripped.count("}")
-                brace_depth += brace_change
-
-                if current_line_stripped and not current_line_stripped.startswith("//"):
-                    if current_line_stripped.startswith("if"):
-                        cond_block, new_i = parse_condition_block(lines, i)
-                        conditions.append(cond_block)
-                        i = new_i + 1
-                        continue
-
-                    prop_match = re.match(r"^(\w+)\s*=\s*(.+)$", current_line_stripped)
-                    if prop_match:
-                        prop_name = prop_match.group(1)
-                        prop_value = prop_match.group(2).strip()
-
-                        if prop_name in (
-                            "sources",
-                            "headers",
-                            "deps",
-                            "public_deps",
-                            "private_deps",
-                            "data_deps",
-                            "cflags",
-                            "cflags_cc",
-                            "ldflags",
-                            "include_dirs",
-                            "defines",
-                            "visibility",
-                            "configs",
-                            "inputs",
-                            "outputs",
-                        ):
-                            full_value = prop_value
-                            if not full_value.endswith("]"):
-                                j = i + 1
-                                while j < len(lines) and not lines[j].strip().endswith("]"):
-                                    full_value += " " + lines[j].strip()
-                                    j += 1
-                                if j < len(lines):
-                                    full_value += " " + lines[j].strip()
-                                    i = j
-                            properties[prop_name] = parse_list(full_value)
-                        elif prop_name in (
-                            "output_name",
-                            "script",
-                            "response_file_name",
-                        ):
-                            properties[prop_name] = strip_string(prop_value)
-                        elif prop_name in ("testonly", "complete_static_lib"):
-                            properties[prop_name] = prop_value == "true"
-
-                i += 1
-                if brace_depth == 0:
-                    break
-
-            target = Target(
-                name=target_name,
-                type=target_type,
-                sources=properties.get("sources", []),
-                headers=properties.get("headers", []),
-                deps=properties.get("deps", []),
-                public_deps=properties.get("public_deps", []),
-                private_deps=properties.get("private_deps", []),
-                data_deps=properties.get("data_deps", []),
-                compile_flags=properties.get("cflags", []),
-                link_flags=properties.get("ldflags", []),
-                include_dirs=properties.get("include_dirs", []),
-                defines=properties.get("defines", []),
-                visibility=properties.get("visibility", []),
-                output_name=properties.get("output_name"),
-                configs=properties.get("configs", []),
-                conditions=conditions,
-                script=properties.get("script"),
-                inputs=properties.get("inputs", []),
-                outputs=properties.get("outputs", []),
-                response_file_name=properties.get("response_file_name"),
-                testonly=properties.get("testonly", False),
-                complete_static_lib=properties.get("complete_static_lib", False),
-            )
-            targets.append(target)
-        else:
-            i += 1
 
-    return targets
+def iter_gn_targets(statements: Iterable[Node], source: GNSource) -> Iterator[Target]:
+    """Build targets from top-level statements, yielding each as it completes."""
+    return GNInterpreter(source).run(statements)
+
+
+def _parse_statements(content: str, backend: str) -> Iterable[Node]:
+    if backend == "native":
+        return GNSyntaxParser(content).iter_statements()
+    if backend == "lark":
+        from gncmake_bridge.parser.gn_lark import parse_gn_ast_lark
+
+        return parse_gn_ast_lark(content).statements
+    raise ValueError(f"Unknown GN parser backend: {backend}")
+
+
+def parse_gn_file(content: str, backend: str = "native") -> list[Target]:
+    return list(iter_gn_targets(_parse_statements(content, backend), content))
+
+
+def discover_build_files(root: Path) -> list[tuple[Path, int]]:
+    """Find every BUILD.gn file under ``root`` in a single ``os.scandir`` walk.
+
+    Returns ``(path, size)`` pairs sorted by path. Hidden directories are
+    skipped and symlinked directories are not followed.
+    """
+    found: list[tuple[Path, int]] = []
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        stack.append(entry.path)
+                elif entry.name == "BUILD.gn" and entry.is_file():
+                    found.append((Path(entry.path), entry.stat().st_size))
+    found.sort()
+    return found
+
+
+def _directory_label(path: Path, root: Path) -> str:
+    relative = path.parent.relative_to(root).as_posix()
+    return "//" if relative == "." else f"//{relative}"
+
+
+# Parser used by each worker process of GNParser.parse_tree.
+_worker_parser: "GNParser | None" = None
+
+
+def _init_worker(
+    backend: str,
+    cache: tuple[str, int] | None,
+    source_root: str | None,
+    args: dict[str, Any],
+) -> None:
+    global _worker_parser
+    _worker_parser = GNParser(
+        backend=backend,
+        cache=ParseCache(*cache) if cache is not None else None,
+        source_root=source_root,
+        args=args,
+    )
+
+
+def _parse_in_worker(path: Path) -> list[Target]:
+    assert _worker_parser is not None
+    return _worker_parser.parse_file(path)
 
 
 class GNParser:
-    def __init__(self) -> None:
-        pass
+    """Parses BUILD.gn files into targets.
+
+    Args:
+        backend: ``"native"`` or ``"lark"``.
+        cache: Optional persistent cache of parse results.
+        source_root: Root of the GN source tree. When given, ``import()``
+            statements are resolved against it and evaluated.
+        args: Build arguments, overriding ``declare_args()`` defaults.
+        imports: Import resolver to share between parsers; created from
+            ``source_root`` when omitted.
+    """
+
+    BACKENDS = ("native", "lark")
+
+    def __init__(
+        self,
+        backend: str = "native",
+        cache: ParseCache | None = None,
+        source_root: Path | str | None = None,
+        args: Mapping[str, Any] | None = None,
+        imports: ImportResolver | None = None,
+    ) -> None:
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown GN parser backend: {backend}")
+        if imports is None and source_root is not None:
+            imports = ImportResolver(source_root)
+        self._backend = backend
+        self._cache = cache
+        self._args = dict(args) if args is not None else {}
+        self._imports = imports
+        # Every template this parser has expanded, by identity; templates from
+        # a shared .gni are the same object for all files that import it.
+        self._templates: dict[int, GNTemplate] = {}
+
+    @property
+    def imports(self) -> ImportResolver | None:
+        return self._imports
+
+    @property
+    def templates(self) -> list[GNTemplate]:
+        """Templates expanded so far, with invocation statistics summed by name."""
+        totals: dict[str, GNTemplate] = {}
+        for template in self._templates.values():
+            total = totals.get(template.name)
+            if total is None:
+                totals[template.name] = replace(template, variables=list(template.variables))
+            else:
+                total.invocation_count += template.invocation_count
+                total.expansion_seconds += template.expansion_seconds
+        return list(totals.values())
+
+    def template_stats(self) -> str:
+        """Invocation count and expansion time of each template, as a table."""
+        return format_template_stats(self.templates)
 
-    def parse(self, content: str) -> list[Target]:
-        return parse_gn_file(content)
+    def parse(self, content: str, current_dir: Path | None = None) -> list[Target]:
+        """Parse ``content``; relative imports resolve against ``current_dir``."""
+        return self._run(content, current_dir)[0]
 
     def parse_file(self, path: Path) -> list[Target]:
-        content = path.read_text()
-        return self.parse(content)
+        data = path.read_bytes()
+        if self._cache is None:
+            return self.parse(data.decode("utf-8"), path.parent)
+
+        key = self._cache.make_key(data, "gn", self._cache_options(path))
+        targets = self._cache.get(key)
+        if targets is None:
+            targets, interpreter = self._run(data.decode("utf-8"), path.parent)
+            self._cache.put(key, targets, self._dependencies(interpreter))
+        return targets
+
+    def parse_tree(self, root: Path | str, jobs: int | None = None) -> dict[Label, Target]:
+        """Parse every BUILD.gn file under ``root``.
+
+        Files are parsed in a pool of ``jobs`` worker processes (all cores
+        by default; ``jobs=1`` parses in this process), largest first so
+        the longest files do not end up running alone at the end.
+
+        Returns:
+            Targets keyed by label, e.g. ``//base/util:util``, in path order.
+        """
+        root = Path(root)
+        files = discover_build_files(root)
+        label_root = root
+        if self._imports is not None and root.is_relative_to(self._imports.source_root):
+            label_root = self._imports.source_root
+
+        results: dict[Path, list[Target]] = {}
+        if jobs == 1 or len(files) <= 1:
+            for path, _ in files:
+                results[path] = self._parse_tree_file(path)
+        else:
+            results = self._parse_in_pool(files, jobs)
+
+        merged: dict[Label, Target] = {}
+        for path, _ in files:
+            directory = _directory_label(path, label_root)
+            for target in results[path]:
+                label = Label.get(directory, target.name)
+                if label in merged:
+                    raise ParseError(f"Duplicate target {label} in {path}")
+                merged[label] = target
+        return merged
+
+    def _parse_tree_file(self, path: Path) -> list[Target]:
+        try:
+            return self.parse_file(path)
+        except ParseError as e:
+            raise ParseError(f"{path}: {e}") from e
+
+    def _parse_in_pool(
+        self, files: list[tuple[Path, int]], jobs: int | None
+    ) -> dict[Path, list[Target]]:
+        cache = None
+        if self._cache is not None:
+            cache = (str(self._cache.directory), self._cache.max_bytes)
+        source_root = str(self._imports.source_root) if self._imports is not None else None
+        largest_first = sorted(files, key=lambda item: item[1], reverse=True)
+
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(self._backend, cache, source_root, self._args),
+        ) as pool:
+            futures: dict[Future[list[Target]], Path] = {
+                pool.submit(_parse_in_worker, path): path for path, _ in largest_first
+            }
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            results = {}
+            for future in done:
+                path = futures[future]
+                error = future.exception()
+                if isinstance(error, ParseError):
+                    raise ParseError(f"{path}: {error}") from error
+                results[path] = future.result()
+        return results
+
+    def iter_parse(self, path: Path) -> Iterator[Target]:
+        """Yield the targets of ``path`` one by one while it is being parsed.
+
+        The file is memory-mapped rather than read, and each target is
+        yielded as soon as the closing brace of its top-level statement has
+        been parsed, so peak memory does not grow with the file size. Only
+        the native backend streams; the Lark backend parses the whole file
+        at once, so with it this is :meth:`parse_file`.
+        """
+        if self._backend != "native":
+            yield from self.parse_file(path)
+            return
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                interpreter = self._interpreter(buffer, path.parent)
+                if self._cache is None:
+                    yield from self._iter_buffer(buffer, interpreter)
+                    return
+
+                # With a cache, a hit skips parsing entirely; on a miss the
+                # targets are still streamed but also kept for the cache entry.
+                key = self._cache.make_key(buffer, "gn", self._cache_options(path))
+                cached = self._cache.get(key)
+                if cached is not None:
+                    yield from cached
+                    return
+                targets = []
+                for target in self._iter_buffer(buffer, interpreter):
+                    targets.append(target)
+                    yield target
+                self._cache.put(key, targets, self._dependencies(interpreter))
+
+    def _interpreter(self, source: GNSource, current_dir: Path | None) -> GNInterpreter:
+        if current_dir is None and self._imports is not None:
+            current_dir = self._imports.source_root
+        return GNInterpreter(source, self._args, self._imports, current_dir)
+
+    def _run(self, content: str, current_dir: Path | None) -> tuple[list[Target], GNInterpreter]:
+        interpreter = self._interpreter(content, current_dir)
+        try:
+            targets = list(interpreter.run(_parse_statements(content, self._backend)))
+        finally:
+            self._record_templates(interpreter)
+        return targets, interpreter
+
+    def _iter_buffer(self, buffer: mmap.mmap, interpreter: GNInterpreter) -> Iterator[Target]:
+        parser = GNSyntaxParser(buffer)
+        try:
+            yield from interpreter.run(parser.iter_statements())
+        finally:
+            parser.close()
+            self._record_templates(interpreter)
+
+    def _record_templates(self, interpreter: GNInterpreter) -> None:
+        self._templates.update(interpreter.expanded)
+
+    def _dependencies(self, interpreter: GNInterpreter) -> dict[Path, str] | None:
+        # Imported files change the result without changing the BUILD.gn
+        # content, so cache entries record them and are validated against them.
+        if self._cache is None or not interpreter.modules:
+            return None
+        digests = {}
+        for path in iter_module_paths(interpreter.modules):
+            digest = self._cache.file_digest(path)
+            if digest is None:
+                return None
+            digests[path] = digest
+        return digests
+
+    def _cache_options(self, path: Path) -> dict[str, Any]:
+        options: dict[str, Any] = {"backend": self._backend}
+        if self._imports is not None:
+            source_root = self._imports.source_root
+            options["source_root"] = str(source_root)
+            # Relative imports resolve against the file's directory, so the
+            # same content in two directories can import different files.
+            directory = path.parent.absolute()
+            if directory.is_relative_to(source_root.absolute()):
+                directory = directory.relative_to(source_root.absolute())
+            options["directory"] = directory.as_posix()
+        if self._args:
+            options["args"] = args_key(self._args)
+        return options
@@ -0,0 +1,145 @@
+"""Compiled GN templates.
+
+A ``template("name") { ... }`` body is parsed once, when the defining file is
+parsed, and analysed once into a :class:`CompiledTemplate`. Every invocation
+then runs the same body against a fresh scope holding ``target_name`` and
+``invoker``, so a template defined in a shared ``.gni`` file costs one parse
+no matter how many BUILD.gn files invoke it.
+"""
+from collections import ChainMap
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from gncmake_bridge.ir import GNTemplate
+from gncmake_bridge.parser.gn_ast import (
+    Accessor,
+    Assignment,
+    BinaryOp,
+    Block,
+    Condition,
+    FunctionCall,
+    Identifier,
+    ListLiteral,
+    Node,
+    StringLiteral,
+    UnaryOp,
+)
+from gncmake_bridge.parser.gn_lexer import GNSource, source_text
+
+Templates = ChainMap[str, "CompiledTemplate"]
+
+
+@dataclass
+class CompiledTemplate:
+    """A template body ready to be instantiated.
+
+    Attributes:
+        info: IR record of the template; invocation statistics are
+            accumulated on it and shared by every importer.
+        body: The parsed template body.
+        source: Buffer the body was parsed from.
+        scope: Scope the template was defined in; the body runs in a child
+            of it.
+        templates: Templates visible where the template was defined.
+    """
+
+    info: GNTemplate
+    body: Block
+    source: GNSource
+    scope: ChainMap[str, Any]
+    templates: Templates
+
+    @property
+    def name(self) -> str:
+        return self.info.name
+
+
+def _children(node: Node) -> Iterator[Node]:
+    if isinstance(node, Block):
+        yield from node.statements
+    elif isinstance(node, FunctionCall):
+        yield from node.args
+        if node.block is not None:
+            yield node.block
+    elif isinstance(node, Assignment):
+        yield node.target
+        yield node.value
+    elif isinstance(node, Condition):
+        yield node.condition
+        yield node.then_block
+        if node.else_block is not None:
+            yield node.else_block
+    elif isinstance(node, ListLiteral):
+        yield from node.items
+    elif isinstance(node, BinaryOp):
+        yield node.left
+        yield node.right
+    elif isinstance(node, UnaryOp):
+        yield node.operand
+    elif isinstance(node, Accessor):
+        yield node.base
+        if node.index is not None:
+            yield node.index
+
+
+def invoker_variables(body: Iterable[Node]) -> list[str]:
+    """Names of the ``invoker`` variables a template body reads.
+
+    ``forward_variables_from(invoker, "*")`` is reported as ``"*"``.
+    """
+    names: dict[str, None] = {}
+    stack = list(body)
+    stack.reverse()
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Accessor) and node.base.name == "invoker" and node.member:
+            names[node.member] = None
+        elif (
+            isinstance(node, FunctionCall)
+            and node.name == "forward_variables_from"
+            and len(node.args) >= 2
+            and isinstance(node.args[0], Identifier)
+            and node.args[0].name == "invoker"
+        ):
+            forwarded = node.args[1]
+            if isinstance(forwarded, StringLiteral):
+                names[forwarded.raw] = None
+            elif isinstance(forwarded, ListLiteral):
+                for item in forwarded.items:
+                    if isinstance(item, StringLiteral):
+                        names[item.raw] = None
+        stack.extend(reversed(list(_children(node))))
+    return list(names)
+
+
+def compile_template(
+    name: str,
+    body: Block,
+    source: GNSource,
+    scope: ChainMap[str, Any],
+    templates: Templates,
+) -> CompiledTemplate:
+    info = GNTemplate(
+        name=name,
+        variables=invoker_variables(body.statements),
+        body=source_text(source, body.start, body.end),
+    )
+    return CompiledTemplate(info, body, source, scope, templates)
+
+
+def format_template_stats(templates: Iterable[GNTemplate]) -> str:
+    """Format invocation counts and expansion times, slowest template first.
+
+    Expansion time includes templates invoked from within a template.
+    """
+    rows = sorted(templates, key=lambda t: t.expansion_seconds, reverse=True)
+    lines = [f"{'template':<32} {'invocations':>12} {'total ms':>10} {'avg us':>8}"]
+    for template in rows:
+        calls = template.invocation_count
+        average = template.expansion_seconds / calls * 1e6 if calls else 0.0
+        lines.append(
+            f"{template.name:<32} {template.invocation_count:>12} "
+            f"{template.expansion_seconds * 1000:>10.1f} {average:>8.1f}"
+        )
+    return "\n".join(lines)
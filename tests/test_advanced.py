@@ -196,9 +196,8 @@ target_link_libraries(myapp PRIVATE lib1 lib2 lib3)
 '''
         targets = self.parser.parse(cmake_content)
         assert len(targets) == 1
-        assert "lib1" in targets[0].private_deps
-        assert "lib2" in targets[0].deps
-        assert "lib3" in targets[0].deps
+        assert targets[0].private_deps == ["lib1", "lib2", "lib3"]
+        assert targets[0].deps == []
 
     def test_parse_with_custom_target(self) -> None:
         """Test parsing add_custom_target."""
@@ -0,0 +1,140 @@
+"""Tests for the dependency graph."""
+import time
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import (
+    BuildGraph,
+    CMakeParser,
+    Converter,
+    DependencyCycleError,
+    Target,
+    TargetType,
+)
+from gncmake_bridge.ir.graph import iter_bits
+
+
+def make_targets() -> dict[str, Target]:
+    """A small tree mixing GN labels, a CMake-style bare name and an external library."""
+    return {
+        "//app:app": Target(
+            name="app",
+            type=TargetType.EXECUTABLE,
+            deps=[":app_lib", "pthread"],
+            data_deps=["//tools:gen"],
+        ),
+        "//app:app_lib": Target(
+            name="app_lib", type=TargetType.SOURCE_SET, public_deps=["//net"]
+        ),
+        "//net:net": Target(
+            name="net", type=TargetType.STATIC_LIBRARY, public_deps=["base"], deps=["zlib"]
+        ),
+        "//base:base": Target(name="base", type=TargetType.STATIC_LIBRARY),
+        "//third_party:zlib": Target(name="zlib", type=TargetType.STATIC_LIBRARY),
+        "//tools:gen": Target(name="gen", type=TargetType.EXECUTABLE, private_deps=["//base"]),
+    }
+
+
+class TestBuildGraph:
+    """Tests for BuildGraph."""
+
+    def setup_method(self) -> None:
+        self.graph = BuildGraph.from_targets(make_targets())
+
+    def test_edges(self) -> None:
+        """Test that dependencies resolve to node ids and externals are kept aside."""
+        graph = self.graph
+        app = graph.node("//app:app")
+        assert len(graph) == 6 and "//net:net" in graph
+        assert graph.successors(app) == [graph.node("//app:app_lib"), graph.node("//tools:gen")]
+        assert graph.successors(app, ("data_deps",)) == [graph.node("//tools:gen")]
+        # "base" and "zlib" are CMake-style names of targets in other directories.
+        assert graph.successors(graph.node("//net:net")) == [4, 3]
+        assert graph.unresolved == {app: ["pthread"]}
+        assert list(graph.offsets["deps"]) == [0, 1, 1, 2, 2, 2, 2]
+
+    def test_topological_order(self) -> None:
+        """Test that dependencies come first and ties follow the input order."""
+        order = [str(label) for label in self.graph.topological_order()]
+        assert order == [
+            "//base:base",
+            "//third_party:zlib",
+            "//net:net",
+            "//app:app_lib",
+            "//tools:gen",
+            "//app:app",
+        ]
+        assert self.graph.cycles() == []
+        self.graph.check_acyclic()
+
+    def test_transitive_deps(self) -> None:
+        """Test transitive queries, by all kinds and through public_deps only."""
+        graph = self.graph
+        assert graph.transitive_public_deps("//app:app_lib") == ["//net:net", "//base:base"]
+        assert graph.transitive_public_deps("//app:app") == []
+        assert len(graph.transitive_deps("//app:app")) == 5
+        assert graph.transitive_deps("//base:base") == []
+        assert list(iter_bits(graph.closure(graph.node("//tools:gen")))) == [3]
+        with pytest.raises(KeyError):
+            graph.transitive_deps("//missing:missing")
+
+    def test_cycles(self) -> None:
+        """Test that the shortest cycle through each component is reported as a path."""
+        targets = make_targets()
+        targets["//base:base"].deps = ["//app:app"]
+        targets["//third_party:zlib"].deps = [":zlib"]
+        graph = BuildGraph.from_targets(targets)
+        assert [[str(label) for label in cycle] for cycle in graph.cycles()] == [
+            ["//app:app", "//tools:gen", "//base:base", "//app:app"],
+            ["//third_party:zlib", "//third_party:zlib"],
+        ]
+        cycle = "//app:app -> //tools:gen -> //base:base -> //app:app"
+        with pytest.raises(DependencyCycleError, match=cycle):
+            graph.topological_order()
+        assert "//app:app" in graph.transitive_deps("//base:base")
+        assert "//base:base" in graph.transitive_deps("//base:base")
+        assert graph.topological_order(("public_deps",))[0] == "//app:app"
+
+    def test_convert_tree_rejects_cycles(self, tmp_path: Path) -> None:
+        """Test that converting a tree with a dependency cycle fails with the cycle."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a/BUILD.gn").write_text(
+            'group("a") { deps = [ ":b" ] }\ngroup("b") { deps = [ ":a" ] }\n'
+        )
+        with pytest.raises(DependencyCycleError) as info:
+            Converter(source_root=tmp_path).convert_tree(tmp_path, tmp_path / "out", jobs=1)
+        assert info.value.cycle == ["//a:a", "//a:b", "//a:a"]
+
+    def test_linear_scaling(self) -> None:
+        """Test that building is linear and a repeated query is a lookup."""
+        parser = CMakeParser()
+
+        def build_time(count: int) -> tuple[float, BuildGraph]:
+            targets = parser.parse(
+                "".join(
+                    f"add_library(lib{i} STATIC lib{i}.cc)\n"
+                    f"target_link_libraries(lib{i} PUBLIC lib{(i - 1) // 2}"
+                    f" PRIVATE lib{i // 3} m)\n"
+                    for i in range(1, count)
+                )
+            )
+            best = float("inf")
+            for _ in range(2):
+                start = time.perf_counter()
+                graph = BuildGraph.from_targets(targets)
+                graph.topological_order(("public_deps",))
+                best = min(best, time.perf_counter() - start)
+            return best, graph
+
+        small, _ = build_time(1_000)
+        large, graph = build_time(10_000)
+        assert large < small * 25
+
+        last = graph.node("//:lib9999")
+        # lib9999 -> lib4999 -> ... -> lib1; lib0 is not a target.
+        assert len(graph.transitive_public_deps("//:lib9999")) == 12
+        start = time.perf_counter()
+        for _ in range(1_000):
+            graph.closure(last, ("public_deps",))
+        assert time.perf_counter() - start < 0.05
@@ -0,0 +1,157 @@
+"""Tests for the persistent parse cache."""
+import os
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import (
+    CMakeParser,
+    ConfigurationError,
+    ConversionMode,
+    Converter,
+    GNCMakeConfig,
+    GNParser,
+    ParseCache,
+)
+
+GN_CONTENT = '''
+static_library("lib") {
+  sources = ["lib.cc"]
+  testonly = true
+  if (is_linux) {
+    defines = ["LINUX"]
+    if (is_debug) { cflags = ["-g"] }
+  }
+}
+'''
+
+CMAKE_CONTENT = '''
+add_library(lib STATIC lib.cc)
+target_link_libraries(lib PUBLIC base)
+'''
+
+
+class TestParseCache:
+    """Tests for ParseCache."""
+
+    def test_gn_hit_after_miss(self, tmp_path: Path) -> None:
+        """Test that a second parse of unchanged content is served from cache."""
+        build = tmp_path / "BUILD.gn"
+        build.write_text(GN_CONTENT)
+        cache = ParseCache(tmp_path / "cache")
+        parser = GNParser(cache=cache)
+
+        first = parser.parse_file(build)
+        second = GNParser(cache=ParseCache(tmp_path / "cache")).parse_file(build)
+
+        assert cache.stats.misses == 1
+        assert cache.stats.writes == 1
+        assert second == first
+        assert second[0].conditions[0].conditions[0].properties == {"cflags": ["-g"]}
+
+    def test_changed_content_misses(self, tmp_path: Path) -> None:
+        """Test that editing the file invalidates the entry."""
+        build = tmp_path / "BUILD.gn"
+        build.write_text(GN_CONTENT)
+        cache = ParseCache(tmp_path / "cache")
+        parser = GNParser(cache=cache)
+        parser.parse_file(build)
+        parser.parse_file(build)
+        build.write_text(GN_CONTENT.replace("lib.cc", "other.cc"))
+        targets = parser.parse_file(build)
+
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 2
+        assert targets[0].sources == ["other.cc"]
+
+    def test_iter_parse_uses_cache(self, tmp_path: Path) -> None:
+        """Test that streaming parses also read and fill the cache."""
+        build = tmp_path / "BUILD.gn"
+        build.write_text(GN_CONTENT)
+        cache = ParseCache(tmp_path / "cache")
+        parser = GNParser(cache=cache)
+
+        assert list(parser.iter_parse(build)) == parser.parse_file(build)
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+
+    def test_options_are_part_of_key(self, tmp_path: Path) -> None:
+        """Test that parser options produce distinct entries."""
+        cache = ParseCache(tmp_path)
+        assert cache.make_key(b"x", "gn", {"backend": "native"}) != cache.make_key(
+            b"x", "gn", {"backend": "lark"}
+        )
+        assert cache.make_key(b"x", "gn") != cache.make_key(b"x", "cmake")
+
+    def test_cmake_parser(self, tmp_path: Path) -> None:
+        """Test that CMakeParser consults the cache too."""
+        lists = tmp_path / "CMakeLists.txt"
+        lists.write_text(CMAKE_CONTENT)
+        cache = ParseCache(tmp_path / "cache")
+        parser = CMakeParser(cache=cache)
+        first = parser.parse_file(lists)
+        assert parser.parse_file(lists) == first
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_lru_eviction(self, tmp_path: Path) -> None:
+        """Test that the least recently used entries are evicted first."""
+        cache = ParseCache(tmp_path / "cache")
+        parser = GNParser(cache=cache)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"BUILD{i}.gn"
+            path.write_text(GN_CONTENT.replace("lib.cc", f"lib{i}.cc"))
+            parser.parse_file(path)
+            paths.append(path)
+        entry_size = cache.total_bytes // 3
+
+        # Age every entry, shrink the budget, then use entry 0 again so that it
+        # becomes the most recently used one.
+        for entry in (tmp_path / "cache").rglob("*.ir"):
+            os.utime(entry, (1000, 1000))
+        cache = ParseCache(tmp_path / "cache", max_bytes=entry_size * 2)
+        parser = GNParser(cache=cache)
+        parser.parse_file(paths[0])
+        path = tmp_path / "BUILD3.gn"
+        path.write_text(GN_CONTENT.replace("lib.cc", "lib3.cc"))
+        parser.parse_file(path)
+
+        assert cache.stats.evictions == 2
+        assert cache.total_bytes <= entry_size * 2
+        parser.parse_file(paths[0])
+        assert cache.stats.hits == 2
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path: Path) -> None:
+        """Test that an unreadable entry is treated as a miss and rewritten."""
+        build = tmp_path / "BUILD.gn"
+        build.write_text(GN_CONTENT)
+        cache = ParseCache(tmp_path / "cache")
+        parser = GNParser(cache=cache)
+        expected = parser.parse_file(build)
+        for entry in (tmp_path / "cache").rglob("*.ir"):
+            entry.write_bytes(b"garbage")
+        assert parser.parse_file(build) == expected
+        assert cache.stats.misses == 2
+
+    def test_converter_with_cache(self, tmp_path: Path) -> None:
+        """Test that Converter.convert_file goes through the cache."""
+        build = tmp_path / "BUILD.gn"
+        build.write_text(GN_CONTENT)
+        cache = ParseCache(tmp_path / "cache")
+        converter = Converter(cache=cache)
+        converter.convert_file(build, tmp_path / "a.txt", ConversionMode.GN_TO_CMAKE)
+        converter.convert_file(build, tmp_path / "b.txt", ConversionMode.GN_TO_CMAKE)
+        assert cache.stats.hits == 1
+        assert (tmp_path / "a.txt").read_text() == (tmp_path / "b.txt").read_text()
+
+    def test_from_config(self, tmp_path: Path) -> None:
+        """Test that the [cache] configuration section sets the directory and size bound."""
+        assert ParseCache.from_config(GNCMakeConfig().cache) is None
+        config = GNCMakeConfig.from_dict(
+            {"cache": {"enabled": True, "directory": str(tmp_path), "max_size_mb": 2}}
+        )
+        cache = ParseCache.from_config(config.cache)
+        assert cache is not None
+        assert (cache.directory, cache.max_bytes) == (tmp_path, 2 * 1024 * 1024)
+        with pytest.raises(ConfigurationError):
+            GNCMakeConfig.from_dict({"cache": {"max_size_mb": 0}})
@@ -0,0 +1,97 @@
+"""Tests for custom commands, target_sources and generated file dependencies."""
+import time
+from pathlib import Path
+
+from gncmake_bridge import CMakeParser, TargetType
+
+
+class TestCustomCommands:
+    """Tests for linking generated files to the actions producing them."""
+
+    def setup_method(self) -> None:
+        self.parser = CMakeParser()
+
+    def test_custom_command_action(self) -> None:
+        """Test that add_custom_command(OUTPUT) becomes an action."""
+        action, tool = self.parser.parse(
+            """
+add_custom_command(
+  OUTPUT ${CMAKE_CURRENT_BINARY_DIR}/version.cc version.h
+  COMMAND python3 gen.py --out version.cc
+  MAIN_DEPENDENCY version.in
+  DEPENDS gen_tool gen.py
+  BYPRODUCTS version.d
+  VERBATIM)
+add_executable(gen_tool tool.cc)
+add_custom_command(TARGET gen_tool POST_BUILD COMMAND strip gen_tool)
+"""
+        )
+        assert action.name == "generate_version_cc"
+        assert action.type == TargetType.ACTION
+        assert action.script == "python3"
+        assert action.inputs == ["version.in", "gen.py"]
+        assert action.outputs == [
+            "$target_gen_dir/version.cc",
+            "$target_gen_dir/version.h",
+            "$target_gen_dir/version.d",
+        ]
+        # DEPENDS on a target becomes a dependency rather than an input.
+        assert action.deps == ["gen_tool"]
+        assert tool.name == "gen_tool"
+
+    def test_consumers_depend_on_producer(self) -> None:
+        """Test that sources, target_sources and custom targets get deps on producers."""
+        _, core, docs = self.parser.parse(
+            """
+add_custom_command(OUTPUT config.h proto.pb.cc COMMAND protoc x.proto BYPRODUCTS proto.d)
+add_library(core STATIC core.cc ${CMAKE_CURRENT_BINARY_DIR}/proto.pb.cc)
+target_sources(core PRIVATE config.h PUBLIC FILE_SET HEADERS BASE_DIRS inc FILES inc/core.h)
+add_custom_target(docs ALL COMMAND doxygen DEPENDS proto.d)
+"""
+        )
+        # A relative source that a custom command outputs is a generated file.
+        assert core.sources == [
+            "core.cc",
+            "$target_gen_dir/proto.pb.cc",
+            "$target_gen_dir/config.h",
+        ]
+        assert core.headers == ["inc/core.h"]
+        assert core.deps == ["generate_config_h"]
+        assert docs.inputs == ["$target_gen_dir/proto.d"]
+        assert docs.deps == ["generate_config_h"]
+
+    def test_producer_in_other_directory(self, tmp_path: Path) -> None:
+        """Test that a producer in another directory is depended on by label."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "CMakeLists.txt").write_text(
+            "add_custom_command(OUTPUT ${CMAKE_BINARY_DIR}/config.h COMMAND gen)\n"
+            "add_subdirectory(src)\n"
+        )
+        (tmp_path / "src/CMakeLists.txt").write_text(
+            "add_library(lib STATIC lib.cc)\n"
+            "target_sources(lib PRIVATE ${PROJECT_BINARY_DIR}/config.h)\n"
+        )
+        targets = self.parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert list(targets) == ["//:generate_config_h", "//src:lib"]
+        assert targets["//src:lib"].deps == ["//:generate_config_h"]
+
+    def test_linear_scaling(self) -> None:
+        """Test that linking generated files costs constant time per file."""
+
+        def best_parse_time(count: int) -> float:
+            content = "".join(
+                f"add_custom_command(OUTPUT g{i}.cc COMMAND gen {i})\n"
+                f"add_library(lib{i} STATIC a{i}.cc g{i}.cc)\n"
+                for i in range(count)
+            )
+            best = float("inf")
+            for _ in range(2):
+                start = time.perf_counter()
+                targets = self.parser.parse(content)
+                best = min(best, time.perf_counter() - start)
+            assert targets[-1].deps == [f"generate_g{count - 1}_cc"]
+            return best
+
+        small = best_parse_time(500)
+        large = best_parse_time(5_000)
+        assert large < small * 25
@@ -0,0 +1,133 @@
+"""Tests for CMake variable scopes, lists and functions."""
+import pytest
+
+from gncmake_bridge import CMakeParser, ParseError
+from gncmake_bridge.parser.cmake_eval import CMakeScope
+
+
+class TestCMakeScope:
+    """Tests for variable lookup and expansion."""
+
+    def test_nested_references(self) -> None:
+        """Test that references inside variable names are expanded first."""
+        scope = CMakeScope()
+        scope.set("PLATFORM", "linux")
+        scope.set("SRCS_linux", "a.cc;b.cc")
+        assert scope.expand("${SRCS_${PLATFORM}}") == "a.cc;b.cc"
+        assert scope.expand("pre-${MISSING}-post") == "pre--post"
+        assert scope.expand("\\${PLATFORM}") == "\\${PLATFORM}"
+
+    def test_memoized_expansion_is_invalidated(self) -> None:
+        """Test that changing a variable or cache entry refreshes expansions."""
+        scope = CMakeScope()
+        scope.set("A", "1")
+        assert scope.expand("${A}") == "1"
+        scope.set("A", "2")
+        assert scope.expand("${A}") == "2"
+        child = scope.child()
+        assert child.expand("${B}") == ""
+        scope.cache.set("B", "cached")
+        assert child.expand("${B}") == "cached"
+
+    def test_function_scope(self) -> None:
+        """Test that child scopes copy on write and PARENT_SCOPE targets the parent."""
+        parent = CMakeScope()
+        parent.set("X", "outer")
+        child = parent.child()
+        child.set("X", "inner")
+        child.set_parent("Y", "exported")
+        child.unset("Z")
+        assert parent.get("X") == "outer"
+        assert parent.get("Y") == "exported"
+        assert child.get("Y") is None
+
+    def test_unset_falls_back_to_cache(self) -> None:
+        """Test that a cache entry is visible once the normal binding is unset."""
+        scope = CMakeScope()
+        scope.cache.set("OPT", "ON")
+        scope.set("OPT", "OFF")
+        assert scope.get("OPT") == "OFF"
+        scope.unset("OPT")
+        assert scope.get("OPT") == "ON"
+        assert scope.expand("$CACHE{OPT}") == "ON"
+
+    def test_unterminated_reference(self) -> None:
+        """Test that an unterminated reference raises ParseError."""
+        with pytest.raises(ParseError, match="Unterminated variable reference"):
+            CMakeScope().expand("${A")
+
+
+class TestCMakeInterpreter:
+    """Tests for variables and functions in parsed CMake files."""
+
+    def setup_method(self) -> None:
+        self.parser = CMakeParser()
+
+    def test_variable_sources(self) -> None:
+        """Test that ${SRCS} expands to its list elements."""
+        (target,) = self.parser.parse(
+            """
+set(SRCS a.cc b.cc)
+set(SRCS ${SRCS} "c d.cc")
+add_library(lib STATIC ${SRCS})
+"""
+        )
+        assert target.sources == ["a.cc", "b.cc", "c d.cc"]
+
+    def test_list_operations(self) -> None:
+        """Test list(APPEND), list(REMOVE_ITEM) and list(FILTER)."""
+        (target,) = self.parser.parse(
+            """
+list(APPEND SRCS a.cc b.cc a_test.cc win.cc)
+list(REMOVE_ITEM SRCS win.cc missing.cc)
+list(FILTER SRCS EXCLUDE REGEX "_test\\\\.cc$")
+add_executable(app ${SRCS})
+"""
+        )
+        assert target.sources == ["a.cc", "b.cc"]
+
+    def test_cache_variables(self) -> None:
+        """Test that set(CACHE) does not override an existing entry unless FORCE."""
+        (target,) = self.parser.parse(
+            """
+option(USE_X "Use X" ON)
+set(MODE debug CACHE STRING "Mode")
+set(MODE release CACHE STRING "Mode")
+set(LEVEL 1 CACHE STRING "Level")
+set(LEVEL 2 CACHE STRING "Level" FORCE)
+add_executable(app main.cc)
+target_compile_definitions(app PRIVATE X=${USE_X} MODE=${MODE} LEVEL=${LEVEL})
+"""
+        )
+        assert target.defines == ["X=ON", "MODE=debug", "LEVEL=2"]
+
+    def test_function_and_macro(self) -> None:
+        """Test that functions run in their own scope and macros in the caller's."""
+        targets = self.parser.parse(
+            """
+function(add_module name)
+  set(local ${ARGN})
+  add_library(${name} STATIC ${local})
+  set(LAST_MODULE ${name} PARENT_SCOPE)
+endfunction()
+macro(add_tool name)
+  add_executable(${name} ${ARGN})
+  set(LAST_TOOL ${name})
+endmacro()
+add_module(core core.cc util.cc)
+add_tool(cli cli.cc)
+add_executable(app main.cc ${local})
+target_link_libraries(app PRIVATE ${LAST_MODULE} ${LAST_TOOL})
+"""
+        )
+        assert [(t.name, t.sources) for t in targets] == [
+            ("core", ["core.cc", "util.cc"]),
+            ("cli", ["cli.cc"]),
+            ("app", ["main.cc"]),
+        ]
+        assert targets[2].private_deps == ["core", "cli"]
+
+    def test_recursion_limit(self) -> None:
+        """Test that unbounded recursion raises ParseError."""
+        with pytest.raises(ParseError, match="recursion"):
+            self.parser.parse("function(f)\n  f()\nendfunction()\nf()\n")
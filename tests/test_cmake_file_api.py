@@ -0,0 +1,87 @@
+"""Tests for reading CMake file API replies."""
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import CMakeFileApiReader, ParseError, TargetType
+
+BUILD_DIR = Path(__file__).parent / "fixtures" / "cmake_file_api" / "build"
+
+
+class TestCMakeFileApiReader:
+    """Tests for CMakeFileApiReader against a checked-in reply."""
+
+    def setup_method(self) -> None:
+        self.reader = CMakeFileApiReader(BUILD_DIR, jobs=1)
+
+    def test_targets(self) -> None:
+        """Test that target objects become labeled targets in codemodel order."""
+        targets = self.reader.targets()
+        assert list(targets) == ["//:app", "//src/base:base", "//src/core:core", "//:gen_version"]
+        assert [t.type for t in targets.values()] == [
+            TargetType.EXECUTABLE,
+            TargetType.STATIC_LIBRARY,
+            TargetType.SHARED_LIBRARY,
+            TargetType.ACTION,
+        ]
+        assert targets["//:gen_version"].sources == []
+
+    def test_sources_and_compile_groups(self) -> None:
+        """Test paths relative to the target, the source root or absolute."""
+        base = self.reader.targets()["//src/base:base"]
+        assert base.sources == ["base.cc", "base_linux.c"]
+        assert base.headers == ["base.h"]
+        assert base.include_dirs == ["include", "//include", "/opt/extra/include"]
+        assert base.defines == ["BASE_IMPL", 'VERSION="1.0"']
+        assert base.compile_flags == ["-g", "-fPIC", "-std=gnu++17"]
+        assert base.deps == []
+        assert base.output_name is None
+
+    def test_link_and_dependencies(self) -> None:
+        """Test that dependency artifacts are left to deps and other libraries kept."""
+        core = self.reader.targets()["//src/core:core"]
+        assert core.sources == ["core.cc", "//build/gen/version.cc"]
+        assert core.link_flags == [
+            "-g",
+            "-Wl,--as-needed",
+            "-L/opt/extra/lib",
+            "-lpthread",
+            "/usr/lib/x86_64-linux-gnu/libz.so",
+        ]
+        assert core.deps == ["//src/base:base", "//:gen_version"]
+        assert core.output_name == "core_final"
+
+    def test_dependency_labels(self) -> None:
+        """Test that dependencies are labeled with the directory of their target."""
+        targets = self.reader.targets()
+        assert targets["//:app"].deps == ["//src/core:core", "//src/base:base"]
+        assert all(dep in targets for target in targets.values() for dep in target.deps)
+
+    def test_parallel_matches_serial(self) -> None:
+        """Test that loading in worker processes gives the same targets in order."""
+        parallel = CMakeFileApiReader(BUILD_DIR, jobs=2).targets()
+        assert parallel == self.reader.targets()
+
+    def test_configuration(self) -> None:
+        """Test that a configuration of a multi-config reply can be chosen."""
+        reader = CMakeFileApiReader(BUILD_DIR, configuration="Release", jobs=1)
+        (base,) = reader.targets().values()
+        assert base.compile_flags == ["-O2", "-fPIC", "-std=gnu++17"]
+        with pytest.raises(ParseError, match="No configuration 'MinSizeRel'"):
+            CMakeFileApiReader(BUILD_DIR, configuration="MinSizeRel").targets()
+
+    def test_toolchain(self) -> None:
+        """Test that compilers come from the toolchains object and tools from the cache."""
+        toolchain = self.reader.toolchain()
+        assert toolchain.name == "gnu"
+        assert toolchain.c_compiler == "/usr/bin/gcc"
+        assert toolchain.cxx_compiler == "/usr/bin/g++"
+        assert toolchain.target_triple == "x86_64-linux-gnu"
+        assert (toolchain.ar, toolchain.linker) == ("/usr/bin/ar", "/usr/bin/ld")
+        assert toolchain.cxx_standard == "c++20"
+        assert toolchain.metadata["CXX"]["version"] == "13.2.0"
+
+    def test_missing_reply(self, tmp_path: Path) -> None:
+        """Test that a build tree without a reply raises ParseError."""
+        with pytest.raises(ParseError, match="No CMake file API reply index"):
+            CMakeFileApiReader(tmp_path)
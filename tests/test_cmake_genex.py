@@ -0,0 +1,107 @@
+"""Tests for generator expression evaluation over configuration batches."""
+from gncmake_bridge import CMakeParser
+from gncmake_bridge.parser.cmake_genex import (
+    DEFAULT_GENEX_CONFIGS,
+    GenexConfigs,
+    compile_genex,
+)
+from gncmake_bridge.parser.gn_conditions import ConfigMatrix
+
+CONFIGS = {
+    "debug": {"CONFIG": "Debug", "PLATFORM_ID": "Linux"},
+    "release": {"CONFIG": "Release", "PLATFORM_ID": "Linux"},
+    "win_release": {"CONFIG": "Release", "PLATFORM_ID": "Windows"},
+}
+
+
+class TestGenexConfigs:
+    """Tests for evaluating expressions in every configuration at once."""
+
+    def setup_method(self) -> None:
+        self.configs = GenexConfigs(CONFIGS)
+
+    def test_config_query(self) -> None:
+        """Test that $<CONFIG:...> matches configuration names case-insensitively."""
+        assert self.configs.evaluate("$<CONFIG:debug,RELEASE>") == ("1", "1", "1")
+        assert self.configs.evaluate("$<$<CONFIG:Debug>:-g>") == ("-g", "", "")
+        assert self.configs.evaluate("x$<CONFIG>y") == ("xDebugy", "xReleasey", "xReleasey")
+
+    def test_nested_operators(self) -> None:
+        """Test logical operators, IF and string functions."""
+        text = (
+            "$<IF:$<AND:$<CONFIG:Release>,$<NOT:$<PLATFORM_ID:Windows>>>,"
+            "fast,$<LOWER_CASE:$<PLATFORM_ID>>>"
+        )
+        assert self.configs.evaluate(text) == ("linux", "fast", "windows")
+        assert self.configs.evaluate("$<BOOL:OFF>$<BOOL:yes>$<STREQUAL:a,b>") == ("010",) * 3
+        assert self.configs.evaluate("$<1:a,b>$<0:c>$<COMMA>$<ANGLE-R>") == ("a,b,>",) * 3
+
+    def test_unknown_expressions(self) -> None:
+        """Test that expressions that cannot be evaluated yield None."""
+        assert self.configs.evaluate("$<TARGET_FILE:app>") == (None,) * 3
+        assert self.configs.evaluate("$<$<CONFIG:Debug>:$<TARGET_FILE:app>>") == (None,) * 3
+        assert self.configs.evaluate("$<CONFIG:Debug") == (None,) * 3
+
+    def test_compiled_once(self) -> None:
+        """Test that the same text is compiled once for every batch."""
+        text = "$<$<PLATFORM_ID:Linux>:-fPIC>"
+        assert compile_genex(text) is compile_genex(text)
+        other = GenexConfigs(DEFAULT_GENEX_CONFIGS)
+        assert other.evaluate(text).count("-fPIC") == 3
+
+    def test_condition_uses_fewest_variables(self) -> None:
+        """Test that conditions only test the variables needed."""
+        assert self.configs.condition([0]) == 'cmake_config == "Debug"'
+        assert self.configs.condition([1]) == (
+            'cmake_config == "Release" && cmake_platform_id == "Linux"'
+        )
+        assert self.configs.condition([0, 2]) == (
+            '(cmake_config == "Debug" && cmake_platform_id == "Linux") || '
+            '(cmake_config == "Release" && cmake_platform_id == "Windows")'
+        )
+
+    def test_conditions_round_trip(self) -> None:
+        """Test that each condition holds in exactly its configurations."""
+        matrix = ConfigMatrix(self.configs.condition_args())
+        for indices in ([0], [1], [2], [0, 1], [0, 2], [1, 2]):
+            names = [self.configs.names[i] for i in indices]
+            assert matrix.matching(self.configs.condition(indices)) == names
+
+
+class TestCMakeParserGenex:
+    """Tests for generator expressions in parsed CMake files."""
+
+    def setup_method(self) -> None:
+        self.parser = CMakeParser(genex_configs=CONFIGS)
+
+    def test_condition_blocks(self) -> None:
+        """Test that values that differ between configurations become condition blocks."""
+        (target,) = self.parser.parse(
+            """
+add_library(core STATIC core.cc $<$<PLATFORM_ID:Windows>:win.cc>)
+target_compile_definitions(core PRIVATE $<$<CONFIG:Debug>:-DDEBUG_MODE> CORE)
+target_compile_options(core PRIVATE "$<$<CONFIG:Debug>:-g;-O0>" $<BUILD_INTERFACE:-Wall>)
+target_include_directories(core PUBLIC $<BUILD_INTERFACE:${CMAKE_CURRENT_SOURCE_DIR}/inc>)
+target_link_libraries(core PRIVATE base $<TARGET_NAME_IF_EXISTS:opt>)
+"""
+        )
+        assert target.sources == ["core.cc"]
+        assert target.defines == ["CORE"]
+        assert target.compile_flags == ["-Wall"]
+        assert target.include_dirs == ["inc"]
+        assert target.private_deps == ["base"]
+        blocks = {block.condition: block.properties for block in target.conditions}
+        assert blocks == {
+            'cmake_platform_id == "Windows"': {"sources": ["win.cc"]},
+            'cmake_config == "Debug"': {"defines": ["DEBUG_MODE"], "cflags": ["-g", "-O0"]},
+        }
+
+    def test_resolved_per_configuration(self) -> None:
+        """Test that resolving the blocks gives each configuration its own values."""
+        (target,) = self.parser.parse(
+            "add_executable(app main.cc)\n"
+            "target_compile_options(app PRIVATE $<IF:$<CONFIG:Debug>,-O0,-O2>)\n"
+        )
+        matrix = ConfigMatrix(GenexConfigs(CONFIGS).condition_args())
+        resolved = matrix.resolve(target)
+        assert [resolved[name].compile_flags for name in CONFIGS] == [["-O0"], ["-O2"], ["-O2"]]
@@ -0,0 +1,110 @@
+"""Tests for file(GLOB) resolution against a directory index."""
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import CMakeParser, ParseError
+from gncmake_bridge.parser.cmake_glob import DirectoryIndex, scan_glob
+
+
+def make_tree(root: Path, names: list[str]) -> None:
+    """Create empty files at ``names`` under ``root``."""
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+class TestDirectoryIndex:
+    """Tests for glob matching against an index."""
+
+    def setup_method(self) -> None:
+        self.names = ["a.cc", "b.cc", "a.h", "x/c.cc", "x/y/d.cc", "x0.cc", "z/e.cc"]
+
+    def test_glob_and_recurse(self, tmp_path: Path) -> None:
+        """Test that * stops at / unless the glob recurses."""
+        make_tree(tmp_path, self.names)
+        index = DirectoryIndex(tmp_path)
+        assert index.match(["*.cc"]) == {"a.cc", "b.cc", "x0.cc"}
+        assert index.match(["x/*.cc"]) == {"x/c.cc"}
+        assert index.match(["x/*.cc"], recurse=True) == {"x/c.cc", "x/y/d.cc"}
+        assert index.match(["*/*.cc"], recurse=True) == {"x/c.cc", "x/y/d.cc", "z/e.cc"}
+
+    def test_classes_and_directories(self, tmp_path: Path) -> None:
+        """Test character classes and listing directories."""
+        make_tree(tmp_path, self.names)
+        index = DirectoryIndex(tmp_path)
+        assert index.match(["[ab].*", "?0.cc"]) == {"a.cc", "b.cc", "a.h", "x0.cc"}
+        assert index.match(["[!a]*.cc"]) == {"b.cc", "x0.cc"}
+        assert index.match(["*"], list_directories=False) == {"a.cc", "b.cc", "a.h", "x0.cc"}
+        assert index.match(["x/*"]) == {"x/c.cc", "x/y"}
+
+
+    def test_scan_outside_index(self, tmp_path: Path) -> None:
+        """Test that scanning lists only the directories a pattern reaches."""
+        make_tree(tmp_path, self.names)
+        base = tmp_path.as_posix()
+        assert scan_glob(f"{base}/x/*.cc") == {f"{base}/x/c.cc"}
+        assert scan_glob(f"{base}/*/*.cc") == {f"{base}/x/c.cc", f"{base}/z/e.cc"}
+        assert scan_glob(f"{base}/x/*.cc", recurse=True) == {f"{base}/x/c.cc", f"{base}/x/y/d.cc"}
+        assert scan_glob(f"{base}/*", list_directories=False) == {
+            f"{base}/{name}" for name in ("a.cc", "b.cc", "a.h", "x0.cc")
+        }
+        with pytest.raises(ParseError, match="would walk the filesystem"):
+            scan_glob("/*.cc", recurse=True)
+
+
+class TestParseProjectGlobs:
+    """Tests for file(GLOB) in CMakeParser.parse_project."""
+
+    def setup_method(self) -> None:
+        self.parser = CMakeParser()
+
+    def test_globbed_sources(self, tmp_path: Path) -> None:
+        """Test that globs become explicit, sorted source lists."""
+        make_tree(tmp_path, ["src/b.cc", "src/a.cc", "src/a.h", "src/impl/c.cc", "common/d.cc"])
+        (tmp_path / "CMakeLists.txt").write_text(
+            "file(GLOB_RECURSE SRCS CONFIGURE_DEPENDS ${CMAKE_SOURCE_DIR}/common/*.cc)\n"
+            "add_subdirectory(src)\n"
+        )
+        (tmp_path / "src/CMakeLists.txt").write_text(
+            "file(GLOB LOCAL *.cc *.h)\n"
+            "file(GLOB_RECURSE IMPL ${CMAKE_CURRENT_SOURCE_DIR}/impl/*.cc)\n"
+            "file(GLOB NAMES RELATIVE ${CMAKE_SOURCE_DIR} *.cc)\n"
+            "add_library(lib STATIC ${LOCAL} ${IMPL} ${SRCS})\n"
+            "target_compile_definitions(lib PRIVATE ${NAMES})\n"
+        )
+        targets = self.parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        lib = targets["//src:lib"]
+        assert lib.sources == ["a.cc", "a.h", "b.cc", "impl/c.cc", "//common/d.cc"]
+        assert lib.defines == ["src/a.cc", "src/b.cc"]
+
+    def test_tree_walked_once(self, tmp_path: Path) -> None:
+        """Test that many globs share one walk until the tree changes."""
+        make_tree(tmp_path, [f"m{i}/f.cc" for i in range(20)])
+        (tmp_path / "CMakeLists.txt").write_text(
+            "".join(
+                f"file(GLOB S{i} m{i}/*.cc)\nadd_library(m{i} STATIC ${{S{i}}})\n"
+                for i in range(20)
+            )
+        )
+        targets = self.parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert targets["//:m3"].sources == ["m3/f.cc"]
+        self.parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert self.parser.directory_indexes.walks[tmp_path] == 1
+
+        make_tree(tmp_path, ["m3/g.cc"])
+        targets = self.parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert targets["//:m3"].sources == ["m3/f.cc", "m3/g.cc"]
+        assert self.parser.directory_indexes.walks[tmp_path] == 2
+
+    def test_undefined_variable(self, tmp_path: Path) -> None:
+        """Test that a glob from an unset variable lists / once instead of indexing it."""
+        make_tree(tmp_path, ["a.cc"])
+        (tmp_path / "CMakeLists.txt").write_text(
+            "file(GLOB SRCS ${UNSET}/*.cc)\nfile(GLOB OWN *.cc)\n"
+            "add_library(lib STATIC ${OWN} ${SRCS})\n"
+        )
+        targets = self.parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert targets["//:lib"].sources == ["a.cc"]
+        assert list(self.parser.directory_indexes.walks) == [tmp_path]
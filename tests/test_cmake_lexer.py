@@ -0,0 +1,142 @@
+"""Tests for the CMake tokenizer and the parser built on it."""
+import time
+
+import pytest
+
+from gncmake_bridge import CMakeParser, ParseError
+from gncmake_bridge.parser.cmake_lexer import ArgumentKind, argument_values, tokenize_cmake
+
+
+class TestCMakeLexer:
+    """Tests for CMake tokenization."""
+
+    def test_argument_kinds_and_offsets(self) -> None:
+        """Test that each argument kind is recognized with its source span."""
+        source = 'add_executable(app main.cc "a b.cc" [=[x]]y]=])'
+        (command,) = tokenize_cmake(source)
+        assert command.name == "add_executable"
+        assert [(a.value, a.kind) for a in command.arguments] == [
+            ("app", ArgumentKind.UNQUOTED),
+            ("main.cc", ArgumentKind.UNQUOTED),
+            ("a b.cc", ArgumentKind.QUOTED),
+            ("x]]y", ArgumentKind.BRACKET),
+        ]
+        assert [source[a.start : a.end] for a in command.arguments[2:]] == [
+            '"a b.cc"',
+            "[=[x]]y]=]",
+        ]
+        assert source[command.start : command.end] == source
+
+    def test_comments_and_multiline_commands(self) -> None:
+        """Test that line and bracket comments are skipped across lines."""
+        source = """
+#[[ a bracket comment
+add_library(not_a_target) ]]
+ADD_LIBRARY(lib  # a line comment
+  #[=[ inline ]=] a.cc
+  b.cc)
+"""
+        commands = tokenize_cmake(source)
+        assert [c.name for c in commands] == ["add_library"]
+        assert argument_values(commands[0].arguments) == ["lib", "a.cc", "b.cc"]
+
+    def test_escapes_and_lists(self) -> None:
+        """Test escape sequences and splitting of unquoted lists."""
+        (command,) = tokenize_cmake(
+            'set(x a;b\\;c;;d "q\\"uote\\tx;y" "line\\\ncontinued" [[\\n]])'
+        )
+        assert argument_values(command.arguments) == [
+            "x",
+            "a",
+            "b;c",
+            "d",
+            'q"uote\tx;y',
+            "linecontinued",
+            "\\n",
+        ]
+
+    def test_nested_parentheses(self) -> None:
+        """Test that nested parentheses are passed through as arguments."""
+        (command,) = tokenize_cmake("if((A OR B) AND C)")
+        assert argument_values(command.arguments) == ["(", "A", "OR", "B", ")", "AND", "C"]
+
+    def test_bytes_source(self) -> None:
+        """Test that byte buffers are tokenized with byte offsets."""
+        source = 'add_library(lib "ü.cc")\n'.encode()
+        (command,) = tokenize_cmake(source)
+        assert argument_values(command.arguments) == ["lib", "ü.cc"]
+        quoted = command.arguments[1]
+        assert source[quoted.start : quoted.end] == '"ü.cc"'.encode()
+
+    @pytest.mark.parametrize(
+        ("source", "message", "column"),
+        [
+            ("add_library(lib a.cc\n", "Unterminated command", 1),
+            ('add_library(lib "a.cc)', "Unterminated quoted argument", 17),
+            ("add_library(lib [[a.cc)", "Unterminated bracket argument", 17),
+            ('set(x "a\\qb")', "Invalid escape sequence", 9),
+            ('"stray"', "Expected a command invocation", 1),
+        ],
+    )
+    def test_errors(self, source: str, message: str, column: int) -> None:
+        """Test that malformed input reports its position."""
+        with pytest.raises(ParseError, match=message) as excinfo:
+            tokenize_cmake(source)
+        assert excinfo.value.line == 1
+        assert excinfo.value.column == column
+
+
+class TestCMakeParserTokens:
+    """Tests for CMakeParser behavior that depends on the tokenizer."""
+
+    def setup_method(self) -> None:
+        self.parser = CMakeParser()
+
+    def test_multiline_target_commands(self) -> None:
+        """Test that target commands spanning several lines are applied."""
+        targets = self.parser.parse(
+            """
+add_library(core STATIC core.cc "with space.cc")
+target_link_libraries(core
+  PUBLIC
+    base
+)
+set_target_properties(core PROPERTIES
+  OUTPUT_NAME core_final
+)
+"""
+        )
+        (core,) = targets
+        assert core.sources == ["core.cc", "with space.cc"]
+        assert core.public_deps == ["base"]
+        assert core.output_name == "core_final"
+
+    def test_parentheses_in_quoted_arguments(self) -> None:
+        """Test that parentheses inside quoted arguments do not end a command."""
+        (target,) = self.parser.parse(
+            'add_executable(app main.cc)\ntarget_compile_definitions(app PRIVATE "F(x)=x")\n'
+        )
+        assert target.defines == ["F(x)=x"]
+
+    def test_linear_scaling(self) -> None:
+        """Test that parsing a 50k-line file scales linearly."""
+
+        def best_parse_time(count: int) -> float:
+            content = "".join(
+                f"add_library(lib{i} STATIC\n  a{i}.cc\n  b{i}.cc\n)\n"
+                f"target_link_libraries(lib{i} PRIVATE dep{i})\n"
+                for i in range(count)
+            )
+            best = float("inf")
+            for _ in range(2):
+                start = time.perf_counter()
+                targets = self.parser.parse(content)
+                best = min(best, time.perf_counter() - start)
+            assert len(targets) == count
+            return best
+
+        small = best_parse_time(1_000)
+        large = best_parse_time(10_000)
+        # 10x the input should cost about 10x the time; quadratic growth
+        # would be 100x.
+        assert large < small * 25
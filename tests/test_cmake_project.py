@@ -0,0 +1,112 @@
+"""Tests for parsing whole CMake projects."""
+import os
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import CMakeParser, ParseError
+
+
+def make_project(root: Path) -> None:
+    """Create a small CMake project with a shared helper module."""
+    files = {
+        "CMakeLists.txt": (
+            "project(demo)\n"
+            "list(APPEND CMAKE_MODULE_PATH ${CMAKE_SOURCE_DIR}/cmake)\n"
+            "include(Helpers)\n"
+            "include(GNUInstallDirs)\n"
+            "set(COMMON_DEFS COMMON=1)\n"
+            "add_subdirectory(src/core)\n"
+            "add_subdirectory(src/app)\n"
+            "target_compile_definitions(app PRIVATE ${CORE_VERSION})\n"
+        ),
+        "cmake/Helpers.cmake": (
+            "function(demo_library name)\n"
+            "  add_library(${name} STATIC ${ARGN})\n"
+            "  target_compile_definitions(${name} PRIVATE ${COMMON_DEFS})\n"
+            "endfunction()\n"
+            "set(HELPERS_DIR ${CMAKE_CURRENT_LIST_DIR})\n"
+        ),
+        "src/core/CMakeLists.txt": (
+            "demo_library(core core.cc ${HELPERS_DIR}/stub.cc)\n"
+            "set(CORE_VERSION CORE=2 PARENT_SCOPE)\n"
+        ),
+        "src/app/CMakeLists.txt": (
+            "include(${CMAKE_SOURCE_DIR}/cmake/Helpers.cmake)\n"
+            "add_executable(app ${CMAKE_CURRENT_SOURCE_DIR}/main.cc)\n"
+            "target_link_libraries(app PRIVATE core)\n"
+        ),
+    }
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+class TestParseProject:
+    """Tests for CMakeParser.parse_project."""
+
+    def test_subdirectories_and_includes(self, tmp_path: Path) -> None:
+        """Test that subdirectories and included modules are followed."""
+        make_project(tmp_path)
+        targets = CMakeParser().parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert list(targets) == ["//src/core:core", "//src/app:app"]
+        core, app = targets.values()
+        assert core.sources == ["core.cc", "//cmake/stub.cc"]
+        assert core.defines == ["COMMON=1"]
+        assert app.sources == ["main.cc"]
+        assert app.private_deps == ["core"]
+        # Set from the subdirectory with PARENT_SCOPE, applied from the root.
+        assert app.defines == ["CORE=2"]
+
+    def test_process_pool_matches_serial(self, tmp_path: Path) -> None:
+        """Test that tokenizing in worker processes gives the same result."""
+        make_project(tmp_path)
+        parser = CMakeParser()
+        serial = parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert CMakeParser().parse_project(tmp_path / "CMakeLists.txt", jobs=2) == serial
+
+    def test_modules_are_parsed_once(self, tmp_path: Path) -> None:
+        """Test that a module included twice is tokenized once and reused."""
+        make_project(tmp_path)
+        parser = CMakeParser()
+        parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        helpers = tmp_path / "cmake" / "Helpers.cmake"
+        assert parser.list_files.parses[helpers] == 1
+
+        parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert sum(parser.list_files.parses.values()) == 4
+
+    def test_invalidation(self, tmp_path: Path) -> None:
+        """Test that touched files are re-hashed and changed files re-tokenized."""
+        make_project(tmp_path)
+        parser = CMakeParser()
+        parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        core = tmp_path / "src" / "core" / "CMakeLists.txt"
+
+        stat = core.stat()
+        os.utime(core, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert parser.list_files.parses[core] == 1
+
+        core.write_text("demo_library(core2 core.cc)\n")
+        targets = parser.parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert parser.list_files.parses[core] == 2
+        assert "//src/core:core2" in targets
+
+    def test_include_cycle(self, tmp_path: Path) -> None:
+        """Test that an include cycle raises ParseError."""
+        (tmp_path / "CMakeLists.txt").write_text("include(a.cmake)\n")
+        (tmp_path / "a.cmake").write_text("include(b.cmake)\n")
+        (tmp_path / "b.cmake").write_text("include(a.cmake)\n")
+        with pytest.raises(ParseError, match="Include cycle"):
+            CMakeParser().parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+
+    def test_missing_include(self, tmp_path: Path) -> None:
+        """Test that a missing include fails unless it is OPTIONAL."""
+        lists = tmp_path / "CMakeLists.txt"
+        lists.write_text("include(missing.cmake OPTIONAL)\nadd_library(lib a.cc)\n")
+        assert list(CMakeParser().parse_project(lists, jobs=1)) == ["//:lib"]
+        lists.write_text("include(missing.cmake)\n")
+        with pytest.raises(ParseError, match="Cannot include"):
+            CMakeParser().parse_project(lists, jobs=1)
@@ -0,0 +1,96 @@
+"""Tests for streaming CMakeParser.iter_parse."""
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import CMakeParser, ParseError
+from gncmake_bridge.parser.cmake_lexer import tokenize_cmake
+from gncmake_bridge.parser.cmake_parser import iter_cmake_targets, reference_offsets
+
+
+class TestCMakeIterParse:
+    """Tests for yielding targets as soon as they are complete."""
+
+    CONTENT = """
+function(link_all)
+  target_link_libraries(${ARGV0} PRIVATE from_function)
+endfunction()
+add_library(core STATIC core.cc)
+set_target_properties(core other PROPERTIES OUTPUT_NAME core_final)
+target_compile_definitions(app PRIVATE EARLY)
+add_executable(app main.cc)
+target_link_libraries(app PRIVATE core)
+add_library(late STATIC late.cc)
+link_all(late)
+"""
+
+    def setup_method(self) -> None:
+        self.parser = CMakeParser()
+
+    def test_matches_parse_file(self, tmp_path: Path) -> None:
+        """Test that streaming applies the same commands as parse_file."""
+        path = tmp_path / "CMakeLists.txt"
+        path.write_text(self.CONTENT)
+        streamed = {target.name: target for target in self.parser.iter_parse(path)}
+        parsed = {target.name: target for target in self.parser.parse_file(path)}
+        assert streamed == parsed
+        assert streamed["app"].defines == ["EARLY"]
+        assert streamed["late"].private_deps == ["from_function"]
+
+    def test_reference_offsets(self) -> None:
+        """Test that literal names are tracked and calls of functions are barriers."""
+        last_use, barrier = reference_offsets(tokenize_cmake(self.CONTENT))
+        assert set(last_use) == {"core", "other", "app"}
+        assert last_use["core"] < last_use["app"] < barrier
+        assert barrier == self.CONTENT.index("link_all(late)") + len("link_all(late)")
+
+    def test_release_order(self) -> None:
+        """Test that targets are released once the last command naming them has run."""
+        content = (
+            "add_library(a STATIC a.cc)\n"
+            "add_library(b STATIC b.cc)\n"
+            "target_link_libraries(a PRIVATE b)\n"
+            "add_library(c STATIC c.cc)\n"
+        )
+        assert [t.name for t in iter_cmake_targets(content)] == ["b", "a", "c"]
+
+    def test_yields_before_end_of_file(self, tmp_path: Path) -> None:
+        """Test that targets are yielded before later commands are evaluated."""
+        path = tmp_path / "CMakeLists.txt"
+        path.write_text("add_library(a STATIC a.cc)\nadd_library(b STATIC ${B)\n")
+        targets = self.parser.iter_parse(path)
+        assert next(targets).name == "a"
+        with pytest.raises(ParseError, match="Unterminated variable reference"):
+            next(targets)
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty file yields nothing."""
+        path = tmp_path / "CMakeLists.txt"
+        path.write_text("")
+        assert list(self.parser.iter_parse(path)) == []
+
+    def test_peak_memory(self, tmp_path: Path) -> None:
+        """Test that streaming keeps only the targets in flight."""
+        path = tmp_path / "targets.cmake"
+        path.write_text(
+            "".join(
+                f"add_library(lib{i} STATIC a{i}.cc b{i}.cc)\n"
+                f"set_target_properties(lib{i} PROPERTIES OUTPUT_NAME out{i})\n"
+                f"target_link_libraries(lib{i} PUBLIC dep{i})\n"
+                for i in range(1_000)
+            )
+        )
+
+        def peak(parse: Callable[[], object]) -> int:
+            tracemalloc.start()
+            try:
+                parse()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        streamed = peak(lambda: sum(1 for _ in self.parser.iter_parse(path)))
+        parsed = peak(lambda: self.parser.parse_file(path))
+        assert streamed * 4 < parsed
@@ -260,3 +260,83 @@ generated_file("generated") { sources = ["e.cc"] }
         assert TargetType.GROUP in types
         assert TargetType.ACTION in types
         assert TargetType.GENERATE_FILE in types
+
+
+class TestGNListMutation:
+    """Tests for += and -= on lists."""
+
+    def setup_method(self) -> None:
+        self.parser = GNParser()
+
+    def test_append_and_remove_in_target(self) -> None:
+        """Test that += appends and -= removes, keeping order."""
+        targets = self.parser.parse(
+            'static_library("lib") {\n'
+            '  sources = [ "a.cc", "b.cc" ]\n'
+            '  sources += [ "c.cc", "a.cc" ]\n'
+            '  sources -= [ "b.cc" ]\n'
+            '  cflags = [ "-Xclang", "-foo" ]\n'
+            '  cflags += [ "-Xclang", "-bar" ]\n'
+            "}\n"
+        )
+        assert targets[0].sources == ["a.cc", "c.cc"]
+        assert targets[0].compile_flags == ["-Xclang", "-foo", "-Xclang", "-bar"]
+
+    def test_file_level_accumulation(self) -> None:
+        """Test += and -= on file-level variables."""
+        targets = self.parser.parse(
+            'common = [ "x.cc" ]\n'
+            'common += [ "y.cc", "z.cc" ]\n'
+            'common -= [ "x.cc" ]\n'
+            'name = "base"\n'
+            'name += "_lib"\n'
+            'source_set(name) { sources = common }\n'
+        )
+        assert targets[0].name == "base_lib"
+        assert targets[0].sources == ["y.cc", "z.cc"]
+
+    def test_conditional_additions_and_removals(self) -> None:
+        """Test that conditional += and -= are recorded as deltas."""
+        targets = self.parser.parse(
+            'source_set("s") {\n'
+            '  sources = [ "common.cc", "posix.cc" ]\n'
+            "  if (is_win) {\n"
+            '    sources -= [ "posix.cc" ]\n'
+            '    sources += [ "win.cc" ]\n'
+            "  }\n"
+            "}\n"
+        )
+        target = targets[0]
+        assert target.sources == ["common.cc", "posix.cc"]
+        (block,) = target.conditions
+        assert block.properties == {"sources": ["win.cc"]}
+        assert block.removals == {"sources": ["posix.cc"]}
+
+        win = GNParser(args={"is_win": True}).parse(
+            'source_set("s") {\n'
+            '  sources = [ "common.cc", "posix.cc" ]\n'
+            '  if (is_win) { sources -= [ "posix.cc" ] sources += [ "win.cc" ] }\n'
+            "}\n"
+        )
+        assert win[0].sources == ["common.cc", "win.cc"]
+
+    def test_large_removal_is_linear(self) -> None:
+        """Test that pruning half of a 20k-entry list does not rescan per entry."""
+        import time
+
+        def prune_time(count: int) -> float:
+            files = [f'"f{i}.cc"' for i in range(count)]
+            content = (
+                f"all = [ {', '.join(files)} ]\n"
+                f"all -= [ {', '.join(files[::2])} ]\n"
+                'source_set("s") { sources = all }\n'
+            )
+            start = time.perf_counter()
+            targets = GNParser().parse(content)
+            assert len(targets[0].sources) == count // 2
+            return time.perf_counter() - start
+
+        small = min(prune_time(2_000) for _ in range(2))
+        large = min(prune_time(20_000) for _ in range(2))
+        # Quadratic removal would be about 100x slower for 10x the input.
+        assert large < small * 25
@@ -1,4 +1,8 @@
-from gncmake_bridge import ConversionMode, Converter
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import ConversionMode, Converter, ParseError
 
 
 class TestConverter:
@@ -56,3 +60,20 @@ static_library("mylib") {
         assert 'executable("myapp")' in roundtrip_gn
         assert "main.cc" in roundtrip_gn
         assert 'static_library("mylib")' in roundtrip_gn
+
+    def test_convert_file_streams_gn(self, tmp_path: Path) -> None:
+        gn_path = tmp_path / "BUILD.gn"
+        gn_path.write_text('executable("app") { sources = ["main.cc"] }\n')
+        output_path = tmp_path / "CMakeLists.txt"
+        self.converter.convert_file(gn_path, output_path, ConversionMode.GN_TO_CMAKE)
+        assert output_path.read_text() == self.converter.convert(
+            gn_path.read_text(), ConversionMode.GN_TO_CMAKE
+        )
+
+    def test_convert_file_parse_error_leaves_no_output(self, tmp_path: Path) -> None:
+        gn_path = tmp_path / "BUILD.gn"
+        gn_path.write_text('executable("app") { sources = [ }\n')
+        output_path = tmp_path / "CMakeLists.txt"
+        with pytest.raises(ParseError):
+            self.converter.convert_file(gn_path, output_path, ConversionMode.GN_TO_CMAKE)
+        assert list(tmp_path.iterdir()) == [gn_path]
@@ -0,0 +1,86 @@
+"""Tests for evaluating condition blocks over build configurations."""
+from gncmake_bridge import GNParser
+from gncmake_bridge.parser.gn_conditions import ConfigMatrix, compile_condition
+
+CONFIGS = {
+    "linux_debug": {"is_linux": True, "is_android": False, "is_debug": True, "target_cpu": "x64"},
+    "linux_release": {
+        "is_linux": True,
+        "is_android": False,
+        "is_debug": False,
+        "target_cpu": "x64",
+    },
+    "android_debug": {
+        "is_linux": False,
+        "is_android": True,
+        "is_debug": True,
+        "target_cpu": "arm64",
+    },
+    "android_release": {
+        "is_linux": False,
+        "is_android": True,
+        "is_debug": False,
+        "target_cpu": "arm64",
+    },
+}
+
+CONTENT = """
+static_library("lib") {
+  sources = [ "lib.cc" ]
+  if (is_linux && !is_debug) {
+    defines = [ "LINUX_RELEASE" ]
+  } else if (target_cpu == "arm64") {
+    cflags = [ "-march=armv8-a" ]
+    if (is_debug) {
+      defines = [ "ARM_DEBUG" ]
+    }
+  }
+  if (is_android || target_cpu != "x64") {
+    ldflags = [ "-llog" ]
+    sources += [ "android.cc" ]
+    sources -= [ "lib.cc" ]
+  }
+}
+"""
+
+
+class TestConfigMatrix:
+    """Tests for ConfigMatrix."""
+
+    def setup_method(self) -> None:
+        self.matrix = ConfigMatrix(CONFIGS)
+
+    def test_condition_masks(self) -> None:
+        """Test that conditions are evaluated to the matching configurations."""
+        assert self.matrix.matching("is_linux && !is_debug") == ["linux_release"]
+        assert self.matrix.matching('target_cpu == "arm64"') == [
+            "android_debug",
+            "android_release",
+        ]
+        assert self.matrix.matching("!(is_linux || is_android)") == []
+        assert self.matrix.matching("defined(is_debug)") == list(CONFIGS)
+        assert self.matrix.matching("undefined_arg") == []
+
+    def test_each_condition_evaluated_once(self) -> None:
+        """Test that a condition is compiled and evaluated once per matrix."""
+        compile_condition.cache_clear()
+        targets = GNParser().parse(CONTENT.replace('"lib"', '"a"') + CONTENT)
+        for target in targets:
+            self.matrix.resolve(target)
+        info = compile_condition.cache_info()
+        assert info.misses == 5
+        assert info.hits == 0
+
+    def test_resolve_matches_per_config_parse(self) -> None:
+        """Test that one traversal gives the same result as parsing per config."""
+        (target,) = GNParser().parse(CONTENT)
+        resolved = self.matrix.resolve(target)
+        for name, args in CONFIGS.items():
+            (expected,) = GNParser(args=args).parse(CONTENT)
+            assert resolved[name] == expected, name
+
+        assert resolved["android_debug"].defines == ["ARM_DEBUG"]
+        assert resolved["android_debug"].compile_flags == ["-march=armv8-a"]
+        assert resolved["android_release"].sources == ["android.cc"]
+        assert resolved["linux_debug"].link_flags == []
+        assert resolved["linux_debug"].conditions == []
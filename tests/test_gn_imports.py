@@ -0,0 +1,145 @@
+"""Tests for GN import() resolution."""
+import os
+from pathlib import Path
+from types import MappingProxyType
+
+import pytest
+
+from gncmake_bridge import GNParser, ParseCache, ParseError
+from gncmake_bridge.parser import ImportResolver
+
+
+def write(path: Path, content: str) -> Path:
+    """Write ``content`` and move the mtime forward so edits are always seen."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    existed = path.exists()
+    path.write_text(content)
+    if existed:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return path
+
+
+class TestImportResolver:
+    """Tests for ImportResolver."""
+
+    def setup_method(self) -> None:
+        self.build_file = (
+            'import("//build/features.gni")\n'
+            'static_library("lib") {\n'
+            "  sources = common_sources\n"
+            '  if (use_feature) { defines = [ "FEATURE" ] }\n'
+            "}\n"
+        )
+
+    def make_tree(self, root: Path) -> None:
+        write(
+            root / "build" / "features.gni",
+            "declare_args() {\n  use_feature = false\n}\n"
+            'common_sources = [ "common.cc" ]\n'
+            '_private = "hidden"\n',
+        )
+
+    def test_imported_variables(self, tmp_path: Path) -> None:
+        """Test that variables from an imported .gni are visible to the importer."""
+        self.make_tree(tmp_path)
+        targets = GNParser(source_root=tmp_path).parse(self.build_file)
+        assert targets[0].sources == ["common.cc"]
+
+    def test_relative_import(self, tmp_path: Path) -> None:
+        """Test that relative labels resolve against the importing file."""
+        write(tmp_path / "lib" / "local.gni", 'lib_sources = [ "x.cc" ]\n')
+        build = write(
+            tmp_path / "lib" / "BUILD.gn",
+            'import("local.gni")\nsource_set("x") { sources = lib_sources }\n',
+        )
+        targets = GNParser(source_root=tmp_path).parse_file(build)
+        assert targets[0].sources == ["x.cc"]
+
+    def test_evaluated_once_and_shared(self, tmp_path: Path) -> None:
+        """Test that one evaluation of a .gni serves every BUILD.gn file."""
+        self.make_tree(tmp_path)
+        resolver = ImportResolver(tmp_path)
+        for _ in range(3):
+            GNParser(imports=resolver).parse(self.build_file)
+
+        path = resolver.resolve("//build/features.gni")
+        assert resolver.evaluations[path] == 1
+        module = resolver.load(path)
+        assert isinstance(module.scope, MappingProxyType)
+        assert "_private" not in module.scope
+        with pytest.raises(TypeError):
+            module.scope["common_sources"] = []  # type: ignore[index]
+
+    def test_args_override_declared_defaults(self, tmp_path: Path) -> None:
+        """Test that each argument set gets its own evaluation."""
+        self.make_tree(tmp_path)
+        resolver = ImportResolver(tmp_path)
+        content = (
+            'import("//build/features.gni")\n'
+            "if (use_feature) {\n"
+            '  executable("with_feature") { }\n'
+            "}\n"
+        )
+        assert GNParser(imports=resolver).parse(content) == []
+        enabled = GNParser(imports=resolver, args={"use_feature": True}).parse(content)
+        assert [t.name for t in enabled] == ["with_feature"]
+        assert resolver.evaluations[resolver.resolve("//build/features.gni")] == 2
+
+    def test_changed_file_invalidates_importers_only(self, tmp_path: Path) -> None:
+        """Test that editing a .gni re-evaluates it and its importers only."""
+        write(tmp_path / "a.gni", 'import("//b.gni")\na_value = b_value\n')
+        write(tmp_path / "b.gni", 'b_value = "old"\n')
+        write(tmp_path / "c.gni", 'c_value = "c"\n')
+        resolver = ImportResolver(tmp_path)
+        a, b, c = (resolver.resolve(f"//{name}.gni") for name in "abc")
+        resolver.load(a)
+        resolver.load(c)
+
+        write(b, 'b_value = "new value"\n')
+        resolver.refresh()
+        assert resolver.load(a).scope["a_value"] == "new value"
+        resolver.load(c)
+
+        assert resolver.evaluations == {a: 2, b: 2, c: 1}
+
+    def test_import_cycle(self, tmp_path: Path) -> None:
+        """Test that import cycles are reported."""
+        write(tmp_path / "a.gni", 'import("//b.gni")\n')
+        write(tmp_path / "b.gni", 'import("//a.gni")\n')
+        with pytest.raises(ParseError, match="Import cycle"):
+            GNParser(source_root=tmp_path).parse('import("//a.gni")\n')
+
+    def test_missing_import(self, tmp_path: Path) -> None:
+        """Test that a missing .gni raises ParseError."""
+        with pytest.raises(ParseError, match="Cannot import"):
+            GNParser(source_root=tmp_path).parse('import("//missing.gni")\n')
+
+    def test_cache_tracks_imported_files(self, tmp_path: Path) -> None:
+        """Test that cached results are invalidated when an imported .gni changes."""
+        self.make_tree(tmp_path)
+        build = write(tmp_path / "BUILD.gn", self.build_file)
+        cache = ParseCache(tmp_path / "cache")
+
+        GNParser(cache=cache, source_root=tmp_path).parse_file(build)
+        GNParser(cache=cache, source_root=tmp_path).parse_file(build)
+        assert cache.stats.hits == 1
+
+        write(tmp_path / "build" / "features.gni", 'common_sources = [ "changed.cc" ]\n')
+        targets = GNParser(cache=cache, source_root=tmp_path).parse_file(build)
+        assert cache.stats.misses == 2
+        assert targets[0].sources == ["changed.cc"]
+
+    def test_cache_keys_by_directory(self, tmp_path: Path) -> None:
+        """Test that identical files in different directories do not share entries."""
+        content = 'import("v.gni")\nsource_set("s") { sources = files }\n'
+        for name in ("a", "b"):
+            write(tmp_path / name / "BUILD.gn", content)
+            write(tmp_path / name / "v.gni", f'files = [ "from{name.upper()}.cc" ]\n')
+        cache = ParseCache(tmp_path / "cache")
+        parser = GNParser(cache=cache, source_root=tmp_path)
+        assert parser.parse_file(tmp_path / "a" / "BUILD.gn")[0].sources == ["fromA.cc"]
+        assert parser.parse_file(tmp_path / "b" / "BUILD.gn")[0].sources == ["fromB.cc"]
+        (streamed,) = parser.iter_parse(tmp_path / "b" / "BUILD.gn")
+        assert streamed.sources == ["fromB.cc"]
+        assert cache.stats.hits == 1
@@ -0,0 +1,325 @@
+"""Tests for the GN tokenizer and recursive-descent parser."""
+import time
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import GNParser, ParseError
+from gncmake_bridge.parser.gn_ast import (
+    Assignment,
+    BinaryOp,
+    Block,
+    Condition,
+    FunctionCall,
+    ListLiteral,
+    StringLiteral,
+    UnaryOp,
+    parse_gn_ast,
+    parse_gn_expression,
+)
+from gncmake_bridge.parser.gn_lexer import TokenType, scan_string_list, tokenize
+from gncmake_bridge.parser.gn_parser import parse_list, scan_list
+
+
+class TestGNLexer:
+    """Tests for GN tokenization."""
+
+    def test_token_offsets(self) -> None:
+        """Test that tokens carry offsets into the source."""
+        source = 'sources += [ "a.cc" ]'
+        tokens = tokenize(source)
+        assert [t.type for t in tokens] == [
+            TokenType.IDENTIFIER,
+            TokenType.OPERATOR,
+            TokenType.LEFT_BRACKET,
+            TokenType.STRING,
+            TokenType.RIGHT_BRACKET,
+            TokenType.EOF,
+        ]
+        string = tokens[3]
+        assert string.value == "a.cc"
+        assert source[string.start : string.end] == '"a.cc"'
+
+    def test_comments_are_skipped(self) -> None:
+        """Test that comments produce no tokens."""
+        tokens = tokenize("# comment\nx = 1  # trailing\n")
+        assert [t.value for t in tokens[:-1]] == ["x", "=", "1"]
+
+    def test_unterminated_string(self) -> None:
+        """Test that an unterminated string reports its position."""
+        with pytest.raises(ParseError) as excinfo:
+            tokenize('x = "abc')
+        assert excinfo.value.line == 1
+        assert excinfo.value.column == 5
+
+
+class TestGNSyntaxParser:
+    """Tests for the GN syntax tree."""
+
+    def test_parse_call_with_block(self) -> None:
+        """Test parsing a target call with a block."""
+        tree = parse_gn_ast('executable("app") {\n  sources = ["main.cc"]\n}\n')
+        assert len(tree.statements) == 1
+        call = tree.statements[0]
+        assert isinstance(call, FunctionCall)
+        assert call.name == "executable"
+        assert call.block is not None
+        assignment = call.block.statements[0]
+        assert isinstance(assignment, Assignment)
+        assert isinstance(assignment.value, ListLiteral)
+
+    def test_parse_else_if_chain(self) -> None:
+        """Test parsing an if/else if/else chain."""
+        tree = parse_gn_ast("if (a) { x = 1 } else if (b) { x = 2 } else { x = 3 }")
+        condition = tree.statements[0]
+        assert isinstance(condition, Condition)
+        assert isinstance(condition.else_block, Condition)
+        assert condition.else_block.else_block is not None
+
+    def test_expression_precedence(self) -> None:
+        """Test that && binds tighter than ||."""
+        expr = parse_gn_expression('a || b && !c == "x"')
+        assert isinstance(expr, BinaryOp)
+        assert expr.op == "||"
+        assert isinstance(expr.right, BinaryOp)
+        assert expr.right.op == "&&"
+        assert isinstance(expr.right.right, BinaryOp)
+        assert isinstance(expr.right.right.left, UnaryOp)
+        assert isinstance(expr.right.right.right, StringLiteral)
+
+    def test_syntax_error_reports_line(self) -> None:
+        """Test that syntax errors carry line information."""
+        with pytest.raises(ParseError) as excinfo:
+            parse_gn_ast('executable("app") {\n  sources = [\n}\n')
+        assert excinfo.value.line == 3
+
+
+class TestGNParserSyntax:
+    """Tests for target extraction built on the syntax tree."""
+
+    def setup_method(self) -> None:
+        self.parser = GNParser()
+
+    def test_one_line_target_bodies(self) -> None:
+        """Test targets whose whole body sits on one line."""
+        targets = self.parser.parse(
+            'static_library("a") { sources = ["a.cc"] deps = [":b"] }\n'
+            'source_set("b") { sources = ["b.cc"] }\n'
+        )
+        assert [t.name for t in targets] == ["a", "b"]
+        assert targets[0].deps == [":b"]
+
+    def test_braces_inside_strings(self) -> None:
+        """Test that braces in strings do not affect block structure."""
+        targets = self.parser.parse(
+            'executable("app") {\n  defines = [ "OPEN={", "CLOSE=}" ]\n}\n'
+            'group("after") { }\n'
+        )
+        assert len(targets) == 2
+        assert targets[0].defines == ["OPEN={", "CLOSE=}"]
+
+    def test_variables_and_interpolation(self) -> None:
+        """Test that file-level variables are resolved in target bodies."""
+        targets = self.parser.parse(
+            'common_sources = [ "a.cc", "b.cc" ]\n'
+            'prefix = "base"\n'
+            'static_library("${prefix}_lib") {\n'
+            '  sources = common_sources + [ "c.cc" ]\n'
+            "}\n"
+        )
+        assert targets[0].name == "base_lib"
+        assert targets[0].sources == ["a.cc", "b.cc", "c.cc"]
+
+    def test_else_branch_condition(self) -> None:
+        """Test that an else branch is captured under the negated condition."""
+        targets = self.parser.parse(
+            'executable("app") {\n'
+            '  if (is_win) { sources = [ "win.cc" ] } else { sources = [ "posix.cc" ] }\n'
+            "}\n"
+        )
+        conditions = targets[0].conditions
+        assert [c.condition for c in conditions] == ["is_win", "!is_win"]
+        assert conditions[1].properties["sources"] == ["posix.cc"]
+
+
+class TestListScanning:
+    """Tests for offset-based scanning of GN list literals."""
+
+    def test_element_spans(self) -> None:
+        """Test that each list element keeps its source span."""
+        source = 'x = [ "a.cc",\n  "b.cc",  # comment\n]\n'
+        strings, end = scan_string_list(source, source.index("["))
+        assert [t.value for t in strings] == ["a.cc", "b.cc"]
+        assert [source[t.start : t.end] for t in strings] == ['"a.cc"', '"b.cc"']
+        assert source[end - 1] == "]"
+
+    def test_mixed_list_falls_back(self) -> None:
+        """Test that lists with non-string elements are left to the parser."""
+        source = 'x = [ "a.cc", other ]'
+        assert scan_string_list(source, source.index("[")) is None
+        tree = parse_gn_ast(source)
+        assignment = tree.statements[0]
+        assert isinstance(assignment, Assignment)
+        assert isinstance(assignment.value, ListLiteral)
+        assert len(assignment.value.items) == 2
+
+    def test_escapes(self) -> None:
+        """Test that GN escapes are resolved and brackets in strings are kept."""
+        items = scan_list(r'[ "quote\"d", "back\\slash", "\$dollar", "a]b" ]')
+        assert [item.value for item in items] == ['quote"d', "back\\slash", "$dollar", "a]b"]
+        assert parse_list('[ "x", "", "y" ]') == ["x", "y"]
+
+    def test_linear_scaling(self) -> None:
+        """Test that parsing a 100k-element sources list scales linearly."""
+
+        def best_parse_time(count: int) -> float:
+            body = "".join(f'    "gen/file_{i}.cc",\n' for i in range(count))
+            content = f'source_set("big") {{\n  sources = [\n{body}  ]\n}}\n'
+            best = float("inf")
+            for _ in range(2):
+                start = time.perf_counter()
+                targets = GNParser().parse(content)
+                best = min(best, time.perf_counter() - start)
+            assert len(targets[0].sources) == count
+            return best
+
+        small = best_parse_time(10_000)
+        large = best_parse_time(100_000)
+        # 10x the input should cost about 10x the time; quadratic growth
+        # would be 100x.
+        assert large < small * 25
+
+
+class TestIterParse:
+    """Tests for streaming GNParser.iter_parse."""
+
+    CONTENT = """
+# Généré automatiquement
+base = [ "a.cc" ]
+static_library("lib") {
+  sources = base
+  if (target_os == "linux") { defines = [ "LINUX" ] }
+}
+executable("app") { deps = [ ":lib" ] }
+"""
+
+    def test_matches_parse_file(self, tmp_path: Path) -> None:
+        """Test that streaming yields the same targets as parse_file."""
+        path = tmp_path / "BUILD.gn"
+        path.write_text(self.CONTENT, encoding="utf-8")
+        parser = GNParser()
+        streamed = list(parser.iter_parse(path))
+        assert streamed == parser.parse_file(path)
+        assert streamed[0].conditions[0].condition == 'target_os == "linux"'
+
+    def test_yields_before_end_of_file(self, tmp_path: Path) -> None:
+        """Test that targets are yielded before the rest of the file is parsed."""
+        path = tmp_path / "BUILD.gn"
+        path.write_text(self.CONTENT + "broken(\n", encoding="utf-8")
+        targets = GNParser().iter_parse(path)
+        assert next(targets).name == "lib"
+        assert next(targets).name == "app"
+        with pytest.raises(ParseError):
+            next(targets)
+
+    def test_early_close(self, tmp_path: Path) -> None:
+        """Test that abandoning the iterator releases the mapped file."""
+        path = tmp_path / "BUILD.gn"
+        path.write_text(self.CONTENT, encoding="utf-8")
+        targets = GNParser().iter_parse(path)
+        assert next(targets).name == "lib"
+        targets.close()
+
+    def test_non_ascii_error(self, tmp_path: Path) -> None:
+        """Test that a non-ASCII character outside a string is a ParseError, as in parse_file."""
+        path = tmp_path / "BUILD.gn"
+        path.write_text('group("a") { }\nx = 1 \u00e9\n', encoding="utf-8")
+        with pytest.raises(ParseError) as parsed:
+            GNParser().parse_file(path)
+        with pytest.raises(ParseError, match="Unexpected character '\u00e9'") as streamed:
+            list(GNParser().iter_parse(path))
+        assert streamed.value.line == parsed.value.line == 2
+
+    def test_error_column_after_non_ascii(self, tmp_path: Path) -> None:
+        """Test that columns in mapped files count characters, not bytes."""
+        path = tmp_path / "BUILD.gn"
+        path.write_text('group("a") { }\nx = "\u00e9\u00e9" @\n', encoding="utf-8")
+        with pytest.raises(ParseError) as parsed:
+            GNParser().parse_file(path)
+        with pytest.raises(ParseError) as streamed:
+            list(GNParser().iter_parse(path))
+        assert (streamed.value.line, streamed.value.column) == (2, 10)
+        assert streamed.value.column == parsed.value.column
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty file yields nothing."""
+        path = tmp_path / "BUILD.gn"
+        path.write_text("")
+        assert list(GNParser().iter_parse(path)) == []
+
+
+class TestLarkBackend:
+    """Tests for the Lark LALR backend."""
+
+    SOURCE = '''
+base = [ "a.cc" ]
+static_library("lib") {
+  sources = base + [ "b.cc" ]
+  if (is_linux && target_cpu == "x64") {
+    defines = [ "X64" ]
+  } else if (!is_debug) {
+    cflags = [ "-O2" ]
+  }
+}
+executable("app") { deps = [ ":lib" ] }
+'''
+
+    def test_same_syntax_tree_as_native(self) -> None:
+        """Test that both backends build identical syntax trees."""
+        from gncmake_bridge.parser.gn_lark import parse_gn_ast_lark
+
+        assert parse_gn_ast_lark(self.SOURCE) == parse_gn_ast(self.SOURCE)
+
+    def test_same_targets_as_native(self) -> None:
+        """Test that GNParser(backend="lark") produces the same targets."""
+        assert GNParser(backend="lark").parse(self.SOURCE) == GNParser().parse(self.SOURCE)
+
+    def test_iter_parse_uses_backend(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that iter_parse parses with the Lark backend when it is selected."""
+        from gncmake_bridge.parser import gn_lark
+
+        calls = []
+        parse = gn_lark.parse_gn_ast_lark
+
+        def spy(content: str) -> Block:
+            calls.append(content)
+            return parse(content)
+
+        monkeypatch.setattr(gn_lark, "parse_gn_ast_lark", spy)
+        path = tmp_path / "BUILD.gn"
+        path.write_text(self.SOURCE, encoding="utf-8")
+        assert list(GNParser(backend="lark").iter_parse(path)) == GNParser().parse(self.SOURCE)
+        assert calls == [self.SOURCE]
+
+    def test_cached_table(self, tmp_path: Path) -> None:
+        """Test that the compiled table is written to and reused from disk."""
+        from gncmake_bridge.parser.gn_lark import get_lark_parser
+
+        cache_file = str(tmp_path / "gn.lalr")
+        get_lark_parser(cache_file)
+        assert (tmp_path / "gn.lalr").stat().st_size > 0
+        get_lark_parser.cache_clear()
+        parser = get_lark_parser(cache_file)
+        assert parser.parse('x = [ "y" ]').statements
+
+    def test_syntax_error(self) -> None:
+        """Test that Lark errors surface as ParseError."""
+        with pytest.raises(ParseError):
+            GNParser(backend="lark").parse('executable("app") {\n  sources = [\n}\n')
+
+    def test_unknown_backend(self) -> None:
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            GNParser(backend="yacc")
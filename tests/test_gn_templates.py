@@ -0,0 +1,116 @@
+"""Tests for GN template expansion."""
+from pathlib import Path
+
+from gncmake_bridge import GNParser
+from gncmake_bridge.ir import TargetType
+from gncmake_bridge.parser import ImportResolver
+
+COMPONENT_GNI = """
+template("component") {
+  _kind = "static_library"
+  if (is_component_build) {
+    _kind = "shared_library"
+  }
+  target(_kind, target_name) {
+    forward_variables_from(invoker, "*", [ "extra_deps" ])
+    if (defined(invoker.extra_deps)) {
+      deps = invoker.extra_deps
+    }
+  }
+}
+
+template("test") {
+  executable(target_name) {
+    testonly = true
+    forward_variables_from(invoker, [ "sources", "deps" ])
+  }
+}
+"""
+
+
+class TestTemplates:
+    """Tests for template definition and invocation."""
+
+    def setup_method(self) -> None:
+        self.parser = GNParser(args={"is_component_build": False})
+
+    def test_invocation_binds_target_name_and_invoker(self) -> None:
+        """Test that a template body sees target_name and invoker."""
+        targets = self.parser.parse(
+            COMPONENT_GNI
+            + 'component("base") {\n'
+            + '  sources = [ "base.cc" ]\n'
+            + '  extra_deps = [ ":alloc" ]\n'
+            + "}\n"
+        )
+        assert len(targets) == 1
+        base = targets[0]
+        assert base.name == "base"
+        assert base.type == TargetType.STATIC_LIBRARY
+        assert base.sources == ["base.cc"]
+        assert base.deps == [":alloc"]
+        assert base.conditions == []
+
+    def test_args_select_target_type(self) -> None:
+        """Test that build arguments are visible inside template bodies."""
+        parser = GNParser(args={"is_component_build": True})
+        targets = parser.parse(COMPONENT_GNI + 'component("base") { }\n')
+        assert targets[0].type == TargetType.SHARED_LIBRARY
+
+    def test_template_wrapping_builtin(self) -> None:
+        """Test that a template may wrap the built-in function of the same name."""
+        targets = self.parser.parse(
+            'template("executable") {\n'
+            "  executable(target_name) {\n"
+            '    forward_variables_from(invoker, "*")\n'
+            '    defines = [ "WRAPPED" ]\n'
+            "  }\n"
+            "}\n"
+            'executable("app") { sources = [ "main.cc" ] }\n'
+        )
+        assert [(t.name, t.sources, t.defines) for t in targets] == [
+            ("app", ["main.cc"], ["WRAPPED"])
+        ]
+
+    def test_invocation_statistics(self) -> None:
+        """Test that invocation counts and expansion times are recorded."""
+        calls = "".join(f'test("t{i}") {{ sources = [ "t{i}.cc" ] }}\n' for i in range(5))
+        targets = self.parser.parse(COMPONENT_GNI + calls)
+        assert [t.name for t in targets] == [f"t{i}" for i in range(5)]
+        assert all(t.testonly for t in targets)
+
+        (test,) = self.parser.templates
+        assert test.name == "test"
+        assert test.invocation_count == 5
+        assert test.expansion_seconds > 0
+        assert test.variables == ["sources", "deps"]
+        assert "test" in self.parser.template_stats()
+
+    def test_shared_template_from_import(self, tmp_path: Path) -> None:
+        """Test that a template from a .gni is compiled once for all importers."""
+        (tmp_path / "build").mkdir()
+        (tmp_path / "build" / "component.gni").write_text(COMPONENT_GNI)
+        resolver = ImportResolver(tmp_path)
+        content = 'import("//build/component.gni")\ncomponent("{name}") {{ }}\n'
+
+        for name in ("a", "b", "c"):
+            parser = GNParser(imports=resolver, args={"is_component_build": False})
+            assert [t.name for t in parser.parse(content.format(name=name))] == [name]
+
+        module = resolver.load(tmp_path / "build" / "component.gni", {"is_component_build": False})
+        assert resolver.evaluations[module.path] == 1
+        assert module.templates["component"].info.invocation_count == 3
+
+    def test_nested_private_template(self) -> None:
+        """Test that templates invoked from other templates are expanded and counted."""
+        parser = GNParser()
+        targets = parser.parse(
+            'template("_impl") { source_set(target_name) { sources = invoker.sources } }\n'
+            'template("wrapper") {\n'
+            '  _impl(target_name) { sources = invoker.sources + [ "extra.cc" ] }\n'
+            "}\n"
+            'wrapper("w") { sources = [ "w.cc" ] }\n'
+        )
+        assert targets[0].sources == ["w.cc", "extra.cc"]
+        counts = {t.name: t.invocation_count for t in parser.templates}
+        assert counts == {"_impl": 1, "wrapper": 1}
@@ -0,0 +1,91 @@
+"""Tests for canonical, interned labels."""
+import pickle
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import (
+    CMakeGenerator,
+    CMakeParser,
+    GNGenerator,
+    GNParser,
+    Label,
+    ParseError,
+    Target,
+    TargetType,
+)
+
+
+class TestLabel:
+    """Tests for Label."""
+
+    def test_canonical_forms(self) -> None:
+        """Test that every way of writing a label gives the same label."""
+        util = Label.parse("//base/util:util")
+        assert Label.parse(":util", "//base/util") is util
+        assert Label.parse("util", "//base/util") is util
+        assert Label.parse("//base/util") is util
+        assert Label.parse("../util:util", "//base/net") is util
+        assert Label.parse("util", "//base") is Label.parse("//base:util")
+        assert Label.parse("//base/./net/../util") is util
+        assert Label.parse("//:all") is Label.get("//", "all")
+        assert (util.directory, util.name, util.toolchain) == ("//base/util", "util", None)
+
+    def test_toolchains(self) -> None:
+        """Test that toolchain-qualified labels are distinct from unqualified ones."""
+        arm = Label.parse("//build/toolchain:arm64")
+        label = Label.parse("//base(//build/toolchain:arm64)")
+        assert label.toolchain is arm and label is not Label.parse("//base")
+        assert str(label) == "//base:base(//build/toolchain:arm64)"
+        assert Label.parse(":base", "//base", current_toolchain=arm) is label
+        assert label.relative_to("//base", arm) == ":base"
+        assert label.relative_to("//base") == str(label)
+        assert Label.parse("//base").relative_to("//app") == "//base:base"
+
+    def test_invalid(self) -> None:
+        """Test that malformed labels raise ParseError."""
+        for text in ("//", "//a:b/c", "../x:y", ""):
+            with pytest.raises(ParseError):
+                Label.parse(text)
+
+    def test_interning(self) -> None:
+        """Test that labels are numbered, compare as strings and survive pickling."""
+        label = Label.parse("//net:net")
+        assert Label.from_id(label.id) is label
+        assert Label.parse("//net").id == label.id
+        assert label == "//net:net" and label != "//net"
+        assert {label: 1}["//net:net"] == 1
+        assert pickle.loads(pickle.dumps(label)) is label
+        with pytest.raises(TypeError):
+            Label()
+
+    def test_parsers_key_by_label(self, tmp_path: Path) -> None:
+        """Test that tree and project parsing key their results by Label."""
+        (tmp_path / "base").mkdir()
+        (tmp_path / "BUILD.gn").write_text('group("all") { deps = [ "//base" ] }\n')
+        (tmp_path / "base/BUILD.gn").write_text('source_set("base") { }\n')
+        targets = GNParser(source_root=tmp_path).parse_tree(tmp_path, jobs=1)
+        assert all(isinstance(label, Label) for label in targets)
+        assert Label.parse(targets["//:all"].deps[0]) in targets
+
+        (tmp_path / "CMakeLists.txt").write_text("add_subdirectory(base)\n")
+        (tmp_path / "base/CMakeLists.txt").write_text("add_library(base base.cc)\n")
+        project = CMakeParser().parse_project(tmp_path / "CMakeLists.txt", jobs=1)
+        assert list(project) == [Label.parse("//base")]
+
+    def test_generated_deps(self) -> None:
+        """Test that generators write labels and bare names as each build system expects."""
+        target = Target(
+            name="app",
+            type=TargetType.EXECUTABLE,
+            deps=["util", ":log", "//base", "//third_party/zlib:zlib"],
+            public_deps=["Threads::Threads"],
+        )
+        gn = GNGenerator().generate(target)
+        for dep in ('":util"', '":log"', '"//base"', '"//third_party/zlib:zlib"'):
+            assert f"    {dep}," in gn
+        assert '"::log"' not in gn
+        cmake = CMakeGenerator().generate(target)
+        assert cmake.endswith(
+            "target_link_libraries(app\n  Threads::Threads\n  util\n  log\n  base\n  zlib\n)"
+        )
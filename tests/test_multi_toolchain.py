@@ -0,0 +1,204 @@
+"""Tests for targets built for several toolchains."""
+from dataclasses import replace
+
+import pytest
+
+from gncmake_bridge import (
+    CMakeGenerator,
+    ConversionError,
+    GNGenerator,
+    MultiToolchainTarget,
+    Target,
+    TargetType,
+    Toolchain,
+)
+from gncmake_bridge.generator.cmake_generator import cmake_condition
+from gncmake_bridge.ir import ToolchainDelta, merge_toolchain_targets
+from gncmake_bridge.parser.gn_conditions import ConfigMatrix
+
+
+def make_variants() -> list[tuple[Toolchain, Target]]:
+    """The same library as built by a host, an arm64 and an x86_64 toolchain."""
+    base = Target(
+        name="core",
+        type=TargetType.STATIC_LIBRARY,
+        sources=["core.cc", "simd_sse.cc", "util.cc"],
+        compile_flags=["-Wall", "-O2"],
+        deps=["base"],
+    )
+    arm64 = replace(
+        base,
+        sources=["core.cc", "util.cc", "simd_neon.cc"],
+        compile_flags=["-Wall", "-O2", "-march=armv8-a"],
+        output_name="core_arm64",
+    )
+    return [
+        (Toolchain(name="host"), base),
+        (Toolchain(name="arm64"), arm64),
+        (Toolchain(name="//build/toolchain:x86_64"), replace(base)),
+    ]
+
+
+class TestMultiToolchainTarget:
+    """Tests for factoring per-toolchain targets into a base and deltas."""
+
+    def setup_method(self) -> None:
+        self.variants = make_variants()
+        self.target = MultiToolchainTarget.from_targets(self.variants)
+
+    def test_base_and_deltas(self) -> None:
+        """Test that the base holds what most toolchains share."""
+        assert self.target.base.sources == ["core.cc", "simd_sse.cc", "util.cc"]
+        assert self.target.base.output_name is None
+        assert list(self.target.deltas) == ["arm64"]
+        delta = self.target.deltas["arm64"]
+        assert delta.additions == {
+            "sources": ["simd_neon.cc"],
+            "compile_flags": ["-march=armv8-a"],
+        }
+        assert delta.removals == {"sources": ["simd_sse.cc"]}
+        assert delta.overrides == {"output_name": "core_arm64"}
+
+    def test_target_for_round_trips(self) -> None:
+        """Test that each toolchain's target is rebuilt exactly from base and delta."""
+        for toolchain, target in self.variants:
+            assert self.target.target_for(toolchain.name) == target
+        with pytest.raises(KeyError):
+            self.target.target_for("riscv64")
+
+    def test_unreproducible_order(self) -> None:
+        """Test that lists whose order differs are carried whole by the deltas."""
+        host = Target(name="a", type=TargetType.EXECUTABLE, link_flags=["-la", "-lb"])
+        arm64 = replace(host, link_flags=["-lb", "-la"])
+        target = MultiToolchainTarget.from_targets(
+            [(Toolchain(name="host"), host), (Toolchain(name="arm64"), arm64)]
+        )
+        assert target.base.link_flags == []
+        assert target.target_for("host") == host
+        assert target.target_for("arm64") == arm64
+
+    def test_unset_scalar_is_base(self) -> None:
+        """Test that an unset scalar goes to the base, so no delta has to unset it."""
+        host = Target(name="a", type=TargetType.EXECUTABLE, output_name="a_host")
+        arm64 = replace(host, output_name=None)
+        target = MultiToolchainTarget.from_targets(
+            [
+                (Toolchain(name="host"), host),
+                (Toolchain(name="arm64"), host),
+                (Toolchain(name="x86_64"), arm64),
+            ]
+        )
+        assert target.base.output_name is None
+        assert target.deltas["host"].overrides == {"output_name": "a_host"}
+        assert target.target_for("x86_64") == arm64
+        with pytest.raises(ConversionError, match="unsetting output_name"):
+            ToolchainDelta(overrides={"output_name": None}).to_condition("is_linux")
+
+    def test_mismatched_type(self) -> None:
+        """Test that variants of different types cannot be merged."""
+        host = Target(name="a", type=TargetType.EXECUTABLE)
+        arm64 = Target(name="a", type=TargetType.SHARED_LIBRARY)
+        with pytest.raises(ConversionError, match="for toolchain 'arm64'"):
+            MultiToolchainTarget.from_targets(
+                [(Toolchain(name="host"), host), (Toolchain(name="arm64"), arm64)]
+            )
+
+    def test_conditions_match_config_matrix(self) -> None:
+        """Test that the toolchain blocks resolve to each toolchain's target."""
+        matrix = ConfigMatrix(
+            {
+                toolchain.name: {"current_toolchain": toolchain.label()}
+                for toolchain, _ in self.variants
+            }
+        )
+        resolved = matrix.resolve(self.target.to_target())
+        for toolchain, target in self.variants:
+            assert resolved[toolchain.name] == target
+
+    def test_merge_builds(self) -> None:
+        """Test that builds are merged by label and missing targets recorded."""
+        host, arm64 = Toolchain(name="host"), Toolchain(name="arm64")
+        tool = Target(name="protoc", type=TargetType.EXECUTABLE, sources=["main.cc"])
+        lib = Target(name="lib", type=TargetType.STATIC_LIBRARY)
+        merged = merge_toolchain_targets(
+            [(host, {"//:protoc": tool, "//:lib": lib}), (arm64, {"//:lib": lib})]
+        )
+        assert list(merged) == ["//:protoc", "//:lib"]
+        assert merged["//:protoc"].absent == [arm64]
+        assert merged["//:lib"].absent == []
+        assert merged["//:lib"].deltas == {}
+
+
+class TestMultiToolchainGenerators:
+    """Tests for generating multi-toolchain targets once with conditional deltas."""
+
+    def setup_method(self) -> None:
+        self.variants = make_variants()
+        self.target = MultiToolchainTarget.from_targets(self.variants)
+
+    def test_gn_output(self) -> None:
+        """Test that GN output has the common part once and a block per delta."""
+        generator = GNGenerator()
+        result = generator.generate(self.target)
+        assert result.count('static_library("core")') == 1
+        assert result.count('"util.cc"') == 1
+        assert 'if (current_toolchain == "//build/toolchain:arm64") {' in result
+        assert '    sources -= [\n      "simd_sse.cc",\n    ]' in result
+        assert '    cflags += [\n      "-march=armv8-a",\n    ]' in result
+        assert '    output_name = "core_arm64"' in result
+        separate = sum(len(generator.generate(target)) for _, target in self.variants)
+        assert len(result) < separate * 3 / 4
+
+    def test_gn_declares_conditional_lists(self) -> None:
+        """Test that lists only toolchain blocks add to are declared first."""
+        host = Target(name="a", type=TargetType.EXECUTABLE, sources=["a.cc"])
+        arm64 = replace(host, defines=["ARM"])
+        target = MultiToolchainTarget.from_targets(
+            [(Toolchain(name="host"), host), (Toolchain(name="arm64"), arm64)]
+        )
+        result = GNGenerator().generate(target)
+        assert result.index("  defines = []") < result.index("    defines += [")
+
+    def test_gn_absent_toolchains(self) -> None:
+        """Test that a target not built by every toolchain is wrapped in a condition."""
+        host, arm64 = Toolchain(name="host"), Toolchain(name="arm64")
+        tool = Target(name="protoc", type=TargetType.EXECUTABLE, sources=["main.cc"])
+        merged = merge_toolchain_targets([(host, {"//:protoc": tool}), (arm64, {})])
+        result = GNGenerator().generate(merged["//:protoc"])
+        assert result.startswith('if (current_toolchain == "//build/toolchain:host") {\n')
+        assert '  executable("protoc") {' in result
+
+    def test_cmake_output(self) -> None:
+        """Test that CMake output guards each delta with an if() block."""
+        result = CMakeGenerator().generate(self.target)
+        assert result.count("add_library(core STATIC") == 1
+        assert result.startswith(
+            'set(current_toolchain "//build/toolchain:host" CACHE STRING '
+            '"GN toolchain to build for")\n'
+            "set_property(CACHE current_toolchain PROPERTY STRINGS "
+            '"//build/toolchain:host;//build/toolchain:arm64;//build/toolchain:x86_64")\n'
+        )
+        assert 'if(current_toolchain STREQUAL "//build/toolchain:arm64")' in result
+        assert "  target_sources(core PRIVATE simd_neon.cc)" in result
+        assert "  target_compile_options(core PRIVATE -march=armv8-a)" in result
+        assert "  list(REMOVE_ITEM _values simd_sse.cc)" in result
+        assert '  set_target_properties(core PROPERTIES OUTPUT_NAME "core_arm64")' in result
+        assert result.endswith("endif()")
+
+    def test_cmake_absent_toolchains(self) -> None:
+        """Test that the toolchain option lists toolchains that do not build the target."""
+        host, arm64 = Toolchain(name="host"), Toolchain(name="arm64")
+        tool = Target(name="protoc", type=TargetType.EXECUTABLE, sources=["main.cc"])
+        merged = merge_toolchain_targets([(host, {"//:protoc": tool}), (arm64, {})])
+        result = CMakeGenerator().generate(merged["//:protoc"])
+        assert 'STRINGS "//build/toolchain:host;//build/toolchain:arm64")\n' in result
+        assert 'if(current_toolchain STREQUAL "//build/toolchain:host")\n' in result
+
+    def test_cmake_condition(self) -> None:
+        """Test translating GN conditions into CMake if() conditions."""
+        assert cmake_condition('is_linux && target_cpu != "arm"') == (
+            '(is_linux) AND (NOT (target_cpu STREQUAL "arm"))'
+        )
+        assert cmake_condition("!defined(x) || api_level >= 21") == (
+            "(NOT (DEFINED x)) OR (api_level GREATER_EQUAL 21)"
+        )
@@ -0,0 +1,77 @@
+"""Tests for whole-tree GN parsing."""
+from pathlib import Path
+
+import pytest
+
+from gncmake_bridge import Converter, GNParser, ParseError
+from gncmake_bridge.parser.gn_parser import discover_build_files
+
+
+def make_tree(root: Path) -> None:
+    """Create a small GN tree with a shared import."""
+    files = {
+        "BUILD.gn": 'group("all") { deps = [ "//base", "//app" ] }\n',
+        "build/common.gni": 'common_defines = [ "COMMON" ]\n',
+        "base/BUILD.gn": (
+            'import("//build/common.gni")\n'
+            'static_library("base") { sources = [ "base.cc" ] defines = common_defines }\n'
+        ),
+        "app/BUILD.gn": (
+            'executable("app") { sources = [ "main.cc" ] deps = [ "//base" ] }\n'
+            'source_set("app_lib") {\n'
+            + "".join(f'  sources += [ "gen/{i}.cc" ]\n' for i in range(50))
+            + "}\n"
+        ),
+        ".git/BUILD.gn": 'group("ignored") { }\n',
+    }
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+class TestParseTree:
+    """Tests for GNParser.parse_tree."""
+
+    def test_discovery(self, tmp_path: Path) -> None:
+        """Test that BUILD.gn files are found with their sizes, skipping hidden dirs."""
+        make_tree(tmp_path)
+        found = discover_build_files(tmp_path)
+        assert [p.relative_to(tmp_path).as_posix() for p, _ in found] == [
+            "BUILD.gn",
+            "app/BUILD.gn",
+            "base/BUILD.gn",
+        ]
+        assert all(size == p.stat().st_size for p, size in found)
+
+    def test_labels(self, tmp_path: Path) -> None:
+        """Test that the merged result is keyed by label."""
+        make_tree(tmp_path)
+        targets = GNParser(source_root=tmp_path).parse_tree(tmp_path, jobs=1)
+        assert list(targets) == ["//:all", "//app:app", "//app:app_lib", "//base:base"]
+        assert targets["//base:base"].defines == ["COMMON"]
+        assert len(targets["//app:app_lib"].sources) == 50
+
+    def test_process_pool_matches_serial(self, tmp_path: Path) -> None:
+        """Test that parsing in worker processes gives the same result."""
+        make_tree(tmp_path)
+        parser = GNParser(source_root=tmp_path)
+        assert parser.parse_tree(tmp_path, jobs=2) == parser.parse_tree(tmp_path, jobs=1)
+
+    def test_error_names_file(self, tmp_path: Path) -> None:
+        """Test that a syntax error reports the failing file."""
+        make_tree(tmp_path)
+        (tmp_path / "base" / "BUILD.gn").write_text('static_library("base") {\n')
+        with pytest.raises(ParseError, match="base"):
+            GNParser(source_root=tmp_path).parse_tree(tmp_path, jobs=2)
+
+    def test_convert_tree(self, tmp_path: Path) -> None:
+        """Test that a tree converts to mirrored CMakeLists.txt files."""
+        make_tree(tmp_path / "src")
+        output = tmp_path / "out"
+        count = Converter(source_root=tmp_path / "src").convert_tree(tmp_path / "src", output)
+        assert count == 4
+        root = (output / "CMakeLists.txt").read_text()
+        assert "add_subdirectory(app)" in root
+        assert "add_subdirectory(base)" in root
+        assert "add_library(base" in (output / "base" / "CMakeLists.txt").read_text()
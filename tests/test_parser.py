@@ -133,6 +133,19 @@ target_link_libraries(app PUBLIC lib1 PRIVATE lib2)
         assert "lib1" in targets[0].public_deps
         assert "lib2" in targets[0].private_deps
 
+    def test_link_libraries_keyword_applies_to_following_items(self) -> None:
+        cmake_content = """
+add_library(lib STATIC lib.cc)
+target_link_libraries(lib base
+  PUBLIC a b
+  PRIVATE c d
+  INTERFACE e f)
+"""
+        (target,) = self.parser.parse(cmake_content)
+        assert target.deps == ["base"]
+        assert target.public_deps == ["a", "b", "e", "f"]
+        assert target.private_deps == ["c", "d"]
+
     def test_parse_output_name(self) -> None:
         cmake_content = """
 add_executable(myapp main.cc)
@@ -142,3 +155,31 @@ set_target_properties(myapp PROPERTIES OUTPUT_NAME "final_app")
         targets = self.parser.parse(cmake_content)
         assert len(targets) == 1
         assert targets[0].output_name == "final_app"
+
+    def test_target_commands_apply_to_named_target(self) -> None:
+        cmake_content = """
+add_library(first STATIC first.cc)
+add_library(second STATIC second.cc)
+
+target_link_libraries(second PRIVATE base)
+target_compile_definitions(first PRIVATE FIRST)
+target_link_libraries(first PUBLIC second)
+"""
+        first, second = self.parser.parse(cmake_content)
+        assert first.public_deps == ["second"]
+        assert first.private_deps == []
+        assert first.defines == ["FIRST"]
+        assert second.private_deps == ["base"]
+        assert second.defines == []
+        assert "second" not in second.deps
+
+    def test_parse_many_targets(self) -> None:
+        count = 3000
+        cmake_content = "\n".join(
+            f"add_library(lib{i} STATIC lib{i}.cc)\n"
+            f"target_link_libraries(lib{i} PRIVATE dep{i})"
+            for i in range(count)
+        )
+        targets = self.parser.parse(cmake_content)
+        assert len(targets) == count
+        assert all(t.private_deps == [f"dep{i}"] for i, t in enumerate(targets))
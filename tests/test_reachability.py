@@ -0,0 +1,71 @@
+"""Tests for whole-graph reachability backends."""
+import random
+
+import pytest
+
+from gncmake_bridge import BuildGraph, Target, TargetType, UnsupportedFeatureError
+from gncmake_bridge.ir import Reachability
+from gncmake_bridge.ir.reachability import HAS_NUMPY
+
+
+def make_graph(count: int, seed: int, cycles: bool) -> BuildGraph:
+    """A random graph; without ``cycles`` every target depends on earlier ones only."""
+    rng = random.Random(seed)
+    targets = []
+    for i in range(count):
+        limit = count if cycles else i
+        deps = [f"t{rng.randrange(limit)}" for _ in range(rng.randint(0, 3))] if limit else []
+        public_deps = [f"t{rng.randrange(limit)}"] if limit and rng.random() < 0.3 else []
+        targets.append(
+            Target(name=f"t{i}", type=TargetType.GROUP, deps=deps, public_deps=public_deps)
+        )
+    return BuildGraph.from_targets(targets)
+
+
+class TestReachability:
+    """Tests for Reachability with the python backend and, if installed, NumPy."""
+
+    def setup_method(self) -> None:
+        self.graph = BuildGraph.from_targets(
+            [
+                Target(name="app", type=TargetType.EXECUTABLE, deps=["net"], data_deps=["gen"]),
+                Target(name="net", type=TargetType.STATIC_LIBRARY, public_deps=["base"]),
+                Target(name="base", type=TargetType.STATIC_LIBRARY, deps=["pthread"]),
+                Target(name="gen", type=TargetType.EXECUTABLE, deps=["base"]),
+            ]
+        )
+
+    def test_python_backend(self) -> None:
+        """Test link reachability, affected sets and all pairs without NumPy."""
+        reachability = Reachability(self.graph, backend="python")
+        assert reachability.reachable([0]) == [1, 2]
+        assert reachability.reachable([0, 3]) == [1, 2]
+        assert reachability.dependents([2]) == [0, 1, 3]
+        assert reachability.dependents([0]) == []
+        assert reachability.all_pairs() == [0b110, 0b100, 0, 0b100]
+        assert reachability.closure(1) == self.graph.closure(1, ("deps", "public_deps"))
+        with pytest.raises(UnsupportedFeatureError):
+            reachability.matrix()
+
+    def test_backend_selection(self) -> None:
+        """Test that NumPy is used when installed and the fallback is clean otherwise."""
+        assert Reachability(self.graph).backend == ("numpy" if HAS_NUMPY else "python")
+        if not HAS_NUMPY:
+            with pytest.raises(UnsupportedFeatureError, match="requires NumPy"):
+                Reachability(self.graph, backend="numpy")
+        with pytest.raises(ValueError):
+            Reachability(self.graph, backend="scipy")
+
+    @pytest.mark.parametrize("cycles", [False, True])
+    def test_numpy_matches_python(self, cycles: bool) -> None:
+        """Test that the NumPy backend gives the python backend's results."""
+        pytest.importorskip("numpy")
+        graph = make_graph(300, seed=1, cycles=cycles)
+        python = Reachability(graph, backend="python")
+        numpy = Reachability(graph, backend="numpy")
+        assert numpy.all_pairs() == python.all_pairs()
+        assert numpy.matrix().shape == (300, 5)
+        for nodes in ([0], [5, 150, 299], []):
+            assert numpy.reachable(nodes) == python.reachable(nodes)
+            assert numpy.dependents(nodes) == python.dependents(nodes)
+        assert numpy.closure(299) == python.closure(299)
@@ -0,0 +1,49 @@
+"""Tests for the Target IR."""
+import pickle
+import sys
+from dataclasses import fields, replace
+
+from gncmake_bridge import Target, TargetType
+
+
+class TestTarget:
+    """Tests for slotted targets with interned strings."""
+
+    def test_unset_fields_are_per_target(self) -> None:
+        """Test that each target gets its own empty lists and dict to change in place."""
+        first = Target(name="a", type=TargetType.GROUP)
+        second = Target(name="b", type=TargetType.GROUP)
+        first.sources.append("a.cc")
+        first.deps.extend(["b", "c"])
+        first.metadata["key"] = 1
+        second.deps += ["d"]
+        assert (first.sources, first.deps, first.metadata) == (["a.cc"], ["b", "c"], {"key": 1})
+        assert (second.sources, second.deps, second.metadata) == ([], ["d"], {})
+        assert first.headers is not first.sources
+        assert not hasattr(first, "__dict__")
+
+    def test_arguments_are_not_changed(self) -> None:
+        """Test that interning builds new lists instead of rewriting the caller's."""
+        flag = "".join(["-W", "all"])
+        flags = [flag]
+        target = Target(name="a", type=TargetType.GROUP, compile_flags=flags)
+        assert flags[0] is flag and target.compile_flags is not flags
+        target.compile_flags.append("-O2")
+        assert flags == ["-Wall"]
+
+    def test_strings_are_interned(self) -> None:
+        """Test that strings in list fields are stored once across targets."""
+        flag = "".join(["-W", "all"])
+        target = Target(name="a", type=TargetType.GROUP, compile_flags=[flag])
+        assert target.compile_flags[0] is sys.intern("-Wall")
+
+    def test_dataclass_api(self) -> None:
+        """Test that fields, replace, equality and pickling behave as for a dataclass."""
+        target = Target(name="a", type=TargetType.EXECUTABLE, sources=["a.cc"])
+        assert [f.name for f in fields(Target)][:3] == ["name", "type", "sources"]
+        changed = replace(target, output_name="b")
+        assert changed.output_name == "b" and changed.sources == ["a.cc"]
+        assert changed != target
+        loaded = pickle.loads(pickle.dumps(target))
+        assert loaded == target
+        assert loaded.sources[0] is sys.intern("a.cc")
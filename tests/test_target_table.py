@@ -0,0 +1,118 @@
+"""Tests for columnar target storage."""
+import time
+
+import pytest
+
+from gncmake_bridge import CMakeParser, GNGenerator, Target, TargetType
+from gncmake_bridge.ir import ConditionBlock, TargetTable
+
+
+def make_targets() -> dict[str, Target]:
+    """A few targets with shared strings, empty lists and sparse fields."""
+    return {
+        "//base:base": Target(
+            name="base",
+            type=TargetType.STATIC_LIBRARY,
+            sources=["base.cc"],
+            compile_flags=["-Wall", "-O2"],
+        ),
+        "//app:app": Target(
+            name="app",
+            type=TargetType.EXECUTABLE,
+            sources=["main.cc", "util.cc"],
+            deps=["//base:base"],
+            compile_flags=["-Wall"],
+            link_flags=["-O2"],
+            output_name="app_bin",
+            testonly=True,
+            conditions=[ConditionBlock("is_linux", {"defines": ["LINUX"]})],
+        ),
+        "//tools:gen": Target(
+            name="gen",
+            type=TargetType.ACTION,
+            public_deps=["//base:base"],
+            script="gen.py",
+            metadata={"kind": ["tool"]},
+        ),
+    }
+
+
+class TestTargetTable:
+    """Tests for TargetTable and its views."""
+
+    def setup_method(self) -> None:
+        self.targets = make_targets()
+        self.table = TargetTable.from_targets(self.targets)
+
+    def test_round_trip(self) -> None:
+        """Test that every row copies back into the target it was built from."""
+        assert len(self.table) == 3
+        assert self.table.targets() == list(self.targets.values())
+        assert [view.label for view in self.table] == list(self.targets)
+        assert self.table.index("//tools:gen") == 2
+        with pytest.raises(KeyError):
+            self.table.index("//missing:missing")
+
+    def test_strings_stored_once(self) -> None:
+        """Test that repeated strings share one string table entry."""
+        assert self.table.strings.count("-Wall") == 1
+        assert self.table.strings.count("//base:base") == 1
+        assert list(self.table.ids["compile_flags"]) == [
+            self.table.string_id("-Wall"),
+            self.table.string_id("-O2"),
+            self.table.string_id("-Wall"),
+        ]
+        assert list(self.table.offsets["compile_flags"]) == [0, 2, 3, 3]
+
+    def test_views_present_as_targets(self) -> None:
+        """Test that views have Target's fields and generate the same output."""
+        app = self.table[1]
+        assert app.name == "app" and app.type is TargetType.EXECUTABLE
+        assert app.sources == ["main.cc", "util.cc"]
+        assert app.sources[-1] == "util.cc" and len(app.sources) == 2
+        assert app.headers == [] and not app.headers
+        assert (app.output_name, app.script, app.testonly) == ("app_bin", None, True)
+        assert app.is_binary() and not app.is_library()
+        generator = GNGenerator()
+        for view, target in zip(self.table, self.targets.values()):
+            assert generator.generate(view) == generator.generate(target)  # type: ignore[arg-type]
+
+    def test_filters(self) -> None:
+        """Test finding targets by flag and by dependency."""
+        assert list(self.table.with_flag("-Wall")) == [0, 1]
+        assert list(self.table.with_flag("-O2")) == [0, 1]
+        assert list(self.table.with_flag("-Werror")) == []
+        assert list(self.table.depending_on("//base:base")) == [1, 2]
+        assert list(self.table.where("main.cc", ["sources"])) == [1]
+
+    def test_filter_after_append(self) -> None:
+        """Test that filters see targets appended after a search."""
+        assert list(self.table.with_flag("-Wall")) == [0, 1]
+        self.table.append(Target(name="late", type=TargetType.GROUP, compile_flags=["-Wall"]))
+        assert list(self.table.with_flag("-Wall")) == [0, 1, 3]
+
+    def test_linear_scaling(self) -> None:
+        """Test that building and filtering cost constant time per target."""
+        parser = CMakeParser()
+
+        def best_time(count: int) -> float:
+            targets = parser.parse(
+                "".join(
+                    f"add_library(lib{i} STATIC lib{i}.cc)\n"
+                    f"target_compile_options(lib{i} PRIVATE -Wall -DV{i % 7})\n"
+                    f"target_link_libraries(lib{i} PRIVATE lib{i // 2})\n"
+                    for i in range(count)
+                )
+            )
+            best = float("inf")
+            for _ in range(2):
+                start = time.perf_counter()
+                table = TargetTable.from_targets(targets)
+                assert len(table.with_flag("-Wall")) == count
+                assert len(table.depending_on("lib1")) == 2
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        small = best_time(1_000)
+        large = best_time(10_000)
+        assert large < small * 25